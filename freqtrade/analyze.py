@@ -2,21 +2,31 @@
 Functions to analyze ticker data with indicators and produce buy and sell signals
 """
 import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Tuple
+from multiprocessing.pool import Pool
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import arrow
+import numpy as np
 import pandas as pd
 from pandas import DataFrame, to_datetime
 
-from freqtrade import constants
+from freqtrade import constants, metrics, misc
+from freqtrade.candle_cache import CandleCache
 from freqtrade.exchange import get_fee, get_ticker_history, get_order_book
+from freqtrade.marketdata.interface import IMarketData
 from freqtrade.persistence import Trade
+from freqtrade.signal_cache import SignalCache
 from freqtrade.strategy.resolver import StrategyResolver, IStrategy
 
 logger = logging.getLogger(__name__)
 
+# Exchanges sending their running candle, which analyze_ticker() eliminates
+PARTIAL_CANDLE_EXCHANGES = ['binance']
+
 
 class SignalType(Enum):
     """
@@ -39,33 +49,59 @@ class Analyze(object):
         """
         self.config = config
         self.strategy: IStrategy = StrategyResolver(self.config).strategy
+        candle_cache_size = self.config.get('internals', {}).get('candle_cache_size', 0)
+        self.candle_cache = CandleCache(candle_cache_size) if candle_cache_size else None
+        use_signal_cache = self.config.get('internals', {}).get('signal_cache', False)
+        self.signal_cache = SignalCache() if use_signal_cache else None
+        # Last dataframe populated for each pair, for strategies with incremental indicators
+        self._analyzed: Dict[str, DataFrame] = {}
+        # Streaming source keeping the candles up to date, set by the bot
+        self.market_data: Optional[IMarketData] = None
+        # Processes analyzing the candles for get_signals(), see start_workers()
+        self._pool: Optional[Pool] = None
 
     @staticmethod
-    def parse_ticker_dataframe(ticker: list) -> DataFrame:
+    def parse_ticker_dataframe(ticker: Union[list, Dict[str, np.ndarray]]) -> DataFrame:
         """
         Analyses the trend for the given ticker history
-        :param ticker: See exchange.get_ticker_history
+        :param ticker: See exchange.get_ticker_history, or a dict of column arrays
+                       as loaded from a columnar store (see optimize.datastore)
         :return: DataFrame
         """
         cols = ['date', 'open', 'high', 'low', 'close', 'volume']
         frame = DataFrame(ticker, columns=cols)
 
-        frame['date'] = to_datetime(frame['date'],
-                                    unit='ms',
-                                    utc=True,
-                                    infer_datetime_format=True)
+        # Exchanges and stored data are sorted and unique most of the time,
+        # only aggregate duplicate ticks when there are some
+        dates = frame['date'].values
+        if not (dates[1:] > dates[:-1]).all():
+            frame = Analyze._merge_duplicate_ticks(frame)
 
-        # group by index and aggregate results to eliminate duplicate ticks
-        frame = frame.groupby(by='date', as_index=False, sort=True).agg({
-            'open': 'first',
-            'high': 'max',
-            'low': 'min',
-            'close': 'last',
-            'volume': 'max',
-        })
+        frame['date'] = to_datetime(frame['date'], unit='ms', utc=True)
 
         return frame
 
+    @staticmethod
+    def _merge_duplicate_ticks(frame: DataFrame) -> DataFrame:
+        """
+        Sort the ticks by date and aggregate the duplicated ones
+        :param frame: DataFrame with the dates in ms, or already parsed
+        :return: DataFrame
+        """
+        if frame.isnull().values.any() or not pd.api.types.is_numeric_dtype(frame['date']):
+            # numpy reductions don't skip NaN like pandas does
+            return frame.groupby(by='date', as_index=False, sort=True).agg({
+                'open': 'first',
+                'high': 'max',
+                'low': 'min',
+                'close': 'last',
+                'volume': 'max',
+            })
+        order = np.argsort(frame['date'].values, kind='mergesort')
+        columns = {col: frame[col].values[order] for col in frame.columns}
+        return DataFrame(misc.aggregate_ohlcv(columns, columns['date'], np.maximum),
+                         columns=frame.columns)
+
     def populate_indicators(self, dataframe: DataFrame, pair: str = None) -> DataFrame:
         """
         Adds several different TA indicators to the given DataFrame
@@ -103,18 +139,65 @@ class Analyze(object):
         """
         Parses the given ticker history and returns a populated DataFrame
         add several TA indicators and buy signal to it
+        When the strategy declares a startup_candle_count, only that many candles
+        are analyzed and returned
         :return DataFrame with ticker data and indicator data
         """
+        startup_candles = self.strategy.startup_candle_count
+        if startup_candles and not self.strategy.incremental_indicators:
+            # one more for the partial candle
+            ticker_history = ticker_history[-(startup_candles + 1):]
         dataframe = self.parse_ticker_dataframe(ticker_history)
         # eliminate partials for known exchanges that sends partial candles
-        if self.config['exchange']['name'] in ['binance']:
+        if self.config['exchange']['name'] in PARTIAL_CANDLE_EXCHANGES:
             logger.debug('eliminating partial candle')
             dataframe.drop(dataframe.tail(1).index, inplace=True)  # eliminate partial candle
-        dataframe = self.populate_indicators(dataframe, pair)
+
+        if self.strategy.incremental_indicators:
+            dataframe = self._update_indicators(dataframe, pair)
+        else:
+            if startup_candles:
+                dataframe = dataframe.tail(startup_candles).reset_index(drop=True)
+            dataframe = self.populate_indicators(dataframe, pair)
         dataframe = self.populate_buy_trend(dataframe, pair)
         dataframe = self.populate_sell_trend(dataframe, pair)
         return dataframe
 
+    def _update_indicators(self, dataframe: DataFrame, pair: str) -> DataFrame:
+        """
+        Populate the indicators of the candles newer than the last analyzed one for the pair,
+        or of all the candles when they don't follow it.
+        The last analyzed candle is populated again, it may have been partial.
+        :param dataframe: DataFrame as returned by parse_ticker_dataframe()
+        :param pair: pair in format ANT/BTC
+        :return: DataFrame with the indicators of the last startup_candle_count candles
+        """
+        previous = self._analyzed.get(pair)
+        length = self.strategy.startup_candle_count or len(dataframe)
+        start = None
+        if previous is not None and not previous.empty and not dataframe.empty:
+            last_date = previous['date'].iloc[-1]
+            position = dataframe['date'].searchsorted(last_date)
+            if position < len(dataframe) and dataframe['date'].iloc[position] == last_date:
+                start = len(previous) - 1
+                dataframe = pd.concat([previous.iloc[:-1], dataframe.iloc[position:]],
+                                      ignore_index=True, sort=False)
+
+        if start is None:
+            logger.debug('Populating all the indicators of %s', pair)
+            dataframe = self.populate_indicators(dataframe, pair)
+        else:
+            logger.debug('Populating the indicators of %d candles of %s',
+                         len(dataframe) - start, pair)
+            dataframe = self.strategy.update_indicators(dataframe=dataframe, start=start,
+                                                        pair=pair)
+
+        # Only keep what the next updates need, and the buy and sell columns out of it
+        if len(dataframe) > length:
+            dataframe = dataframe.tail(length).reset_index(drop=True)
+        self._analyzed[pair] = dataframe
+        return dataframe.copy()
+
     def get_signal(self, pair: str, interval: str) -> Tuple[bool, bool]:
         """
         Calculates current signal based several technical analysis indicators
@@ -122,29 +205,166 @@ class Analyze(object):
         :param interval: Interval to use (in min)
         :return: (Buy, Sell) A bool-tuple indicating buy/sell signal
         """
+        signal = self._get_cached_signal(pair, interval)
+        if signal is not None:
+            return signal
+
         logger.info('Checking signal for %s', pair)
-        ticker_hist = get_ticker_history(pair, interval)
+        ticker_hist = self._get_ticker_history(pair, interval)
         if not ticker_hist:
             logger.warning('Empty ticker history for pair %s', pair)
             return False, False
 
+        dataframe = self._analyze_ticker_or_log(ticker_hist, pair)
+        if dataframe is None:
+            return False, False
+        return self._signal_from_dataframe(dataframe, pair, interval)
+
+    def get_signals(self, pairs: List[str], interval: str,
+                    workers: int = 1) -> Iterator[Tuple[bool, bool]]:
+        """
+        Calculates the signals of several pairs, see get_signal().
+        With more than one worker, the candles of all the pairs are downloaded in
+        `workers` threads then analyzed by the processes of start_workers(),
+        otherwise the pairs are handled one by one as the result is iterated
+        :param pairs: pairs in format ANT/BTC
+        :param interval: Interval to use (in min)
+        :param workers: number of threads and of processes to use
+        :return: (Buy, Sell) for each pair, in the order of pairs
+        """
+        if workers <= 1 or len(pairs) <= 1:
+            return (self.get_signal(pair, interval) for pair in pairs)
+
+        signals: Dict[str, Tuple[bool, bool]] = {}
+        pending = []
+        for pair in pairs:
+            signal = self._get_cached_signal(pair, interval)
+            if signal is None:
+                pending.append(pair)
+            else:
+                signals[pair] = signal
+
+        if pending:
+            logger.info('Checking signals for %d pairs using %d workers', len(pending), workers)
+            with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                histories = list(executor.map(
+                    lambda pair: self._get_ticker_history(pair, interval), pending))
+
+            tickers = []
+            for pair, ticker_hist in zip(pending, histories):
+                if ticker_hist:
+                    tickers.append((pair, ticker_hist))
+                else:
+                    logger.warning('Empty ticker history for pair %s', pair)
+                    signals[pair] = False, False
+
+            for pair, dataframe in self._analyze_tickers(tickers):
+                signals[pair] = (False, False) if dataframe is None else \
+                    self._signal_from_dataframe(dataframe, pair, interval)
+
+        return (signals[pair] for pair in pairs)
+
+    def start_workers(self, workers: int) -> None:
+        """
+        Start the processes analyzing the candles for get_signals(). They are
+        started from a clean process (forkserver, or spawn where it is not
+        available), not forked from the bot and its threads, and load the
+        strategy from the configuration themselves.
+        Strategies with incremental indicators are analyzed in this process, where
+        their previous results are kept.
+        :param workers: number of processes
+        """
+        if workers <= 1 or self._pool is not None or self.strategy.incremental_indicators:
+            return
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() \
+            else 'spawn'
+        logger.info('Starting %d signal workers (%s)', workers, method)
+        self._pool = multiprocessing.get_context(method).Pool(
+            processes=workers, initializer=_init_worker, initargs=(self.config,))
+
+    def stop_workers(self) -> None:
+        """
+        Stop the processes started by start_workers()
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _analyze_tickers(self, tickers: List[Tuple[str, List]]
+                         ) -> Iterator[Tuple[str, Optional[DataFrame]]]:
+        """
+        Analyze the candles of several pairs in the worker processes, if started
+        :return: pair and latest analyzed candle, or None if the analysis failed
+        """
+        if self._pool is None or len(tickers) <= 1:
+            for pair, ticker_hist in tickers:
+                yield pair, self._analyze_ticker_or_log(ticker_hist, pair)
+            return
+        yield from self._pool.imap(_analyze_pair, tickers)
+
+    def _get_cached_signal(self, pair: str, interval: str) -> Optional[Tuple[bool, bool]]:
+        """
+        Signal of the pair if the signal cache has it for the latest candle
+        """
+        if not self.signal_cache:
+            return None
+        return self.signal_cache.get(pair, interval, self._latest_candle_ms(interval))
+
+    def _get_ticker_history(self, pair: str, interval: str) -> List:
+        """
+        Candles of the pair, from the streaming source or the candle cache when enabled
+        """
+        with metrics.phase('candles', pair):
+            if self.market_data:
+                ticker_hist = self.market_data.get_ticker_history(pair, interval)
+            elif self.candle_cache:
+                ticker_hist = self.candle_cache.get(pair, interval)
+            else:
+                ticker_hist = get_ticker_history(pair, interval)
+        return self._closed_candles(ticker_hist, interval)
+
+    def _closed_candles(self, ticker_hist: List, interval: str) -> List:
+        """
+        Drop the running candle when the signals are cached, so that they are computed
+        on the latest closed candle and only once per candle
+        """
+        if not self.signal_cache or not ticker_hist or \
+                self.config['exchange']['name'] in PARTIAL_CANDLE_EXCHANGES:
+            return ticker_hist
+        latest_ms = self._latest_candle_ms(interval)
+        end = len(ticker_hist)
+        while end and ticker_hist[end - 1][0] > latest_ms:
+            end -= 1
+        return ticker_hist[:end]
+
+    def _analyze_ticker_or_log(self, ticker_hist: List, pair: str) -> Optional[DataFrame]:
+        """
+        analyze_ticker(), logging the errors
+        :return: DataFrame or None if the analysis failed
+        """
         try:
-            dataframe = self.analyze_ticker(ticker_hist, pair)
+            with metrics.phase('analyze', pair):
+                return self.analyze_ticker(ticker_hist, pair)
         except ValueError as error:
             logger.warning(
                 'Unable to analyze ticker for pair %s: %s',
                 pair,
                 str(error)
             )
-            return False, False
         except Exception as error:
             logger.exception(
                 'Unexpected error when analyzing ticker for pair %s: %s',
                 pair,
                 str(error)
             )
-            return False, False
+        return None
 
+    def _signal_from_dataframe(self, dataframe: DataFrame, pair: str,
+                               interval: str) -> Tuple[bool, bool]:
+        """
+        Signal of the latest analyzed candle, stored in the signal cache
+        """
         if dataframe.empty:
             logger.warning('Empty dataframe for pair %s', pair)
             return False, False
@@ -154,7 +374,11 @@ class Analyze(object):
         # Check if dataframe is out of date
         signal_date = arrow.get(latest['date'])
         interval_minutes = constants.TICKER_INTERVAL_MINUTES[interval]
-        if signal_date < (arrow.utcnow() - timedelta(minutes=(interval_minutes + 5))):
+        outdated_minutes = interval_minutes + 5
+        if self.signal_cache:
+            # The latest candle is closed, it started up to two intervals ago
+            outdated_minutes += interval_minutes
+        if signal_date < (arrow.utcnow() - timedelta(minutes=outdated_minutes)):
             logger.debug('signal %s vs arrow now %s', signal_date, arrow.utcnow())
             logger.warning(
                 'Outdated history for pair %s. Last tick is %s minutes old',
@@ -171,8 +395,22 @@ class Analyze(object):
             str(buy),
             str(sell)
         )
+        candle_ms = signal_date.timestamp * 1000
+        # The running candle is dropped before the analysis, see _closed_candles()
+        if self.signal_cache and candle_ms <= self._latest_candle_ms(interval):
+            self.signal_cache.set(pair, interval, candle_ms, (buy, sell))
         return buy, sell
 
+    @staticmethod
+    def _latest_candle_ms(interval: str) -> int:
+        """
+        Date of the latest closed candle
+        :param interval: Interval to use
+        :return: date in ms
+        """
+        interval_ms = constants.TICKER_INTERVAL_MINUTES[interval] * 60 * 1000
+        return arrow.utcnow().timestamp * 1000 // interval_ms * interval_ms - interval_ms
+
     def should_sell(self, trade: Trade, rate: float, date: datetime, buy: bool, sell: bool) -> bool:
         """
         This function evaluate if on the condition required to trigger a sell has been reached
@@ -247,7 +485,8 @@ class Analyze(object):
 
         return False
 
-    def tickerdata_to_dataframe(self, tickerdata: Dict[str, List]) -> Dict[str, DataFrame]:
+    def tickerdata_to_dataframe(self, tickerdata: Dict[str, Union[List, Dict]]
+                                ) -> Dict[str, DataFrame]:
         """
         Creates a dataframe and populates indicators for given ticker data
         """
@@ -272,24 +511,22 @@ class Analyze(object):
                 break
         return sell_rate
 
-    def order_book_to_dataframe(self, data: list) -> DataFrame:
-        """
-        Gets order book list, returns dataframe with below format
-        -------------------------------------------------------------------
-         bids       b_size       a_sum       asks       a_size       a_sum
-        -------------------------------------------------------------------
-        """
-        cols = ['bids', 'b_size']
-        bids_frame = DataFrame(data['bids'], columns=cols)
-        # add cumulative sum column
-        bids_frame['b_sum'] = bids_frame['b_size'].cumsum()
-        cols2 = ['asks', 'a_size']
-        asks_frame = DataFrame(data['asks'], columns=cols2)
-        # add cumulative sum column
-        asks_frame['a_sum'] = asks_frame['a_size'].cumsum()
 
-        frame = pd.concat([bids_frame['b_sum'], bids_frame['b_size'], bids_frame['bids'], \
-            asks_frame['asks'], asks_frame['a_size'], asks_frame['a_sum']], axis=1, \
-            keys=['b_sum', 'b_size', 'bids', 'asks', 'a_size', 'a_sum'])
+# State of the worker processes, see Analyze.start_workers()
+_WORKER_STATE: Dict[str, Analyze] = {}
 
-        return frame
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """
+    Worker: load the strategy, once per process
+    """
+    _WORKER_STATE['analyze'] = Analyze(config)
+
+
+def _analyze_pair(task: Tuple[str, List]) -> Tuple[str, Optional[DataFrame]]:
+    """
+    Worker: analyze the candles of one pair, only the latest candle is sent back
+    """
+    pair, ticker_hist = task
+    dataframe = _WORKER_STATE['analyze']._analyze_ticker_or_log(ticker_hist, pair)
+    return pair, None if dataframe is None else dataframe.tail(1)
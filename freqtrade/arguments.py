@@ -4,10 +4,11 @@ This module contains the argument manager class
 
 import os
 import argparse
+import importlib
+import importlib.util
 import logging
 import re
-import arrow
-from typing import List, Optional, NamedTuple
+from typing import Callable, List, Optional, NamedTuple
 
 from freqtrade import __version__, constants
 
@@ -24,6 +25,17 @@ class TimeRange(NamedTuple):
     stopts: int = 0
 
 
+def _lazy_start(module: str) -> Callable[[argparse.Namespace], None]:
+    """
+    Start function of a subcommand, importing its module only when the subcommand is run
+    :param module: module defining start(args)
+    """
+    def start(args: argparse.Namespace) -> None:
+        importlib.import_module(module).start(args)  # type: ignore
+
+    return start
+
+
 class Arguments(object):
     """
     Arguments Class. Manage the arguments received by the cli
@@ -143,6 +155,15 @@ class Arguments(object):
             action='store_true',
             dest='refresh_pairs',
         )
+        parser.add_argument(
+            '--stream-pairs',
+            help='load, preprocess and backtest INT pairs at a time instead of all of them, '
+                 'to bound the memory used',
+            dest='stream_pairs',
+            default=0,
+            type=int,
+            metavar='INT',
+        )
         parser.add_argument(
             '--export',
             help='export backtest results, argument are: trades\
@@ -189,6 +210,38 @@ class Arguments(object):
             type=str,
             dest='timerange',
         )
+        parser.add_argument(
+            '--preprocess-workers',
+            help='number of processes used to load pairs and compute their indicators '
+                 '(default: %(default)s)',
+            dest='preprocess_workers',
+            default=1,
+            type=int,
+            metavar='INT',
+        )
+        parser.add_argument(
+            '--dataframe-cache',
+            help='reuse the indicator-populated dataframes cached on disk, '
+                 'and cache them for the next run',
+            action='store_true',
+            dest='dataframe_cache',
+            default=False,
+        )
+        parser.add_argument(
+            '--clear-dataframe-cache',
+            help='remove all cached dataframes before starting',
+            action='store_true',
+            dest='clear_dataframe_cache',
+            default=False,
+        )
+        parser.add_argument(
+            '--low-memory',
+            help='keep prices and indicators as float32 and signals as int8 '
+                 'to roughly halve the memory used',
+            action='store_true',
+            dest='low_memory',
+            default=False,
+        )
 
     @staticmethod
     def hyperopt_options(parser: argparse.ArgumentParser) -> None:
@@ -218,25 +271,22 @@ class Arguments(object):
         Builds and attaches all subcommands
         :return: None
         """
-        from freqtrade.optimize import backtesting
-
         subparsers = self.parser.add_subparsers(dest='subparser')
 
         # Add backtesting subcommand
         backtesting_cmd = subparsers.add_parser('backtesting', help='backtesting module')
-        backtesting_cmd.set_defaults(func=backtesting.start)
+        backtesting_cmd.set_defaults(func=_lazy_start('freqtrade.optimize.backtesting'))
         self.optimizer_shared_options(backtesting_cmd)
         self.backtesting_options(backtesting_cmd)
 
-        # Add hyperopt subcommand
-        try:
-            from freqtrade.optimize import hyperopt
+        # Add hyperopt subcommand, if the hyperopt package is installed
+        if importlib.util.find_spec('hyperopt') is not None:
             hyperopt_cmd = subparsers.add_parser('hyperopt', help='hyperopt module')
-            hyperopt_cmd.set_defaults(func=hyperopt.start)
+            hyperopt_cmd.set_defaults(func=_lazy_start('freqtrade.optimize.hyperopt'))
             self.optimizer_shared_options(hyperopt_cmd)
             self.hyperopt_options(hyperopt_cmd)
-        except ImportError as e:
-            logging.warn("no hyper opt found - skipping support for it")
+        else:
+            logging.warning("no hyper opt found - skipping support for it")
 
     @staticmethod
     def parse_timerange(text: Optional[str]) -> TimeRange:
@@ -247,6 +297,9 @@ class Arguments(object):
         """
         if text is None:
             return TimeRange(None, None, 0, 0)
+        # Not imported at the top, --help does not need it
+        import arrow
+
         syntax = [(r'^-(\d{8})$', (None, 'date')),
                   (r'^(\d{8})-$', ('date', None)),
                   (r'^(\d{8})-(\d{8})$', ('date', 'date')),
@@ -427,3 +480,46 @@ class Arguments(object):
             nargs='+',
             dest='timeframes',
         )
+
+        self.parser.add_argument(
+            '--concurrency',
+            help='Maximum number of requests in flight (default: %(default)s)',
+            dest='concurrency',
+            type=int,
+            metavar='INT',
+            default=4
+        )
+
+        self.parser.add_argument(
+            '--requests-per-second',
+            help='Limit the request rate, defaults to the rate limit of the exchange',
+            dest='requests_per_second',
+            type=float,
+            metavar='FLOAT',
+            default=None
+        )
+
+        self.parser.add_argument(
+            '--columnar',
+            help='Store new pairs as columnar data files, which are updated by appending '
+                 'the new candles only. Existing columnar data files are always updated.',
+            action='store_true',
+            dest='columnar',
+            default=False
+        )
+
+        self.parser.add_argument(
+            '--find-gaps',
+            help='Report the missing candles in the downloaded data, without downloading',
+            action='store_true',
+            dest='find_gaps',
+            default=False
+        )
+
+        self.parser.add_argument(
+            '--backfill-gaps',
+            help='Download only the candles missing in the downloaded data',
+            action='store_true',
+            dest='backfill_gaps',
+            default=False
+        )
@@ -0,0 +1,253 @@
+"""
+asyncio based main loop of the bot.
+
+FreqtradeBot.worker() runs one iteration after the other and sleeps in between,
+while this loop schedules them on an event loop: the candles and signals of all
+the pairs are fetched and computed concurrently in threads, RPC messages are
+sent in the background and the throttle is a timer. Trades are still handled
+one after the other in the loop thread, which owns the database session.
+A pair failing with a TemporaryError is skipped for a while, growing up to
+RETRY_TIMEOUT, without delaying the other pairs.
+With a streaming market data source, the next iteration starts as soon as a
+new candle is received instead of waiting for the end of the throttle.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+from freqtrade import OperationalException, TemporaryError, constants, metrics
+from freqtrade.freqtradebot import FreqtradeBot
+from freqtrade.marketdata import CANDLE, MarketEvent
+from freqtrade.persistence import Trade
+from freqtrade.state import State
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWorker(object):
+    """
+    Runs the iterations of a FreqtradeBot on an asyncio event loop
+    """
+
+    def __init__(self, freqtrade: FreqtradeBot) -> None:
+        """
+        :param freqtrade: the bot to run
+        """
+        self.freqtrade = freqtrade
+        self.config = freqtrade.config
+        self.min_secs = self.config.get('internals', {}).get(
+            'process_throttle_secs',
+            constants.PROCESS_THROTTLE_SECS
+        )
+        # pair -> (loop time until which it is skipped, current delay)
+        self._backoff: Dict[str, Tuple[float, float]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Set when a new candle is received, on a streaming source only
+        self._wakeup: Optional[asyncio.Event] = None
+        # pair -> date of its latest candle received
+        self._candle_dates: Dict[str, int] = {}
+        if freqtrade.market_data.streaming:
+            freqtrade.market_data.subscribe(self._on_market_event)
+
+    def run(self, old_state: Optional[State] = None) -> State:
+        """
+        Run the bot until its configuration has to be reloaded
+        :param old_state: the previous service state
+        :return: State.RELOAD_CONF
+        """
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor()
+        rpc_executor = ThreadPoolExecutor(max_workers=1)
+        loop.set_default_executor(executor)
+        self._loop = loop
+        # A single thread keeps the messages in order
+        self.freqtrade.rpc.executor = rpc_executor
+        try:
+            return loop.run_until_complete(self._run(old_state))
+        finally:
+            self.freqtrade.rpc.executor = None
+            rpc_executor.shutdown(wait=True)
+            executor.shutdown(wait=True)
+            loop.close()
+            self._loop = None
+            self._wakeup = None
+
+    async def _run(self, old_state: Optional[State]) -> State:
+        """
+        Run the iterations until the configuration has to be reloaded
+        """
+        if self.freqtrade.market_data.streaming:
+            self._wakeup = asyncio.Event()
+        state = old_state
+        while state != State.RELOAD_CONF:
+            state = await self.worker(state)
+        return state
+
+    async def worker(self, old_state: Optional[State] = None) -> State:
+        """
+        One iteration of the trading routine, see FreqtradeBot.worker()
+        :param old_state: the previous service state from the previous call
+        :return: current service state
+        """
+        state = self.freqtrade.state
+        if state != old_state:
+            self.freqtrade._notify_state_change(state)
+
+        if state == State.STOPPED:
+            await asyncio.sleep(1)
+        elif state == State.RUNNING:
+            next_run = self._time() + self.min_secs
+            await self._process(self.config.get('dynamic_whitelist', None))
+            delay = max(next_run - self._time(), 0.0)
+            logger.debug('Next iteration in %.2f seconds', delay)
+            await self._sleep(delay)
+        return state
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The event loop, only available while run() runs
+        """
+        loop = self._loop
+        assert loop is not None, 'the event loop is not running'
+        return loop
+
+    def _time(self) -> float:
+        """
+        Current time of the event loop
+        """
+        return self._event_loop().time()
+
+    async def _sleep(self, delay: float) -> None:
+        """
+        Wait for delay seconds or until a new candle is received
+        """
+        if self._wakeup is None:
+            await asyncio.sleep(delay)
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def _on_market_event(self, event: MarketEvent) -> None:
+        """
+        Wake the loop up when a pair gets a new candle, called from the thread of the source
+        """
+        if event.kind != CANDLE:
+            return
+        candle_ms = cast(List, event.data)[0]
+        if candle_ms <= self._candle_dates.get(event.pair, 0):
+            return
+        self._candle_dates[event.pair] = candle_ms
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The loop was closed in the meantime
+                pass
+
+    async def _process(self, nb_assets: Optional[int] = 0) -> bool:
+        """
+        Handle the open trades then look for a new one, see FreqtradeBot._process()
+        :param: nb_assets: the maximum number of pairs to be traded at the same time
+        :return: True if one or more trades has been created or closed, False otherwise
+        """
+        freqtrade = self.freqtrade
+        state_changed = False
+        try:
+            with metrics.phase('whitelist'):
+                whitelist = await self._call(freqtrade._update_whitelist, nb_assets)
+            trades = Trade.query.filter(Trade.is_open.is_(True)).all()
+
+            open_pairs = [trade.pair for trade in trades]
+            buy = not self.config.get('disable_buy', False) and \
+                len(trades) < self.config['max_open_trades']
+            pairs = [pair for pair in whitelist if pair not in open_pairs] if buy else []
+            if self.config.get('experimental', {}).get('use_sell_signal'):
+                pairs += open_pairs
+            with metrics.phase('signals'):
+                signals = await self._get_signals(pairs)
+
+            # Trades are handled in this thread, which owns the database session.
+            # The sell signal is skipped for the pairs backing off, not the ROI and stoploss.
+            for trade in trades:
+                try:
+                    with metrics.phase('sell', trade.pair):
+                        state_changed |= freqtrade.process_maybe_execute_sell(
+                            trade, signals.get(trade.pair, (False, False)))
+                except TemporaryError as error:
+                    self._back_off(trade.pair, error)
+
+            if self.config.get('disable_buy', False):
+                logger.info('Buy disabled...')
+            elif buy:
+                with metrics.phase('buy'):
+                    state_changed = freqtrade.process_maybe_execute_buy(signals)
+
+            if 'unfilledtimeout' in self.config:
+                # Check and handle any timed out open orders
+                if not self.config['dry_run']:
+                    with metrics.phase('timeouts'):
+                        freqtrade.check_handle_timedout()
+                    with metrics.phase('persistence'):
+                        Trade.session.flush()
+
+        except TemporaryError as error:
+            logger.warning('%s, retrying at the next iteration...', error)
+        except OperationalException:
+            freqtrade._stop_on_operational_exception()
+        return state_changed
+
+    async def _get_signals(self, pairs: List[str]) -> Dict[str, Tuple[bool, bool]]:
+        """
+        Compute the signals of the pairs concurrently, leaving out the pairs backing off
+        :return: dict pair -> (Buy, Sell)
+        """
+        analyze = self.freqtrade.analyze
+        interval = analyze.get_ticker_interval()
+        pairs = [pair for pair in pairs if not self._is_backing_off(pair)]
+        results = await asyncio.gather(*[
+            self._call_for_pair(pair, None, analyze.get_signal, pair, interval)
+            for pair in pairs
+        ])
+        return {pair: signal for pair, signal in zip(pairs, results) if signal is not None}
+
+    async def _call(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking function in a thread of the executor
+        """
+        return await self._event_loop().run_in_executor(None, func, *args)
+
+    async def _call_for_pair(self, pair: str, default: Any,
+                             func: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking function for a pair, which backs off if it raises a TemporaryError
+        :param default: returned instead of raising the TemporaryError
+        """
+        try:
+            result = await self._call(func, *args)
+        except TemporaryError as error:
+            self._back_off(pair, error)
+            return default
+        self._backoff.pop(pair, None)
+        return result
+
+    def _back_off(self, pair: str, error: TemporaryError) -> None:
+        """
+        Skip a failing pair for twice as long as the last time, up to RETRY_TIMEOUT
+        """
+        _, delay = self._backoff.get(pair, (0.0, self.min_secs / 2))
+        delay = min(max(delay * 2, 1.0), constants.RETRY_TIMEOUT)
+        self._backoff[pair] = (self._time() + delay, delay)
+        logger.warning('%s, retrying %s in %.0f seconds...', error, pair, delay)
+
+    def _is_backing_off(self, pair: str) -> bool:
+        """
+        True if the pair failed recently and must not be tried yet
+        """
+        if pair not in self._backoff:
+            return False
+        return self._backoff[pair][0] > self._time()
@@ -0,0 +1,97 @@
+"""
+In-memory candle buffers used by the live trading loop.
+
+The first request of a pair downloads its history as usual, the following
+ones only fetch the candles from the last buffered one onwards: the last
+candle may have been incomplete when it was downloaded (binance sends the
+running candle), so it is always fetched again and replaced.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import arrow
+
+from freqtrade import constants, exchange
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CANDLES = 1000
+
+
+class CandleCache(object):
+    """
+    Bounded per pair and ticker interval buffers of the latest candles
+    """
+
+    def __init__(self, max_candles: int = DEFAULT_MAX_CANDLES) -> None:
+        """
+        :param max_candles: maximum number of candles kept per pair and interval
+        """
+        self.max_candles = max_candles
+        self.requests = 0
+        self._buffers: Dict[Tuple[str, str], List] = {}
+        # Number of candles kept for each buffer, the size of its first download
+        self._sizes: Dict[Tuple[str, str], int] = {}
+
+    def get(self, pair: str, tick_interval: str) -> List:
+        """
+        Refresh and return the candles of a pair, see exchange.get_ticker_history()
+        :param pair: pair in format ANT/BTC
+        :param tick_interval: ticker interval
+        :return: list of candles, oldest first
+        """
+        key = (pair, tick_interval)
+        buffer = self._buffers.get(key)
+        interval_ms = constants.TICKER_INTERVAL_MINUTES[tick_interval] * 60 * 1000
+        now_ms = arrow.utcnow().timestamp * 1000
+
+        if not buffer or (now_ms - buffer[-1][0]) // interval_ms >= self._sizes[key]:
+            # Nothing buffered yet or too old to be updated
+            self.requests += 1
+            candles = exchange.get_ticker_history(pair, tick_interval)
+            if not candles:
+                return candles
+            self._sizes[key] = min(len(candles), self.max_candles)
+            buffer = self._buffers[key] = candles[-self._sizes[key]:]
+            return list(buffer)
+
+        new_candles = self._fetch_since(pair, tick_interval, buffer[-1][0], now_ms, interval_ms)
+        if new_candles:
+            # Replace the candles downloaded again, the last one may have been partial
+            start = len(buffer)
+            while start > 0 and buffer[start - 1][0] >= new_candles[0][0]:
+                start -= 1
+            buffer = (buffer[:start] + new_candles)[-self._sizes[key]:]
+            self._buffers[key] = buffer
+        logger.debug('Fetched %d candles for %s since the last update',
+                     len(new_candles), pair)
+        return list(buffer)
+
+    def _fetch_since(self, pair: str, tick_interval: str, since_ms: int,
+                     now_ms: int, interval_ms: int) -> List:
+        """
+        Fetch the candles from since_ms up to the running one
+        """
+        candles: List = []
+        while True:
+            self.requests += 1
+            page = [candle for candle
+                    in exchange.get_ticker_history_page(pair, tick_interval, since_ms=since_ms)
+                    if candle[0] >= since_ms]
+            if not page:
+                break
+            candles.extend(page)
+            if page[-1][0] + interval_ms > now_ms:
+                # Reached the running candle
+                break
+            since_ms = page[-1][0] + 1
+        return candles
+
+    def clear(self, pair: Optional[str] = None) -> None:
+        """
+        Drop the buffers of a pair, or of all pairs
+        """
+        for key in list(self._buffers):
+            if pair is None or key[0] == pair:
+                del self._buffers[key]
+                del self._sizes[key]
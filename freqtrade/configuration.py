@@ -46,6 +46,9 @@ class Configuration(object):
         # Load Backtesting
         config = self._load_backtesting_config(config)
 
+        # Load Preprocessing
+        config = self._load_preprocessing_config(config)
+
         # Load Hyperopt
         config = self._load_hyperopt_config(config)
 
@@ -177,6 +180,40 @@ class Configuration(object):
 
         return config
 
+    def _load_preprocessing_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract information for sys.argv and load the configuration of the
+        data loading and preprocessing shared by Backtesting and Hyperopt
+        :return: configuration as dictionary
+        """
+        # If --preprocess-workers is used we add it to the configuration
+        if 'preprocess_workers' in self.args and self.args.preprocess_workers > 1:
+            config.update({'preprocess_workers': self.args.preprocess_workers})
+            logger.info('Parameter --preprocess-workers detected: %s ...',
+                        self.args.preprocess_workers)
+
+        # If --dataframe-cache is used we add it to the configuration
+        if 'dataframe_cache' in self.args and self.args.dataframe_cache:
+            config.update({'dataframe_cache': True})
+            logger.info('Parameter --dataframe-cache detected ...')
+
+        # If --clear-dataframe-cache is used we add it to the configuration
+        if 'clear_dataframe_cache' in self.args and self.args.clear_dataframe_cache:
+            config.update({'clear_dataframe_cache': True})
+            logger.info('Parameter --clear-dataframe-cache detected ...')
+
+        # If --stream-pairs is used we add it to the configuration
+        if 'stream_pairs' in self.args and self.args.stream_pairs > 0:
+            config.update({'stream_pairs': self.args.stream_pairs})
+            logger.info('Parameter --stream-pairs detected: %s ...', self.args.stream_pairs)
+
+        # If --low-memory is used we add it to the configuration
+        if 'low_memory' in self.args and self.args.low_memory:
+            config.update({'low_memory': True})
+            logger.info('Parameter --low-memory detected ...')
+
+        return config
+
     def _load_hyperopt_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract information for sys.argv and load Hyperopt configuration
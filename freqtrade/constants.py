@@ -108,12 +108,52 @@ CONF_SCHEMA = {
             },
             'required': ['enabled', 'token', 'chat_id']
         },
+        'market_data': {
+            'type': 'object',
+            'properties': {
+                'source': {'type': 'string', 'enum': ['polling', 'replay']},
+                'replay_dir': {'type': 'string'},
+                'speed': {'type': 'number', 'minimum': 0},
+                'max_candles': {'type': 'integer', 'minimum': 1},
+                'record': {'type': 'boolean'}
+            }
+        },
+        'metrics': {
+            'type': 'object',
+            'properties': {
+                'enabled': {'type': 'boolean'},
+                'listen_address': {'type': 'string'},
+                'listen_port': {'type': 'integer', 'minimum': 1, 'maximum': 65535},
+                'file': {'type': 'string'},
+                'write_interval': {'type': 'number', 'minimum': 1}
+            }
+        },
         'db_url': {'type': 'string'},
         'initial_state': {'type': 'string', 'enum': ['running', 'stopped']},
         'internals': {
             'type': 'object',
             'properties': {
                 'process_throttle_secs': {'type': 'number'},
+                'candle_cache_size': {'type': 'integer', 'minimum': 0},
+                'signal_cache': {'type': 'boolean'},
+                'signal_workers': {'type': 'integer', 'minimum': 1},
+                'asyncio': {'type': 'boolean'},
+                'order_book_ttl': {'type': 'number', 'minimum': 0},
+                'adaptive_throttle': {'type': 'boolean'},
+                'request_scheduler': {'type': 'boolean'},
+                'request_rate': {'type': 'number', 'minimum': 0, 'exclusiveMinimum': True},
+                'request_burst': {'type': 'number', 'minimum': 1},
+                'candle_delay_secs': {'type': 'number', 'minimum': 0},
+                'rate_limit_usage': {'type': 'number', 'minimum': 0, 'exclusiveMinimum': True,
+                                     'maximum': 1},
+                'order_book_depth': {'type': 'integer', 'minimum': 1},
+                'retry_backoff_secs': {'type': 'number', 'minimum': 0},
+                'retry_backoff_max_secs': {'type': 'number', 'minimum': 0},
+                'circuit_breaker': {'type': 'boolean'},
+                'circuit_breaker_threshold': {'type': 'integer', 'minimum': 1},
+                'circuit_breaker_reset_secs': {'type': 'number', 'minimum': 0},
+                'markets_ttl': {'type': 'number', 'minimum': 0},
+                'markets_file': {'type': 'string'},
                 'interval': {'type': 'integer'}
             }
         }
@@ -1,6 +1,8 @@
 # pragma pylint: disable=W0603
 """ Cryptocurrency Exchanges support """
 import logging
+import os
+import time
 from random import randint
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -8,7 +10,12 @@ from datetime import datetime
 import ccxt
 import arrow
 
-from freqtrade import constants, OperationalException, DependencyException, TemporaryError
+from freqtrade import constants, metrics, OperationalException, DependencyException, TemporaryError
+from freqtrade.exchange.circuit_breaker import (DEFAULT_BACKOFF_MAX, DEFAULT_FAILURE_THRESHOLD,
+                                                DEFAULT_RESET_TIMEOUT, CircuitBreaker,
+                                                Listener, backoff_delay)
+from freqtrade.exchange.markets import DEFAULT_TTL, MARKETS_FILE, MarketCache
+from freqtrade.exchange.scheduler import RequestScheduler, ScheduledExchange
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +24,19 @@ _API: ccxt.Exchange = None
 
 _CONF: Dict = {}
 API_RETRY_COUNT = 4
+# Weight of the requests allowed in a burst by the request scheduler
+DEFAULT_REQUEST_BURST = 10
+
+# Delay before the first retry and maximum delay, in seconds. 0 retries right away
+_BACKOFF = {'base': 0.0, 'max': DEFAULT_BACKOFF_MAX}
+# Circuit breaker settings, None while the breakers are disabled
+_BREAKER_CONF: Optional[Dict[str, Any]] = None
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKER_LISTENERS: List[Listener] = []
+
+# Market metadata, and the exchange instance it was cached for
+_MARKETS: Optional[MarketCache] = None
+_MARKETS_API: Optional[ccxt.Exchange] = None
 
 _CACHED_TICKER: Dict[str, Any] = {}
 
@@ -33,22 +53,131 @@ _EXCHANGE_URLS = {
 def retrier(f):
     def wrapper(*args, **kwargs):
         count = kwargs.pop('count', API_RETRY_COUNT)
-        try:
-            return f(*args, **kwargs)
-        except (TemporaryError, DependencyException) as ex:
-            logger.warning('%s() returned exception: "%s"', f.__name__, ex)
-            if count > 0:
-                count -= 1
-                kwargs.update({'count': count})
-                logger.warning('retrying %s() still for %s times', f.__name__, count)
-                return wrapper(*args, **kwargs)
-            else:
+        breaker = get_breaker(f.__name__)
+        if breaker and breaker.before_call():
+            # The trial call of a half-open breaker is not retried
+            count = 0
+        attempt = 0
+        while True:
+            try:
+                result = f(*args, **kwargs)
+            except (TemporaryError, DependencyException) as ex:
+                logger.warning('%s() returned exception: "%s"', f.__name__, ex)
+                _check_unknown_symbol(ex)
+                if count > 0:
+                    count -= 1
+                    logger.warning('retrying %s() still for %s times', f.__name__, count)
+                    _backoff(f.__name__, attempt)
+                    attempt += 1
+                    continue
                 logger.warning('Giving up retrying: %s()', f.__name__)
+                _record_call(breaker, ex)
                 raise ex
-
+            except BaseException as ex:
+                _check_unknown_symbol(ex)
+                _record_call(breaker)
+                raise
+            _record_call(breaker)
+            return result
+
+    wrapper.__name__ = f.__name__
+    wrapper.__doc__ = f.__doc__
     return wrapper
 
 
+def _backoff(name: str, attempt: int) -> None:
+    """
+    Wait before retrying a failed call
+    :param name: name of the exchange function
+    :param attempt: number of the failed attempt, starting at 0
+    """
+    delay = backoff_delay(attempt, _BACKOFF['base'], _BACKOFF['max'])
+    if delay:
+        logger.debug('Waiting %.2f seconds before retrying %s()', delay, name)
+        time.sleep(delay)
+
+
+def _record_call(breaker: Optional[CircuitBreaker], error: Optional[BaseException] = None) -> None:
+    """
+    Report the outcome of a call to the circuit breaker of its endpoint
+    :param breaker: circuit breaker of the endpoint, None if disabled
+    :param error: exception the call failed with after its retries, None if it succeeded
+    """
+    if breaker is None:
+        return
+    if isinstance(error, TemporaryError):
+        breaker.failure()
+    else:
+        # The exchange answered
+        breaker.success()
+
+
+def _check_unknown_symbol(error: BaseException) -> None:
+    """
+    Refresh the cached markets if the exchange reported an unknown symbol
+    :param error: exception of an exchange call, raised while handling the ccxt one
+    """
+    cause = error.__context__ or error
+    # BadSymbol is only defined by recent ccxt versions
+    bad_symbol = getattr(ccxt, 'BadSymbol', ())
+    if isinstance(cause, bad_symbol) or 'does not have market symbol' in str(cause):
+        cache = _market_cache()
+        if cache is not None:
+            cache.invalidate()
+
+
+def get_breaker(endpoint: str) -> Optional[CircuitBreaker]:
+    """
+    Circuit breaker of an endpoint, created on its first call
+    :param endpoint: name of the exchange function
+    :return: None if the circuit breakers are disabled
+    """
+    if _BREAKER_CONF is None:
+        return None
+    breaker = _BREAKERS.get(endpoint)
+    if breaker is None:
+        breaker = _BREAKERS.setdefault(endpoint, CircuitBreaker(
+            endpoint, listeners=_BREAKER_LISTENERS, **_BREAKER_CONF))
+    return breaker
+
+
+def add_breaker_listener(listener: Listener) -> None:
+    """
+    Call listener(endpoint, previous_state, state) when a circuit breaker changes state
+    """
+    _BREAKER_LISTENERS.append(listener)
+
+
+def remove_breaker_listener(listener: Listener) -> None:
+    """
+    Stop calling a listener added by add_breaker_listener
+    """
+    if listener in _BREAKER_LISTENERS:
+        _BREAKER_LISTENERS.remove(listener)
+
+
+def init_retries(internals: Dict[str, Any]) -> None:
+    """
+    Set up the backoff of the retrier and the circuit breakers
+    :param internals: internals section of the config
+    :return: None
+    """
+    global _BREAKER_CONF
+
+    _BACKOFF['base'] = internals.get('retry_backoff_secs', 0.0)
+    _BACKOFF['max'] = internals.get('retry_backoff_max_secs', DEFAULT_BACKOFF_MAX)
+    _BREAKERS.clear()
+    if internals.get('circuit_breaker', False):
+        _BREAKER_CONF = {
+            'failure_threshold': internals.get('circuit_breaker_threshold',
+                                               DEFAULT_FAILURE_THRESHOLD),
+            'reset_timeout': internals.get('circuit_breaker_reset_secs',
+                                           DEFAULT_RESET_TIMEOUT),
+        }
+    else:
+        _BREAKER_CONF = None
+
+
 def init_ccxt(exchange_config: dict) -> ccxt.Exchange:
     """
     Initialize ccxt with given config and return valid
@@ -93,12 +222,69 @@ def init(config: dict) -> None:
     exchange_config = config['exchange']
     _API = init_ccxt(exchange_config)
 
+    internals = config.get('internals', {})
+    init_retries(internals)
+    if internals.get('request_scheduler', False):
+        # The scheduler replaces the rate limiting of ccxt
+        _API.enableRateLimit = False
+        rate = internals.get('request_rate') or 1000 / _API.rateLimit
+        _API = ScheduledExchange(_API, RequestScheduler(
+            rate, internals.get('request_burst', DEFAULT_REQUEST_BURST)))
+        logger.info('Scheduling the exchange requests at %.1f weight per second', rate)
+
+    init_markets(config)
     logger.info('Using Exchange "%s"', get_name())
 
     # Check if all pairs are available
     validate_pairs(config['exchange']['pair_whitelist'])
 
 
+def init_markets(config: dict) -> None:
+    """
+    Set up the cache of the market metadata and load the markets saved by the last run
+    :param config: config to use
+    :return: None
+    """
+    global _MARKETS, _MARKETS_API
+
+    internals = config.get('internals', {})
+    path = internals.get('markets_file') or os.path.join(
+        config.get('datadir') or
+        os.path.join('user_data', 'data', config['exchange']['name'].lower()), MARKETS_FILE)
+    _MARKETS = MarketCache(_fetch_and_set_markets,
+                           ttl=internals.get('markets_ttl', DEFAULT_TTL), path=path)
+    _MARKETS_API = _API
+    if _MARKETS.load():
+        # ccxt needs them too, for the fees and lot sizes
+        _API.set_markets(_MARKETS.markets())
+
+
+def _market_cache() -> Optional[MarketCache]:
+    """
+    Cache of the markets, None if init() did not create one for the current exchange
+    """
+    if _MARKETS is not None and _MARKETS_API is _API:
+        return _MARKETS
+    return None
+
+
+def _fetch_and_set_markets() -> List[dict]:
+    markets = fetch_markets()
+    _API.set_markets(markets)
+    return markets
+
+
+def _load_markets() -> None:
+    """
+    Make sure ccxt has the markets, from the cache if there is one
+    """
+    cache = _market_cache()
+    if cache is None:
+        _API.load_markets()
+    else:
+        _API.set_markets(cache.markets())
+
+
 def validate_pairs(pairs: List[str]) -> None:
     """
     Checks if all given pairs are tradable on the current exchange.
@@ -107,9 +293,10 @@ def validate_pairs(pairs: List[str]) -> None:
     :return: None
     """
 
+    cache = _market_cache()
     try:
-        markets = _API.load_markets()
-    except ccxt.BaseError as e:
+        markets = _API.load_markets() if cache is None else cache.symbols()
+    except (ccxt.BaseError, TemporaryError, OperationalException) as e:
         logger.warning('Unable to validate pairs (assuming they are correct). Reason: %s', e)
         return
 
@@ -135,6 +322,7 @@ def exchange_has(endpoint: str) -> bool:
     return endpoint in _API.has and _API.has[endpoint]
 
 
+@metrics.measured
 def buy(pair: str, rate: float, amount: float) -> Dict:
     if _CONF['dry_run']:
         global _DRY_RUN_OPEN_ORDERS
@@ -171,6 +359,7 @@ def buy(pair: str, rate: float, amount: float) -> Dict:
         raise OperationalException(e)
 
 
+@metrics.measured
 def sell(pair: str, rate: float, amount: float) -> Dict:
     if _CONF['dry_run']:
         global _DRY_RUN_OPEN_ORDERS
@@ -207,6 +396,7 @@ def sell(pair: str, rate: float, amount: float) -> Dict:
 
 
 @retrier
+@metrics.measured
 def get_balance(currency: str) -> float:
     if _CONF['dry_run']:
         return 999.9
@@ -221,6 +411,7 @@ def get_balance(currency: str) -> float:
 
 
 @retrier
+@metrics.measured
 def get_balances() -> dict:
     if _CONF['dry_run']:
         return {}
@@ -242,6 +433,7 @@ def get_balances() -> dict:
 
 
 @retrier
+@metrics.measured
 def get_order_book(pair: str, limit: Optional[int] = 100) -> dict:
     try:
         params = {}
@@ -267,6 +459,7 @@ def get_order_book(pair: str, limit: Optional[int] = 100) -> dict:
 
 
 @retrier
+@metrics.measured
 def get_tickers() -> Dict:
     try:
         return _API.fetch_tickers()
@@ -282,6 +475,7 @@ def get_tickers() -> Dict:
 
 
 @retrier
+@metrics.measured
 def get_ticker(pair: str, refresh: Optional[bool] = True) -> dict:
     global _CACHED_TICKER
     if refresh or pair not in _CACHED_TICKER.keys():
@@ -305,18 +499,28 @@ def get_ticker(pair: str, refresh: Optional[bool] = True) -> dict:
         return _CACHED_TICKER[pair]
 
 
+def get_history_till_ms(tick_interval: str) -> int:
+    """
+    Return the timestamp (ms) up to which candles can be considered final
+    :param tick_interval: ticker interval
+    :return: timestamp in ms
+    """
+    # last item should be in the time interval [now - tick_interval, now]
+    till_time_ms = arrow.utcnow().shift(
+        minutes=-constants.TICKER_INTERVAL_MINUTES[tick_interval]
+    ).timestamp * 1000
+    # it looks as if some exchanges return cached data
+    # and they update it one in several minute, so 10 mins interval
+    # is necessary to skeep downloading of an empty array when all
+    # chached data was already downloaded
+    return min(till_time_ms, arrow.utcnow().shift(minutes=-10).timestamp * 1000)
+
+
 @retrier
+@metrics.measured
 def get_ticker_history(pair: str, tick_interval: str, since_ms: Optional[int] = None) -> List[Dict]:
     try:
-        # last item should be in the time interval [now - tick_interval, now]
-        till_time_ms = arrow.utcnow().shift(
-            minutes=-constants.TICKER_INTERVAL_MINUTES[tick_interval]
-        ).timestamp * 1000
-        # it looks as if some exchanges return cached data
-        # and they update it one in several minute, so 10 mins interval
-        # is necessary to skeep downloading of an empty array when all
-        # chached data was already downloaded
-        till_time_ms = min(till_time_ms, arrow.utcnow().shift(minutes=-10).timestamp * 1000)
+        till_time_ms = get_history_till_ms(tick_interval)
 
         data: List[Dict[Any, Any]] = []
         while not since_ms or since_ms < till_time_ms:
@@ -351,6 +555,29 @@ def get_ticker_history(pair: str, tick_interval: str, since_ms: Optional[int] =
 
 
 @retrier
+@metrics.measured
+def get_ticker_history_page(pair: str, tick_interval: str,
+                            since_ms: Optional[int] = None) -> List[Dict]:
+    """
+    Fetch a single page of candles (as many as the exchange returns for one request),
+    sorted oldest first. Use get_ticker_history() to fetch a whole time range.
+    """
+    try:
+        data = _API.fetch_ohlcv(pair, timeframe=tick_interval, since=since_ms)
+        return sorted(data, key=lambda x: x[0])
+    except ccxt.NotSupported as e:
+        raise OperationalException(
+            f'Exchange {_API.name} does not support fetching historical candlestick data.'
+            f'Message: {e}')
+    except (ccxt.NetworkError, ccxt.ExchangeError) as e:
+        raise TemporaryError(
+            f'Could not load ticker history due to {e.__class__.__name__}. Message: {e}')
+    except ccxt.BaseError as e:
+        raise OperationalException(f'Could not fetch ticker data. Msg: {e}')
+
+
+@retrier
+@metrics.measured
 def cancel_order(order_id: str, pair: str) -> None:
     if _CONF['dry_run']:
         return
@@ -368,6 +595,7 @@ def cancel_order(order_id: str, pair: str) -> None:
 
 
 @retrier
+@metrics.measured
 def get_order(order_id: str, pair: str) -> Dict:
     if _CONF['dry_run']:
         order = _DRY_RUN_OPEN_ORDERS[order_id]
@@ -388,6 +616,7 @@ def get_order(order_id: str, pair: str) -> Dict:
 
 
 @retrier
+@metrics.measured
 def get_trades_for_order(order_id: str, pair: str, since: datetime) -> List:
     if _CONF['dry_run']:
         return []
@@ -417,8 +646,30 @@ def get_pair_detail_url(pair: str) -> str:
         return ""
 
 
-@retrier
 def get_markets() -> List[dict]:
+    """
+    Markets of the exchange, from the cache if there is one
+    """
+    cache = _market_cache()
+    if cache is None:
+        return fetch_markets()
+    return cache.markets()
+
+
+def get_markets_by_quote(quote: str) -> List[dict]:
+    """
+    Markets of a quote currency, from the index of the cache if there is one
+    :param quote: quote currency, e.g. the stake currency
+    """
+    cache = _market_cache()
+    if cache is None:
+        return [m for m in get_markets() if m.get('quote') == quote]
+    return cache.by_quote(quote)
+
+
+@retrier
+@metrics.measured
+def fetch_markets() -> List[dict]:
     try:
         return _API.fetch_markets()
     except (ccxt.NetworkError, ccxt.ExchangeError) as e:
@@ -428,6 +679,13 @@ def get_markets() -> List[dict]:
         raise OperationalException(e)
 
 
+def get_rate_limit() -> float:
+    """
+    Minimum delay between two requests allowed by the exchange, in seconds
+    """
+    return float(getattr(_API, 'rateLimit', 0) or 0) / 1000
+
+
 def get_name() -> str:
     return _API.name
 
@@ -437,12 +695,13 @@ def get_id() -> str:
 
 
 @retrier
+@metrics.measured
 def get_fee(symbol='ETH/BTC', type='', side='', amount=1,
             price=1, taker_or_maker='maker') -> float:
     try:
         # validate that markets are loaded before trying to get fee
         if _API.markets is None or len(_API.markets) == 0:
-            _API.load_markets()
+            _load_markets()
 
         return _API.calculate_fee(symbol=symbol, type=type, side=side, amount=amount,
                                   price=price, takerOrMaker=taker_or_maker)['rate']
@@ -459,5 +718,5 @@ def get_amount_lots(pair: str, amount: float) -> float:
     """
     # validate that markets are loaded before trying to get fee
     if not _API.markets:
-        _API.load_markets()
+        _load_markets()
     return _API.amount_to_lots(pair, amount)
@@ -0,0 +1,154 @@
+"""
+Backoff and circuit breakers of the exchange calls.
+
+The retrier waits between two attempts of a failed call, exponentially longer
+with each attempt and with a random jitter, so the bots hitting an exchange in
+trouble do not retry all at once. Each endpoint also has a circuit breaker:
+after failure_threshold consecutive calls failed with a TemporaryError (once
+their retries are exhausted), the breaker opens and the calls to that endpoint
+fail right away with a CircuitOpenError for reset_timeout seconds. The breaker
+then lets a single trial call through (half-open), which closes it if it
+succeeds or opens it again if it fails.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Callable, List, Optional
+
+from freqtrade import TemporaryError, metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+# Values of the state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = 'freqtrade_exchange_breaker_state'
+BREAKER_TRANSITIONS = 'freqtrade_exchange_breaker_transitions_total'
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 60.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+# Called with the endpoint, the previous and the new state
+Listener = Callable[[str, str, str], None]
+
+
+class CircuitOpenError(TemporaryError):
+    """
+    The circuit breaker of an endpoint is open, the call has not been sent
+    """
+
+
+def backoff_delay(attempt: int, base: float, cap: float = DEFAULT_BACKOFF_MAX) -> float:
+    """
+    Seconds to wait before retrying a call, with full jitter
+    :param attempt: number of the failed attempt, starting at 0
+    :param base: delay after the first attempt, before jitter
+    :param cap: maximum delay, before jitter
+    :return: a random delay between 0 and min(cap, base * 2 ** attempt)
+    """
+    if base <= 0:
+        return 0.0
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker of one endpoint
+    """
+
+    def __init__(self, endpoint: str,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic,
+                 listeners: Optional[List[Listener]] = None) -> None:
+        """
+        :param endpoint: name of the exchange function
+        :param failure_threshold: consecutive failed calls opening the breaker
+        :param reset_timeout: seconds the breaker stays open before a trial call
+        :param clock: time source
+        :param listeners: called on each state change
+        """
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.listeners = listeners if listeners is not None else []
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """
+        Check the call may be sent
+        :return: True if the call is the trial call of a half-open breaker
+        :raise CircuitOpenError: if the breaker is open
+        """
+        with self._lock:
+            previous = self.state
+            if self.state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - self.clock()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f'Circuit breaker of {self.endpoint} open for {remaining:.0f} seconds')
+                self.state = HALF_OPEN
+            trial = self.state == HALF_OPEN
+            if trial:
+                if self._trial_running:
+                    raise CircuitOpenError(
+                        f'Circuit breaker of {self.endpoint} half-open, trial call running')
+                self._trial_running = True
+            state = self.state
+        self._changed(previous, state)
+        return trial
+
+    def success(self) -> None:
+        """
+        The exchange answered the call
+        """
+        with self._lock:
+            previous = self.state
+            self.failures = 0
+            self._trial_running = False
+            self.state = CLOSED
+        self._changed(previous, CLOSED)
+
+    def failure(self) -> None:
+        """
+        The call failed with a TemporaryError after all its retries
+        """
+        with self._lock:
+            previous = self.state
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+                self.state = OPEN
+            state = self.state
+        self._changed(previous, state)
+
+    def _changed(self, previous: str, state: str) -> None:
+        """
+        Report a state change, outside of the lock as the listeners may be slow
+        """
+        if state == previous:
+            return
+        if state == OPEN:
+            logger.warning('Circuit breaker of %s opened after %s failed calls, '
+                           'retrying in %s seconds', self.endpoint, self.failures,
+                           self.reset_timeout)
+        else:
+            logger.info('Circuit breaker of %s %s', self.endpoint, state.replace('_', '-'))
+        metrics.gauge(BREAKER_STATE, STATE_VALUES[state], endpoint=self.endpoint)
+        metrics.inc(BREAKER_TRANSITIONS, endpoint=self.endpoint, state=state)
+        for listener in self.listeners:
+            try:
+                listener(self.endpoint, previous, state)
+            except Exception:
+                logger.exception('Circuit breaker listener failed')
@@ -0,0 +1,178 @@
+"""
+Cache of the market metadata of the exchange.
+
+The markets (symbols, currencies, precision, limits, activity) seldom change,
+yet the whitelist refresh, the pair validation and the fee and lot size
+lookups used to request them again and again. The cache fetches them once,
+indexes them by symbol and by quote currency, and refreshes them in a
+background thread once they are older than ttl seconds, serving the old ones
+meanwhile. They are saved to a file, so a restart validates the pairs without
+a request. invalidate() refreshes them, e.g. when the exchange does not know
+a symbol any more.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600.0
+MARKETS_FILE = 'markets.json'
+
+
+class MarketCache(object):
+    """
+    Markets of an exchange, indexed by symbol and by quote currency
+    """
+
+    def __init__(self, fetch: Callable[[], List[Dict[str, Any]]], ttl: float = DEFAULT_TTL,
+                 path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time) -> None:
+        """
+        :param fetch: requests the markets from the exchange
+        :param ttl: seconds after which the markets are refreshed
+        :param path: file the markets are saved to, None to keep them in memory only
+        :param clock: time source
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self.updated = 0.0
+        self._markets: List[Dict[str, Any]] = []
+        self._by_symbol: Dict[str, Dict[str, Any]] = {}
+        self._by_quote: Dict[str, List[Dict[str, Any]]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def markets(self) -> List[Dict[str, Any]]:
+        """
+        All the markets, fetched on the first call
+        """
+        self._ensure()
+        return self._markets
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Market of a symbol, None if the exchange does not know it
+        """
+        self._ensure()
+        return self._by_symbol.get(symbol)
+
+    def symbols(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Markets by symbol
+        """
+        self._ensure()
+        return self._by_symbol
+
+    def by_quote(self, quote: str) -> List[Dict[str, Any]]:
+        """
+        Markets of a quote currency, e.g. the stake currency
+        """
+        self._ensure()
+        return self._by_quote.get(quote, [])
+
+    def expired(self) -> bool:
+        return self.clock() - self.updated >= self.ttl
+
+    def _ensure(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._update(self._fetch())
+        elif self.expired():
+            self.refresh_in_background()
+
+    def refresh(self) -> None:
+        """
+        Fetch the markets now
+        """
+        markets = self._fetch()
+        with self._lock:
+            self._update(markets)
+
+    def refresh_in_background(self) -> None:
+        """
+        Fetch the markets in a thread, unless they are already being fetched
+        """
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_quietly,
+                                                    name='markets', daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except BaseException as error:
+            # The exceptions of freqtrade derive from BaseException
+            logger.warning('Could not refresh the markets, keeping the cached ones: %s', error)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the background refresh to finish
+        """
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def invalidate(self) -> None:
+        """
+        Refresh the markets, which are known to be outdated
+        """
+        logger.info('Markets outdated, refreshing them')
+        self.updated = 0.0
+        if self._loaded:
+            self.refresh_in_background()
+
+    def _update(self, markets: List[Dict[str, Any]], updated: Optional[float] = None) -> None:
+        by_symbol: Dict[str, Dict[str, Any]] = {}
+        by_quote: Dict[str, List[Dict[str, Any]]] = {}
+        for market in markets:
+            by_symbol[market['symbol']] = market
+            quote = market.get('quote')
+            if quote:
+                by_quote.setdefault(quote, []).append(market)
+        # Replaced at once, readers do not take the lock
+        self._markets, self._by_symbol, self._by_quote = markets, by_symbol, by_quote
+        self.updated = self.clock() if updated is None else updated
+        self._loaded = True
+        if updated is None:
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w') as file:
+                json.dump({'updated': self.updated, 'markets': self._markets}, file)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as error:
+            logger.warning('Could not save the markets to %s: %s', self.path, error)
+
+    def load(self) -> bool:
+        """
+        Load the markets saved by a previous run, even outdated: they are
+        refreshed in the background on the first use
+        :return: True if markets were loaded
+        """
+        if not self.path or not os.path.isfile(self.path):
+            return False
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+            with self._lock:
+                self._update(data['markets'], updated=data['updated'])
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.warning('Could not load the markets from %s: %s', self.path, error)
+            return False
+        logger.info('Loaded %s markets from %s', len(self._markets), self.path)
+        return True
@@ -0,0 +1,278 @@
+"""
+Scheduler of the requests sent to the exchange.
+
+ccxt's enableRateLimit spaces the requests in the order they are made, so an
+order can wait behind the pages of a history download. With the scheduler,
+every request takes tokens from a bucket refilled at the rate allowed by the
+exchange, as many as the weight of its endpoint, and the requests waiting for
+tokens are served by priority: orders, then tickers and order books, then
+history. A request which cannot be sent before its deadline fails with a
+TemporaryError instead of being sent late.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from freqtrade import TemporaryError, metrics
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, lowest first served
+ORDER = 0
+TICKER = 1
+HISTORY = 2
+PRIORITY_NAMES = {ORDER: 'order', TICKER: 'ticker', HISTORY: 'history'}
+
+# Seconds a request of each class may wait in the queue, None to wait as long as needed
+DEADLINES: Dict[int, Optional[float]] = {ORDER: None, TICKER: 10.0, HISTORY: 60.0}
+
+# ccxt method -> (priority class, weight)
+ENDPOINTS: Dict[str, Tuple[int, int]] = {
+    'create_limit_buy_order': (ORDER, 1),
+    'create_limit_sell_order': (ORDER, 1),
+    'cancel_order': (ORDER, 1),
+    'fetch_order': (ORDER, 1),
+    'fetch_ticker': (TICKER, 1),
+    'fetch_tickers': (TICKER, 20),
+    'fetch_l2_order_book': (TICKER, 5),
+    'fetch_balance': (TICKER, 5),
+    'fetch_my_trades': (TICKER, 5),
+    'fetch_ohlcv': (HISTORY, 1),
+    'fetch_markets': (HISTORY, 10),
+    'load_markets': (HISTORY, 10),
+}
+
+QUEUE_DEPTH = 'freqtrade_exchange_queue_depth'
+QUEUE_WAIT = 'freqtrade_exchange_queue_wait_seconds'
+DEADLINE_MISSED = 'freqtrade_exchange_deadline_missed_total'
+
+
+class Clock(object):
+    """
+    Time source of the scheduler
+    """
+
+    def time(self) -> float:
+        return time.monotonic()
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float]) -> None:
+        """
+        Wait for the condition to be notified, at most timeout seconds
+        """
+        condition.wait(timeout)
+
+
+class FakeClock(Clock):
+    """
+    Clock moving forward only when waited on, for deterministic tests
+    """
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float]) -> None:
+        if timeout is None:
+            raise RuntimeError('FakeClock cannot wait without timeout')
+        self.now += timeout
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TokenBucket(object):
+    """
+    Tokens refilled at a constant rate, up to a capacity
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Clock) -> None:
+        """
+        :param rate: tokens added per second
+        :param capacity: maximum number of tokens, the largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock.time()
+
+    def _refill(self) -> None:
+        now = self.clock.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, weight: float) -> float:
+        """
+        Seconds until weight tokens are available, 0 if they are
+        """
+        self._refill()
+        # A request heavier than the bucket waits for it to be full
+        missing = min(weight, self.capacity) - self.tokens
+        return max(missing / self.rate, 0.0)
+
+    def take(self, weight: float) -> None:
+        self._refill()
+        self.tokens -= weight
+
+
+class _Ticket(object):
+    """
+    Request waiting for its turn
+    """
+
+    __slots__ = ('priority', 'seq', 'endpoint', 'weight', 'deadline', 'queued')
+
+    def __init__(self, priority: int, seq: int, endpoint: str, weight: int,
+                 deadline: Optional[float], queued: float) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.endpoint = endpoint
+        self.weight = weight
+        self.deadline = deadline
+        self.queued = queued
+
+    def __lt__(self, other: '_Ticket') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler(object):
+    """
+    Lets the requests of all threads through the token bucket by priority
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Optional[Clock] = None) -> None:
+        """
+        :param rate: weight of the requests allowed per second
+        :param capacity: weight of the requests allowed in a burst
+        :param clock: time source, a FakeClock in tests
+        """
+        self.clock = clock or Clock()
+        self.bucket = TokenBucket(rate, capacity, self.clock)
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+
+    def call(self, endpoint: str, func: Callable[..., Any], *args,
+             priority: Optional[int] = None, timeout: Optional[float] = -1,
+             **kwargs) -> Any:
+        """
+        Wait for the turn of a request, then send it
+        :param endpoint: ccxt method called, see ENDPOINTS
+        :param func: function sending the request
+        :param priority: priority class, the one of the endpoint by default
+        :param timeout: seconds the request may wait, the deadline of its class by default
+        :return: the result of func
+        """
+        default_priority, weight = ENDPOINTS.get(endpoint, (TICKER, 1))
+        priority = default_priority if priority is None else priority
+        if timeout == -1:
+            timeout = DEADLINES[priority]
+        self.acquire(endpoint, weight, priority, timeout)
+        return func(*args, **kwargs)
+
+    def acquire(self, endpoint: str, weight: int, priority: int,
+                timeout: Optional[float] = None) -> None:
+        """
+        Block until the request can be sent
+        :raise TemporaryError: if it cannot be sent within timeout seconds
+        """
+        with self._condition:
+            now = self.clock.time()
+            ticket = _Ticket(priority, next(self._seq), endpoint, weight,
+                             None if timeout is None else now + timeout, now)
+            heapq.heappush(self._queue, ticket)
+            self._report_depth(priority)
+            try:
+                while True:
+                    wait = self._try_grant(ticket)
+                    if wait is None:
+                        metrics.observe(QUEUE_WAIT, self.clock.time() - ticket.queued,
+                                        priority=PRIORITY_NAMES[priority])
+                        return
+                    if ticket.deadline is not None:
+                        remaining = ticket.deadline - self.clock.time()
+                        # First in the queue, it would hold the others until its deadline
+                        if remaining <= 0 or wait > remaining:
+                            self._remove(ticket)
+                            metrics.inc(DEADLINE_MISSED, endpoint=endpoint)
+                            raise TemporaryError(
+                                f'Request {endpoint} could not be sent within {timeout}s')
+                        wait = wait or remaining
+                    # 0 waits for the requests queued before to be sent
+                    self.clock.wait(self._condition, wait or None)
+            finally:
+                self._report_depth(priority)
+
+    def _try_grant(self, ticket: _Ticket) -> Optional[float]:
+        """
+        Let the ticket through if it is first in the queue and tokens are available
+        :return: None if granted, seconds to wait for the tokens, or 0 to wait for the
+                 requests before it
+        """
+        if self._queue[0] is not ticket:
+            return 0
+        wait = self.bucket.wait_time(ticket.weight)
+        if wait > 0:
+            return wait
+        self.bucket.take(ticket.weight)
+        heapq.heappop(self._queue)
+        # The next request may be able to go
+        self._condition.notify_all()
+        return None
+
+    def _remove(self, ticket: _Ticket) -> None:
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._condition.notify_all()
+
+    def _report_depth(self, priority: int) -> None:
+        if metrics.enabled():
+            depth = sum(1 for ticket in self._queue if ticket.priority == priority)
+            metrics.gauge(QUEUE_DEPTH, depth, priority=PRIORITY_NAMES[priority])
+
+    def queue_depth(self) -> Dict[str, int]:
+        """
+        Number of requests waiting, by priority class
+        """
+        with self._condition:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for ticket in self._queue:
+                depth[PRIORITY_NAMES[ticket.priority]] += 1
+            return depth
+
+
+class ScheduledExchange(object):
+    """
+    Proxy of a ccxt exchange sending the requests of ENDPOINTS through a scheduler
+    """
+
+    def __init__(self, api: Any, scheduler: RequestScheduler) -> None:
+        self._api = api
+        self._scheduler = scheduler
+
+    @property
+    def rateLimit(self) -> float:
+        """
+        Milliseconds between two requests of weight 1, as in ccxt
+        """
+        return 1000 / self._scheduler.bucket.rate
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._api, name)
+        if name not in ENDPOINTS or not callable(attr):
+            return attr
+        if name == 'load_markets':
+            return self._load_markets
+        return lambda *args, **kwargs: self._scheduler.call(name, attr, *args, **kwargs)
+
+    def _load_markets(self, reload: bool = False, *args, **kwargs) -> Any:
+        if self._api.markets and not reload:
+            # ccxt returns the markets loaded before without any request
+            return self._api.load_markets(reload, *args, **kwargs)
+        return self._scheduler.call('load_markets', self._api.load_markets,
+                                    reload, *args, **kwargs)
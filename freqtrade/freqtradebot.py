@@ -6,8 +6,9 @@ import copy
 import logging
 import time
 import traceback
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, Iterable, List, Optional, Any, Callable, Tuple
 
 import arrow
 import requests
@@ -15,18 +16,35 @@ from cachetools import TTLCache, cached
 
 from freqtrade import (
     DependencyException, OperationalException, TemporaryError,
-    exchange, persistence, __version__,
+    exchange, metrics, persistence, __version__,
 )
 from freqtrade import constants
 from freqtrade.analyze import Analyze
+from freqtrade.exchange import circuit_breaker
+from freqtrade.exchange.circuit_breaker import CircuitOpenError
 from freqtrade.fiat_convert import CryptoToFiatConverter
+from freqtrade.marketdata import IMarketData, MarketDataRecorder, create_market_data
+from freqtrade.order_book import OrderBook
 from freqtrade.persistence import Trade
 from freqtrade.rpc.rpc_manager import RPCManager
 from freqtrade.state import State
+from freqtrade.throttle import AdaptiveThrottle
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def _skip_on_open_circuit(task: str):
+    """
+    Skip a task calling an endpoint whose circuit breaker is open, without stopping
+    the rest of the iteration
+    """
+    try:
+        yield
+    except CircuitOpenError as error:
+        logger.warning('Skipping %s: %s', task, error)
+
+
 class FreqtradeBot(object):
     """
     Freqtrade is the main class of the bot.
@@ -55,6 +73,8 @@ class FreqtradeBot(object):
         self.rpc: RPCManager = RPCManager(self)
         self.persistence = None
         self.exchange = None
+        self.market_data: IMarketData = create_market_data(self.config)
+        self._recorder: Optional[MarketDataRecorder] = None
 
         self._init_modules()
 
@@ -67,6 +87,27 @@ class FreqtradeBot(object):
 
         persistence.init(self.config)
         exchange.init(self.config)
+        exchange.add_breaker_listener(self._notify_breaker_change)
+        metrics.init(self.config)
+        self.throttle: Optional[AdaptiveThrottle] = None
+        internals = self.config.get('internals', {})
+        if internals.get('adaptive_throttle', False):
+            self.throttle = AdaptiveThrottle(
+                [self.analyze.get_ticker_interval()],
+                rate_limit=exchange.get_rate_limit(),
+                candle_delay=internals.get('candle_delay_secs', 2.0),
+                rate_limit_usage=internals.get('rate_limit_usage', 0.5),
+                min_check_secs=internals.get('process_throttle_secs', 1.0),
+            )
+
+        if self.config.get('market_data', {}).get('record', False):
+            self._recorder = MarketDataRecorder(self.config['datadir'])
+            self.market_data.subscribe(self._recorder)
+        if self.market_data.streaming:
+            # Candles pushed by the source are used instead of requesting them
+            self.analyze.market_data = self.market_data
+        self.market_data.start()
+        self.analyze.start_workers(internals.get('signal_workers', 1))
 
         # Set initial application state
         initial_state = self.config.get('initial_state')
@@ -83,9 +124,15 @@ class FreqtradeBot(object):
         """
         logger.info('Cleaning up modules ...')
         self.rpc.cleanup()
+        exchange.remove_breaker_listener(self._notify_breaker_change)
+        self.market_data.stop()
+        self.analyze.stop_workers()
+        if self._recorder:
+            self._recorder.close()
+        metrics.cleanup()
         persistence.cleanup()
 
-    def worker(self, old_state: State = None) -> State:
+    def worker(self, old_state: Optional[State] = None) -> State:
         """
         Trading routine that must be run at each loop
         :param old_state: the previous service state from the previous call
@@ -94,14 +141,7 @@ class FreqtradeBot(object):
         # Log state transition
         state = self.state
         if state != old_state:
-            self.rpc.send_msg(f'*Status:* `{state.name.lower()}`')
-            logger.info('Changing state to: %s', state.name)
-            if (('use_book_order' in self.config['bid_strategy'] and \
-            self.config['bid_strategy'].get('use_book_order', False)) or \
-            ('use_book_order' in self.config['ask_strategy'] and \
-            self.config['ask_strategy'].get('use_book_order', False))) and \
-            self.config['dry_run'] and state == State.RUNNING:
-                self.rpc.send_msg('*Warning:* `Order book enabled in dry run. Results will be misleading`')
+            self._notify_state_change(state)
 
         if state == State.STOPPED:
             time.sleep(1)
@@ -113,11 +153,80 @@ class FreqtradeBot(object):
 
             nb_assets = self.config.get('dynamic_whitelist', None)
 
-            self._throttle(func=self._process,
-                           min_secs=min_secs,
-                           nb_assets=nb_assets)
+            if self.throttle:
+                self._adaptive_process(nb_assets)
+            else:
+                self._throttle(func=self._process,
+                               min_secs=min_secs,
+                               nb_assets=nb_assets)
         return state
 
+    def _adaptive_process(self, nb_assets: Optional[int] = 0) -> bool:
+        """
+        Run a full iteration after each candle close and check the prices of the
+        open trades in between, then sleep until the next one, see AdaptiveThrottle
+        :param: nb_assets: the maximum number of pairs to be traded at the same time
+        :return: True if one or more trades has been created or closed, False otherwise
+        """
+        throttle = self.throttle
+        assert throttle is not None, 'adaptive_throttle is not enabled'
+        start = time.time()
+        if throttle.full_iteration_due(start):
+            throttle.full_iteration_done(start)
+            state_changed = self._process(nb_assets)
+        else:
+            calls = metrics.call_count()
+            state_changed = self._check_open_trades()
+            throttle.check_done(start, time.time() - start, calls)
+
+        open_trades = Trade.query.filter(Trade.is_open.is_(True)).count()
+        time.sleep(throttle.delay(time.time(), checks=open_trades > 0))
+        return state_changed
+
+    def _check_open_trades(self) -> bool:
+        """
+        Check the open trades against the current price only, without sell signal
+        :return: True if a trade has been closed, False otherwise
+        """
+        state_changed = False
+        try:
+            for trade in Trade.query.filter(Trade.is_open.is_(True)).all():
+                with metrics.phase('price_check', trade.pair):
+                    state_changed |= self.process_maybe_execute_sell(trade, (False, False))
+        except TemporaryError as error:
+            logger.warning('%s, retrying at the next price check...', error)
+        except OperationalException:
+            self._stop_on_operational_exception()
+        return state_changed
+
+    def _notify_state_change(self, state: State) -> None:
+        """
+        Log and send the new state of the bot
+        :param state: the new state
+        :return: None
+        """
+        self.rpc.send_msg(f'*Status:* `{state.name.lower()}`')
+        logger.info('Changing state to: %s', state.name)
+        if (('use_book_order' in self.config['bid_strategy'] and \
+        self.config['bid_strategy'].get('use_book_order', False)) or \
+        ('use_book_order' in self.config['ask_strategy'] and \
+        self.config['ask_strategy'].get('use_book_order', False))) and \
+        self.config['dry_run'] and state == State.RUNNING:
+            self.rpc.send_msg('*Warning:* `Order book enabled in dry run. '
+                              'Results will be misleading`')
+
+    def _notify_breaker_change(self, endpoint: str, previous: str, state: str) -> None:
+        """
+        Send the state changes of the circuit breakers of the exchange endpoints
+        :param endpoint: name of the exchange function
+        :param previous: previous state of its breaker
+        :param state: new state of its breaker
+        """
+        if state == circuit_breaker.OPEN:
+            self.rpc.send_msg(f'*Exchange:* `{endpoint}` is failing, circuit breaker opened')
+        elif state == circuit_breaker.CLOSED:
+            self.rpc.send_msg(f'*Exchange:* `{endpoint}` answers again, circuit breaker closed')
+
     def _throttle(self, func: Callable[..., Any], min_secs: float, *args, **kwargs) -> Any:
         """
         Throttles the given callable that it
@@ -143,50 +252,74 @@ class FreqtradeBot(object):
         """
         state_changed = False
         try:
-            # Refresh whitelist based on wallet maintenance
-            sanitized_list = self._refresh_whitelist(
-                self._gen_pair_whitelist(
-                    self.config['stake_currency']
-                ) if nb_assets else self.config['exchange']['pair_whitelist']
-            )
-
-            # Keep only the subsets of pairs wanted (up to nb_assets)
-            final_list = sanitized_list[:nb_assets] if nb_assets else sanitized_list
-            self.config['exchange']['pair_whitelist'] = final_list
+            with metrics.phase('whitelist'):
+                self._update_whitelist(nb_assets)
 
             # Query trades from persistence layer
             trades = Trade.query.filter(Trade.is_open.is_(True)).all()
 
             # First process current opened trades
             for trade in trades:
-                state_changed |= self.process_maybe_execute_sell(trade)
+                with metrics.phase('sell', trade.pair), \
+                        _skip_on_open_circuit(f'the sell of {trade.pair}'):
+                    state_changed |= self.process_maybe_execute_sell(trade)
 
             # Then looking for buy opportunities
             if (self.config.get('disable_buy', False)):
                 logger.info('Buy disabled...')
             else:
                 if len(trades) < self.config['max_open_trades']:
-                    state_changed = self.process_maybe_execute_buy()
+                    with metrics.phase('buy'), _skip_on_open_circuit('the buys'):
+                        state_changed = self.process_maybe_execute_buy()
 
             if 'unfilledtimeout' in self.config:
                 # Check and handle any timed out open orders
                 if not self.config['dry_run']:
-                    self.check_handle_timedout()
-                    Trade.session.flush()
-
+                    with metrics.phase('timeouts'), _skip_on_open_circuit('the order timeouts'):
+                        self.check_handle_timedout()
+                    with metrics.phase('persistence'):
+                        Trade.session.flush()
+
+        except CircuitOpenError as error:
+            # The breaker already keeps the endpoint from being called
+            logger.warning('%s, skipping this iteration...', error)
         except TemporaryError as error:
             logger.warning('%s, retrying in 30 seconds...', error)
             time.sleep(constants.RETRY_TIMEOUT)
         except OperationalException:
-            tb = traceback.format_exc()
-            hint = 'Issue `/start` if you think it is safe to restart.'
-            self.rpc.send_msg(
-                f'*Status:* OperationalException:\n```\n{tb}```{hint}'
-            )
-            logger.exception('OperationalException. Stopping trader ...')
-            self.state = State.STOPPED
+            self._stop_on_operational_exception()
         return state_changed
 
+    def _update_whitelist(self, nb_assets: Optional[int] = 0) -> List[str]:
+        """
+        Refresh the whitelist of the configuration, based on wallet maintenance
+        :param: nb_assets: the maximum number of pairs to be traded at the same time
+        :return: the new whitelist
+        """
+        sanitized_list = self._refresh_whitelist(
+            self._gen_pair_whitelist(
+                self.config['stake_currency']
+            ) if nb_assets else self.config['exchange']['pair_whitelist']
+        )
+
+        # Keep only the subsets of pairs wanted (up to nb_assets)
+        final_list = sanitized_list[:nb_assets] if nb_assets else sanitized_list
+        self.config['exchange']['pair_whitelist'] = final_list
+        return final_list
+
+    def _stop_on_operational_exception(self) -> None:
+        """
+        Stop the bot, to be called while handling an OperationalException
+        :return: None
+        """
+        tb = traceback.format_exc()
+        hint = 'Issue `/start` if you think it is safe to restart.'
+        self.rpc.send_msg(
+            f'*Status:* OperationalException:\n```\n{tb}```{hint}'
+        )
+        logger.exception('OperationalException. Stopping trader ...')
+        self.state = State.STOPPED
+
     @cached(TTLCache(maxsize=1, ttl=1800))
     def _gen_pair_whitelist(self, base_currency: str, key: str = 'quoteVolume') -> List[str]:
         """
@@ -219,9 +352,7 @@ class FreqtradeBot(object):
         black_listed
         """
         sanitized_whitelist = whitelist
-        markets = exchange.get_markets()
-
-        markets = [m for m in markets if m['quote'] == self.config['stake_currency']]
+        markets = exchange.get_markets_by_quote(self.config['stake_currency'])
         known_pairs = set()
         for market in markets:
             pair = market['symbol']
@@ -249,7 +380,7 @@ class FreqtradeBot(object):
         :param ticker: Ticker to use for getting Ask and Last Price
         :return: float: Price
         """
-        ticker = exchange.get_ticker(pair)
+        ticker = self.market_data.get_ticker(pair)
         logger.debug('ticker data %s', ticker)
 
         if ticker['ask'] < ticker['last']:
@@ -263,9 +394,8 @@ class FreqtradeBot(object):
         if 'use_book_order' in self.config['bid_strategy'] and self.config['bid_strategy'].get('use_book_order', False):
             logger.info('Getting price from Order Book')
             orderBook_top = self.config.get('bid_strategy', {}).get('book_order_top', 1)
-            orderBook = exchange.get_order_book(pair, orderBook_top)
-            # top 1 = index 0
-            orderBook_rate = orderBook['bids'][orderBook_top - 1][0]
+            orderBook = OrderBook.from_dict(self.market_data.get_order_book(pair, orderBook_top))
+            orderBook_rate = orderBook.bid(orderBook_top)
             orderBook_rate = orderBook_rate + 0.00000001
             # if ticker has lower rate, then use ticker ( usefull if down trending )
             logger.info('...book order buy rate %0.8f', orderBook_rate)
@@ -284,10 +414,12 @@ class FreqtradeBot(object):
 
         return used_rate
 
-    def create_trade(self) -> bool:
+    def create_trade(self, signals: Optional[Dict[str, Tuple[bool, bool]]] = None) -> bool:
         """
         Checks the implemented trading indicator(s) for a randomly picked pair,
         if one pair triggers the buy_signal a new trade record gets created
+        :param signals: signals already computed for the whitelist, the pairs missing
+        from it are not traded
         :return: True if a trade object has been created and persisted, False otherwise
         """
         stake_amount = self.config['stake_amount']
@@ -319,22 +451,27 @@ class FreqtradeBot(object):
             raise DependencyException('No currency pairs in whitelist')
 
         # Pick pair based on buy signals
-        for _pair in whitelist:
-            (buy, sell) = self.analyze.get_signal(_pair, interval)
+        pair_signals: Iterable[Tuple[str, Tuple[bool, bool]]]
+        if signals is None:
+            workers = self.config.get('internals', {}).get('signal_workers', 1)
+            pair_signals = zip(whitelist, self.analyze.get_signals(whitelist, interval, workers))
+        else:
+            pair_signals = ((pair, signals[pair]) for pair in whitelist if pair in signals)
+        for _pair, (buy, sell) in pair_signals:
             if buy and not sell:
                 # order book depth of market
                 if self.config.get('experimental', {}).get('check_depth_of_market', False) \
                 and (self.config.get('experimental', {}).get('dom_bids_asks_delta', 0) > 0):
                     logger.info('depth of market check for %s', _pair)
-                    orderBook = exchange.get_order_book(_pair, 1000)
-                    orderBook_df = self.analyze.order_book_to_dataframe(orderBook)
-                    orderBook_bids = orderBook_df['b_size'].sum()
-                    orderBook_asks = orderBook_df['a_size'].sum()
-                    logger.info('bids: %s, asks: %s, delta: %s', orderBook_bids, orderBook_asks, orderBook_bids / orderBook_asks)
-                    if (orderBook_bids / orderBook_asks) >= self.config.get('experimental', {}).get('dom_bids_asks_delta', 0):
+                    orderBook = OrderBook.from_dict(self.market_data.get_order_book(_pair, 1000))
+                    bids_asks_delta = orderBook.bids_asks_ratio()
+                    logger.info('bids: %s, asks: %s, delta: %s',
+                                orderBook.bid_volume, orderBook.ask_volume, bids_asks_delta)
+                    if bids_asks_delta >= \
+                            self.config.get('experimental', {}).get('dom_bids_asks_delta', 0):
                         # check if price is below average of 24h high low
                         if self.config.get('experimental', {}).get('buy_price_below_24h_h_l', False):
-                            pair_ticker = exchange.get_ticker(_pair)
+                            pair_ticker = self.market_data.get_ticker(_pair)
                             logger.info('checking ask price if below 24h high %s and low %s average...', pair_ticker['high'], pair_ticker['low'])
                             if pair_ticker['ask'] > ((pair_ticker['high']+pair_ticker['low'])/2):
                                 pair = _pair
@@ -385,14 +522,16 @@ with limit `{buy_limit:.8f} ({stake_amount:.6f} \
         Trade.session.flush()
         return True
 
-    def process_maybe_execute_buy(self) -> bool:
+    def process_maybe_execute_buy(self,
+                                  signals: Optional[Dict[str, Tuple[bool, bool]]] = None) -> bool:
         """
         Tries to execute a buy trade in a safe way
+        :param signals: signals already computed for the whitelist, see create_trade()
         :return: True if executed
         """
         try:
             # Create entity and execute trade
-            if self.create_trade():
+            if self.create_trade(signals):
                 return True
 
             logger.info('Found no buy signals for whitelisted currencies. Trying again..')
@@ -401,9 +540,11 @@ with limit `{buy_limit:.8f} ({stake_amount:.6f} \
             logger.warning('Unable to create trade: %s', exception)
             return False
 
-    def process_maybe_execute_sell(self, trade: Trade) -> bool:
+    def process_maybe_execute_sell(self, trade: Trade,
+                                   signal: Optional[Tuple[bool, bool]] = None) -> bool:
         """
         Tries to execute a sell trade
+        :param signal: signal already computed for the pair of the trade
         :return: True if executed
         """
         try:
@@ -427,7 +568,7 @@ with limit `{buy_limit:.8f} ({stake_amount:.6f} \
 
             if trade.is_open and trade.open_order_id is None:
                 # Check if we can sell our current pair
-                return self.handle_trade(trade)
+                return self.handle_trade(trade, signal)
         except DependencyException as exception:
             logger.warning('Unable to sell trade: %s', exception)
         return False
@@ -474,21 +615,24 @@ with limit `{buy_limit:.8f} ({stake_amount:.6f} \
 (from {order_amount} to {real_amount}) from Trades""")
         return real_amount
 
-    def handle_trade(self, trade: Trade) -> bool:
+    def handle_trade(self, trade: Trade, signal: Optional[Tuple[bool, bool]] = None) -> bool:
         """
         Sells the current pair if the threshold is reached and updates the trade record.
+        :param signal: signal already computed for the pair, used instead of analyzing it
         :return: True if trade has been sold, False otherwise
         """
         if not trade.is_open:
             raise ValueError(f'attempt to handle closed trade: {trade}')
 
         logger.info('Handling %s ...', trade)
-        sell_rate = exchange.get_ticker(trade.pair)['bid']
+        sell_rate = self.market_data.get_ticker(trade.pair)['bid']
         logger.info(' ticker rate %0.8f', sell_rate)
         (buy, sell) = (False, False)
 
         if self.config.get('experimental', {}).get('use_sell_signal'):
-            (buy, sell) = self.analyze.get_signal(trade.pair, self.analyze.get_ticker_interval())
+            if signal is None:
+                signal = self.analyze.get_signal(trade.pair, self.analyze.get_ticker_interval())
+            (buy, sell) = signal
 
         is_set_fullfilled_at_roi = self.config.get('experimental', {}).get('sell_fullfilled_at_roi', False)
         if is_set_fullfilled_at_roi:
@@ -500,10 +644,11 @@ with limit `{buy_limit:.8f} ({stake_amount:.6f} \
             orderBook_min = self.config['ask_strategy'].get('book_order_min', 1)
             orderBook_max = self.config['ask_strategy'].get('book_order_max', 1)
 
-            orderBook = exchange.get_order_book(trade.pair, orderBook_max)
+            orderBook = OrderBook.from_dict(
+                self.market_data.get_order_book(trade.pair, orderBook_max))
 
             for i in range(orderBook_min, orderBook_max + 1):
-                orderBook_rate = orderBook['asks'][i - 1][0]
+                orderBook_rate = orderBook.ask(i)
 
                 # if orderbook has higher rate (high profit),
                 # use orderbook, otherwise just use bids rate
@@ -632,7 +777,7 @@ with limit `{buy_limit:.8f} ({stake_amount:.6f} \
 
         fmt_exp_profit = round(trade.calc_profit_percent(rate=limit) * 100, 2)
         profit_trade = trade.calc_profit(rate=limit)
-        current_rate = exchange.get_ticker(trade.pair)['bid']
+        current_rate = self.market_data.get_ticker(trade.pair)['bid']
         profit = trade.calc_profit_percent(limit)
         pair_url = exchange.get_pair_detail_url(trade.pair)
         gain = "profit" if fmt_exp_profit > 0 else "loss"
@@ -1,8 +1,9 @@
 from math import exp, pi, sqrt, cos
+from typing import Optional
 
 import numpy as np
 import talib as ta
-from pandas import Series
+from pandas import DataFrame, Series
 
 
 def went_up(series: Series) -> bool:
@@ -38,3 +39,45 @@ def fishers_inverse(series: Series, smoothing: float = 0) -> np.ndarray:
     else:
         v2 = v1
     return (np.exp(2 * v2)-1) / (np.exp(2 * v2) + 1)
+
+
+def _tail_or_none(dataframe: DataFrame, column: str, start: int,
+                  warmup: int) -> Optional[np.ndarray]:
+    """ Previous value of column followed by room for the rows from start onwards,
+        None if there is no valid previous value to continue from """
+    if column not in dataframe or start < warmup:
+        return None
+    values = dataframe[column].values[start - 1:].astype(float)
+    if np.isnan(values[0]):
+        return None
+    return values
+
+
+def ema_update(dataframe: DataFrame, source: str, target: str, period: int, start: int) -> None:
+    """ Fills the exponential moving average of source into target from the row start onwards,
+        continuing the values computed before it: O(1) per new row.
+        Uses the recurrence of talib's EMA, which is computed in full when there is nothing to
+        continue from. """
+    values = _tail_or_none(dataframe, target, start, period)
+    if values is None:
+        dataframe[target] = ta.EMA(dataframe[source].values.astype(float), timeperiod=period)
+        return
+    source_values = dataframe[source].values[start:]
+    alpha = 2.0 / (period + 1)
+    for i, value in enumerate(source_values, start=1):
+        values[i] = values[i - 1] + alpha * (value - values[i - 1])
+    dataframe.iloc[start:, dataframe.columns.get_loc(target)] = values[1:]
+
+
+def sma_update(dataframe: DataFrame, source: str, target: str, period: int, start: int) -> None:
+    """ Fills the simple moving average of source into target from the row start onwards,
+        continuing the values computed before it: O(1) per new row """
+    values = _tail_or_none(dataframe, target, start, period)
+    if values is None:
+        dataframe[target] = ta.SMA(dataframe[source].values.astype(float), timeperiod=period)
+        return
+    source_values = dataframe[source].values
+    for i in range(start, len(dataframe)):
+        values[i - start + 1] = values[i - start] + \
+            (source_values[i] - source_values[i - period]) / period
+    dataframe.iloc[start:, dataframe.columns.get_loc(target)] = values[1:]
@@ -6,14 +6,15 @@ Read the documentation to know what cli arguments you need.
 import logging
 import sys
 from argparse import Namespace
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 
 from freqtrade import OperationalException
 from freqtrade.arguments import Arguments
-from freqtrade.configuration import Configuration
-from freqtrade.freqtradebot import FreqtradeBot
 from freqtrade.state import State
 
+if TYPE_CHECKING:
+    from freqtrade.freqtradebot import FreqtradeBot
+
 logger = logging.getLogger('freqtrade')
 
 
@@ -34,6 +35,11 @@ def main(sysargv: List[str]) -> None:
         args.func(args)
         return
 
+    # Imported once we know the bot is started: the subcommands and --help do not
+    # need ccxt, telegram or sqlalchemy
+    from freqtrade.configuration import Configuration
+    from freqtrade.freqtradebot import FreqtradeBot
+
     freqtrade = None
     return_code = 1
     try:
@@ -43,9 +49,13 @@ def main(sysargv: List[str]) -> None:
         # Init the bot
         freqtrade = FreqtradeBot(config)
 
-        state = None
+        state: Optional[State] = None
         while 1:
-            state = freqtrade.worker(old_state=state)
+            if freqtrade.config.get('internals', {}).get('asyncio', False):
+                from freqtrade.async_worker import AsyncWorker
+                state = AsyncWorker(freqtrade).run(old_state=state)
+            else:
+                state = freqtrade.worker(old_state=state)
             if state == State.RELOAD_CONF:
                 freqtrade = reconfigure(freqtrade, args)
 
@@ -64,10 +74,13 @@ def main(sysargv: List[str]) -> None:
         sys.exit(return_code)
 
 
-def reconfigure(freqtrade: FreqtradeBot, args: Namespace) -> FreqtradeBot:
+def reconfigure(freqtrade: 'FreqtradeBot', args: Namespace) -> 'FreqtradeBot':
     """
     Cleans up current instance, reloads the configuration and returns the new instance
     """
+    from freqtrade.configuration import Configuration
+    from freqtrade.freqtradebot import FreqtradeBot
+
     # Clean up current modules
     freqtrade.cleanup()
 
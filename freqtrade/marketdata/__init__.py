@@ -0,0 +1,37 @@
+"""
+Market data sources of the bot
+"""
+from typing import Any, Dict
+
+from freqtrade.marketdata.interface import (CANDLE, ORDER_BOOK, TICKER,  # noqa: F401
+                                            IMarketData, MarketEvent)
+from freqtrade.marketdata.polling import PollingMarketData
+from freqtrade.marketdata.replay import MarketDataRecorder, ReplayMarketData  # noqa: F401
+from freqtrade.marketdata.streaming import DEFAULT_MAX_CANDLES, StreamingMarketData  # noqa: F401
+from freqtrade.order_book_cache import DEPTHS, OrderBookCache
+
+
+def create_market_data(config: Dict[str, Any]) -> IMarketData:
+    """
+    Create the market data source selected in the market_data section of the config
+    :param config: the bot configuration
+    :return: a source which is not started yet
+    """
+    conf = config.get('market_data', {})
+    source = conf.get('source', 'polling')
+    if source == 'replay':
+        return ReplayMarketData(
+            datadir=conf.get('replay_dir', config.get('datadir')),
+            pairs=config['exchange']['pair_whitelist'],
+            tick_interval=config['ticker_interval'],
+            speed=conf.get('speed', 1.0),
+            max_candles=conf.get('max_candles', DEFAULT_MAX_CANDLES),
+        )
+    order_book_ttl = config.get('internals', {}).get('order_book_ttl', 0)
+    order_book_cache = None
+    if order_book_ttl:
+        order_book_cache = OrderBookCache(
+            order_book_ttl,
+            min_depth=config.get('internals', {}).get('order_book_depth', DEPTHS[0])
+        )
+    return PollingMarketData(order_book_cache)
@@ -0,0 +1,89 @@
+"""
+IMarketData interface
+This module defines the interface of the market data sources used by the bot
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Kinds of market events
+CANDLE = 'candle'
+TICKER = 'ticker'
+ORDER_BOOK = 'order_book'
+
+
+class MarketEvent(NamedTuple):
+    """
+    Market data received for a pair
+    kind -> str: CANDLE, TICKER or ORDER_BOOK
+    interval -> str: ticker interval of a CANDLE, None otherwise
+    data: a candle as in exchange.get_ticker_history(), a ticker as in
+          exchange.get_ticker() or an order book as in exchange.get_order_book()
+    """
+    kind: str
+    pair: str
+    interval: Optional[str]
+    data: object
+
+
+class IMarketData(ABC):
+    """
+    Source of candles, tickers and order books.
+    The getters return the latest data, events are pushed to the subscribers
+    as soon as the source receives them.
+    """
+
+    # True if the data is pushed by the source rather than requested by the bot
+    streaming: bool = False
+
+    def __init__(self) -> None:
+        self._subscribers: List[Callable[[MarketEvent], None]] = []
+
+    def subscribe(self, callback: Callable[[MarketEvent], None]) -> None:
+        """
+        Call callback with every new event, from the thread which received it
+        """
+        self._subscribers.append(callback)
+
+    def publish(self, event: MarketEvent) -> None:
+        """
+        Push an event to the subscribers
+        """
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception('Market data subscriber failed on %s event for %s',
+                                 event.kind, event.pair)
+
+    def start(self) -> None:
+        """
+        Start receiving data
+        """
+        pass
+
+    def stop(self) -> None:
+        """
+        Stop receiving data
+        """
+        pass
+
+    @abstractmethod
+    def get_ticker(self, pair: str, refresh: Optional[bool] = True) -> Dict:
+        """
+        Latest ticker of a pair, see exchange.get_ticker()
+        """
+
+    @abstractmethod
+    def get_ticker_history(self, pair: str, tick_interval: str) -> List:
+        """
+        Latest candles of a pair, oldest first, see exchange.get_ticker_history()
+        """
+
+    @abstractmethod
+    def get_order_book(self, pair: str, limit: Optional[int] = 100) -> Dict:
+        """
+        Latest order book of a pair, see exchange.get_order_book()
+        """
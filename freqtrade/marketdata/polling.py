@@ -0,0 +1,48 @@
+"""
+Market data requested from the exchange, as the bot always did
+"""
+import logging
+from typing import Dict, List, Optional
+
+from freqtrade import exchange
+from freqtrade.marketdata.interface import CANDLE, TICKER, IMarketData, MarketEvent
+from freqtrade.order_book_cache import DEPTHS, OrderBookCache
+
+logger = logging.getLogger(__name__)
+
+
+class PollingMarketData(IMarketData):
+    """
+    Requests every piece of data from the exchange module when it is needed
+    """
+
+    def __init__(self, order_book_cache: Optional[OrderBookCache] = None) -> None:
+        """
+        :param order_book_cache: cache of the order books, they are always requested if None
+        """
+        super().__init__()
+        self.order_book_cache = order_book_cache
+
+    def get_ticker(self, pair: str, refresh: Optional[bool] = True) -> Dict:
+        if refresh:
+            return exchange.get_ticker(pair)
+        return exchange.get_ticker(pair, refresh)
+
+    def get_ticker_history(self, pair: str, tick_interval: str) -> List:
+        return exchange.get_ticker_history(pair, tick_interval)
+
+    def get_order_book(self, pair: str, limit: Optional[int] = 100) -> Dict:
+        if self.order_book_cache:
+            # None requests the whole book, the cache fetches at most its deepest level
+            return self.order_book_cache.get(pair, DEPTHS[-1] if limit is None else limit)
+        return exchange.get_order_book(pair, limit)
+
+    def poll(self, pairs: List[str], tick_interval: str) -> None:
+        """
+        Request the ticker and latest candle of the pairs and publish them
+        """
+        for pair in pairs:
+            self.publish(MarketEvent(TICKER, pair, None, self.get_ticker(pair)))
+            candles = self.get_ticker_history(pair, tick_interval)
+            if candles:
+                self.publish(MarketEvent(CANDLE, pair, tick_interval, candles[-1]))
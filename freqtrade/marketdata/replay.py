@@ -0,0 +1,166 @@
+"""
+Market data replayed from files, to run the bot offline.
+
+The candles are read from the backtesting data directory and each one is sent
+when it closes. Tickers and order books recorded by a MarketDataRecorder are
+read from market_events.jsonl in the same directory, one message per line with
+its 'time' in milliseconds. A ticker is made up from the close of every candle
+of a pair without recorded tickers.
+"""
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+from freqtrade import constants, optimize
+from freqtrade.marketdata.interface import CANDLE, TICKER, IMarketData, MarketEvent
+from freqtrade.marketdata.streaming import DEFAULT_MAX_CANDLES, StreamingMarketData
+from freqtrade.optimize import datastore
+
+logger = logging.getLogger(__name__)
+
+EVENTS_FILE = 'market_events.jsonl'
+
+
+class ReplayMarketData(StreamingMarketData):
+    """
+    Streams recorded market data, in real time or faster
+    """
+
+    def __init__(self, datadir: str, pairs: List[str], tick_interval: str,
+                 speed: float = 1.0, rebase: bool = True,
+                 fallback: Optional[IMarketData] = None,
+                 max_candles: int = DEFAULT_MAX_CANDLES) -> None:
+        """
+        :param datadir: directory of the candle files and of market_events.jsonl
+        :param pairs: pairs to replay
+        :param tick_interval: interval of the candles to replay
+        :param speed: replay speed, 10 sends the data of 10 seconds every second,
+                      0 sends everything without waiting
+        :param rebase: shift the dates so that the replay starts now
+        :param fallback: source of the data which was not recorded
+        :param max_candles: maximum number of candles kept per pair
+        """
+        super().__init__(fallback=fallback, max_candles=max_candles)
+        self.datadir = datadir
+        self.pairs = pairs
+        self.tick_interval = tick_interval
+        self.speed = speed
+        self.rebase = rebase
+        # Set once every message has been sent
+        self.finished = threading.Event()
+        self.feed = self.messages()
+
+    def run(self) -> None:
+        """
+        Replay every message in the calling thread
+        """
+        for message in self.messages():
+            self.on_message(message)
+        self.finished.set()
+
+    def _consume(self) -> None:
+        super()._consume()
+        self.finished.set()
+
+    def messages(self) -> Iterator[Dict]:
+        """
+        Messages in the order they were received, paced according to the speed
+        """
+        offset = None
+        started = time.monotonic()
+        for msg_time, message in heapq.merge(self._candle_messages(), self._recorded_messages(),
+                                             key=lambda item: item[0]):
+            if offset is None:
+                first_time = msg_time
+                offset = int(time.time() * 1000) - msg_time if self.rebase else 0
+            if self.speed > 0:
+                delay = (msg_time - first_time) / 1000 / self.speed - \
+                    (time.monotonic() - started)
+                if delay > 0 and self._stopped.wait(delay):
+                    return
+            if offset and message['type'] == CANDLE:
+                message = dict(message, data=[message['data'][0] + offset] + message['data'][1:])
+            yield message
+
+    def _candle_messages(self) -> Iterator[Tuple[int, Dict]]:
+        """
+        (close time, message) of every candle, with a ticker when none was recorded
+        """
+        interval_ms = constants.TICKER_INTERVAL_MINUTES[self.tick_interval] * 60 * 1000
+        recorded_tickers = self._recorded_ticker_pairs()
+        streams = []
+        for pair in self.pairs:
+            data = optimize.load_tickerdata_file(self.datadir, pair, self.tick_interval)
+            candles: List[List] = datastore.columns_to_tickerlist(data) \
+                if isinstance(data, dict) else list(data or [])
+            if not candles:
+                logger.warning('No candles to replay for %s', pair)
+                continue
+            streams.append(self._pair_messages(pair, candles, interval_ms,
+                                               pair not in recorded_tickers))
+        return heapq.merge(*streams, key=lambda item: item[0])
+
+    def _pair_messages(self, pair: str, candles: List[List], interval_ms: int,
+                       with_ticker: bool) -> Iterator[Tuple[int, Dict]]:
+        for candle in candles:
+            close_time = candle[0] + interval_ms
+            yield close_time, {'type': CANDLE, 'pair': pair,
+                               'interval': self.tick_interval, 'data': candle}
+            if with_ticker:
+                close = candle[4]
+                yield close_time, {'type': TICKER, 'pair': pair,
+                                   'data': {'bid': close, 'ask': close, 'last': close}}
+
+    def _events_path(self) -> str:
+        return os.path.join(optimize.make_testdata_path(self.datadir), EVENTS_FILE)
+
+    def _recorded_messages(self) -> Iterator[Tuple[int, Dict]]:
+        """
+        (time, message) of the recorded messages of the replayed pairs
+        """
+        path = self._events_path()
+        if not os.path.isfile(path):
+            return
+        with open(path) as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message['pair'] in self.pairs and message['type'] != CANDLE:
+                    yield message.pop('time'), message
+
+    def _recorded_ticker_pairs(self) -> set:
+        return {message['pair'] for _, message in self._recorded_messages()
+                if message['type'] == TICKER}
+
+
+class MarketDataRecorder(object):
+    """
+    Subscriber writing the tickers and order books of a source to market_events.jsonl,
+    to be replayed by ReplayMarketData. Candles are downloaded with --refresh-pairs-cached.
+    """
+
+    def __init__(self, datadir: str) -> None:
+        """
+        :param datadir: directory to write market_events.jsonl to
+        """
+        path = os.path.join(optimize.make_testdata_path(datadir), EVENTS_FILE)
+        self._file: IO = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def __call__(self, event: MarketEvent) -> None:
+        if event.kind == CANDLE:
+            return
+        line = json.dumps({'time': int(time.time() * 1000), 'type': event.kind,
+                           'pair': event.pair, 'data': event.data})
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
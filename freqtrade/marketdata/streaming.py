@@ -0,0 +1,150 @@
+"""
+Market data pushed by a feed, e.g. the messages of an exchange websocket.
+
+Messages are dicts like:
+    {'type': 'candle', 'pair': 'ETH/BTC', 'interval': '5m',
+     'data': [1514764800000, 0.05, 0.051, 0.049, 0.0505, 123.4]}
+    {'type': 'ticker', 'pair': 'ETH/BTC', 'data': {'bid': 0.05, 'ask': 0.0501, 'last': 0.05}}
+    {'type': 'order_book', 'pair': 'ETH/BTC', 'data': {'bids': [[0.05, 1.2]], 'asks': [...]}}
+A candle message with the date of the latest candle replaces it, the running
+candle is usually sent several times.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from freqtrade import DependencyException
+from freqtrade.marketdata.interface import (CANDLE, ORDER_BOOK, TICKER, IMarketData,
+                                            MarketEvent)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CANDLES = 1000
+
+
+class StreamingMarketData(IMarketData):
+    """
+    Keeps the latest data received from a feed, data not received yet is
+    requested from the fallback source
+    """
+
+    streaming = True
+
+    def __init__(self, feed: Optional[Iterable[Dict]] = None,
+                 fallback: Optional[IMarketData] = None,
+                 max_candles: int = DEFAULT_MAX_CANDLES) -> None:
+        """
+        :param feed: messages to consume in a background thread once started,
+                     on_message() can also be called directly
+        :param fallback: source of the data which was not received
+        :param max_candles: maximum number of candles kept per pair and interval
+        """
+        super().__init__()
+        self.feed = feed
+        self.fallback = fallback
+        self.max_candles = max_candles
+        self._candles: Dict[Tuple[str, str], List] = {}
+        # Candle buffers completed with the history of the fallback source
+        self._seeded: Set[Tuple[str, str]] = set()
+        self._tickers: Dict[str, Dict] = {}
+        self._order_books: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.feed is None or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._consume, name='marketdata', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _consume(self) -> None:
+        """
+        Feed every message to on_message() until stopped
+        """
+        feed = self.feed
+        if feed is None:
+            return
+        try:
+            for message in feed:
+                if self._stopped.is_set():
+                    break
+                self.on_message(message)
+        except Exception:
+            logger.exception('Market data feed failed')
+        logger.info('Market data feed ended')
+
+    def on_message(self, message: Dict) -> None:
+        """
+        Store the data of a message and publish it
+        """
+        kind = message['type']
+        pair = message['pair']
+        data = message['data']
+        interval = message.get('interval')
+        with self._lock:
+            if kind == CANDLE:
+                if interval is None:
+                    logger.warning('Ignoring candle of %s without interval', pair)
+                    return
+                self._add_candle(pair, interval, data)
+            elif kind == TICKER:
+                self._tickers[pair] = data
+            elif kind == ORDER_BOOK:
+                self._order_books[pair] = data
+            else:
+                logger.warning('Ignoring market data message of type %s', kind)
+                return
+        self.publish(MarketEvent(kind, pair, interval, data))
+
+    def _add_candle(self, pair: str, interval: str, candle: List) -> None:
+        candles = self._candles.setdefault((pair, interval), [])
+        if candles and candles[-1][0] == candle[0]:
+            candles[-1] = candle
+        elif not candles or candles[-1][0] < candle[0]:
+            candles.append(candle)
+            if len(candles) > self.max_candles:
+                del candles[:len(candles) - self.max_candles]
+        else:
+            logger.debug('Ignoring outdated candle %s of %s', candle[0], pair)
+
+    def get_ticker(self, pair: str, refresh: Optional[bool] = True) -> Dict:
+        ticker = self._tickers.get(pair)
+        if ticker is None:
+            return self._fallback('get_ticker', pair, refresh)
+        return ticker
+
+    def get_ticker_history(self, pair: str, tick_interval: str) -> List:
+        key = (pair, tick_interval)
+        if self.fallback is not None and key not in self._seeded:
+            # The feed only sends new candles, the history is requested once
+            history = self.fallback.get_ticker_history(pair, tick_interval)
+            with self._lock:
+                candles = self._candles.get(key, [])
+                if candles:
+                    history = [candle for candle in history if candle[0] < candles[0][0]]
+                self._candles[key] = (history + candles)[-self.max_candles:]
+                self._seeded.add(key)
+        with self._lock:
+            return list(self._candles.get(key, []))
+
+    def get_order_book(self, pair: str, limit: Optional[int] = 100) -> Dict:
+        book = self._order_books.get(pair)
+        if book is None:
+            return self._fallback('get_order_book', pair, limit)
+        return {'bids': book['bids'][:limit], 'asks': book['asks'][:limit]}
+
+    def _fallback(self, method: str, pair: str, *args) -> Dict:
+        """
+        Request data which was not received from the fallback source
+        """
+        if self.fallback is None:
+            raise DependencyException(f'No {method[4:]} received for {pair} yet')
+        return getattr(self.fallback, method)(pair, *args)
@@ -0,0 +1,352 @@
+"""
+Latency metrics of the trading loop and of the exchange calls.
+
+When enabled in the metrics section of the config, the phases of each
+iteration (whitelist refresh, signals, buys, sells, open order checks,
+database flush, RPC messages) and every exchange call are timed into
+histograms labelled by phase or endpoint and by pair. They are exposed in the
+Prometheus text format over HTTP on localhost and/or written to a file.
+When disabled, timer() returns a shared no-op context manager and only the
+number of exchange calls is counted.
+"""
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PHASE = 'freqtrade_loop_phase_seconds'
+EXCHANGE_CALL = 'freqtrade_exchange_call_seconds'
+EXCHANGE_ERRORS = 'freqtrade_exchange_errors_total'
+THROTTLE_SLEEP = 'freqtrade_throttle_sleep_seconds'
+THROTTLE_CHECK_INTERVAL = 'freqtrade_throttle_check_interval_seconds'
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_HELP = {
+    PHASE: 'Duration of the phases of the trading loop',
+    EXCHANGE_CALL: 'Duration of the exchange calls',
+    EXCHANGE_ERRORS: 'Number of failed exchange calls',
+    THROTTLE_SLEEP: 'Time slept by the throttle before an iteration',
+    THROTTLE_CHECK_INTERVAL: 'Interval between two price checks chosen by the adaptive throttle',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram(object):
+    """
+    Cumulative histogram of durations
+    """
+
+    def __init__(self) -> None:
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class Registry(object):
+    """
+    Histograms and counters by metric name and labels
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def gauge(self, name: str, **labels: str) -> Optional[float]:
+        return self._gauges.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def render(self) -> str:
+        """
+        All the metrics in the Prometheus text exposition format
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, histograms in sorted(self._histograms.items()):
+                lines += _header(name, 'histogram')
+                for labels, histogram in sorted(histograms.items()):
+                    cumulated = 0
+                    for bound, count in zip(BUCKETS, histogram.buckets):
+                        cumulated += count
+                        lines.append(f'{name}_bucket{_labels(labels, le=repr(bound))} '
+                                     f'{cumulated}')
+                    lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {histogram.count}')
+                    lines.append(f'{name}_sum{_labels(labels)} {histogram.sum}')
+                    lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+            for kind, by_name in (('counter', self._counters), ('gauge', self._gauges)):
+                for name, values in sorted(by_name.items()):
+                    lines += _header(name, kind)
+                    for labels, value in sorted(values.items()):
+                        lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _header(name: str, kind: str) -> List[str]:
+    return [f'# HELP {name} {_HELP.get(name, name)}', f'# TYPE {name} {kind}']
+
+
+def _labels(labels: Labels, **extra: str) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(key, str(value).replace('"', '\\"'))
+                          for key, value in items) + '}'
+
+
+class _Timer(object):
+    """
+    Context manager adding its duration to a histogram
+    """
+
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name: str, labels: Dict[str, str]) -> None:
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if _REGISTRY is not None:
+            _REGISTRY.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer(object):
+    """
+    Context manager doing nothing, used when the metrics are disabled
+    """
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+# Current registry, None when the metrics are disabled
+_REGISTRY: Optional[Registry] = None
+_SERVER: Optional[HTTPServer] = None
+_WRITER_STOP: Optional[threading.Event] = None
+_FILE: Optional[str] = None
+# Number of exchange calls, counted even when the metrics are disabled
+_CALLS = 0
+
+
+def enabled() -> bool:
+    return _REGISTRY is not None
+
+
+def registry() -> Optional[Registry]:
+    return _REGISTRY
+
+
+def timer(name: str, **labels: str) -> Any:
+    """
+    Time the enclosed block into the histogram name, e.g.
+        with metrics.timer(metrics.PHASE, phase='whitelist'):
+            ...
+    """
+    if _REGISTRY is None:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def phase(name: str, pair: str = '') -> Any:
+    """
+    Time a phase of the trading loop, optionally for a pair
+    """
+    if _REGISTRY is None:
+        return _NULL_TIMER
+    return _Timer(PHASE, {'phase': name, 'pair': pair} if pair else {'phase': name})
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    """
+    Add a value to the histogram name
+    """
+    if _REGISTRY is not None:
+        _REGISTRY.observe(name, value, **labels)
+
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    """
+    Add a value to the counter name
+    """
+    if _REGISTRY is not None:
+        _REGISTRY.inc(name, value, **labels)
+
+
+def gauge(name: str, value: float, **labels: str) -> None:
+    """
+    Set the current value of the gauge name
+    """
+    if _REGISTRY is not None:
+        _REGISTRY.set(name, value, **labels)
+
+
+def call_count() -> int:
+    """
+    Number of exchange calls made since the start
+    """
+    return _CALLS
+
+
+def _pair_of(args: tuple, kwargs: dict) -> str:
+    for arg in args:
+        if isinstance(arg, str) and '/' in arg:
+            return arg
+    return kwargs.get('pair') or kwargs.get('symbol') or ''
+
+
+def measured(f: Callable) -> Callable:
+    """
+    Decorator timing an exchange call and counting its failures, by endpoint and pair
+    """
+    def wrapper(*args, **kwargs):
+        global _CALLS
+        _CALLS += 1
+        if _REGISTRY is None:
+            return f(*args, **kwargs)
+        labels = {'endpoint': f.__name__, 'pair': _pair_of(args, kwargs)}
+        start = time.perf_counter()
+        try:
+            return f(*args, **kwargs)
+        except BaseException as error:
+            # The exceptions of freqtrade derive from BaseException
+            _REGISTRY.inc(EXCHANGE_ERRORS, error=error.__class__.__name__, **labels)
+            raise
+        finally:
+            _REGISTRY.observe(EXCHANGE_CALL, time.perf_counter() - start, **labels)
+
+    wrapper.__name__ = f.__name__
+    wrapper.__doc__ = f.__doc__
+    return wrapper
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        if _REGISTRY is None:
+            self.send_error(503)
+            return
+        body = _REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug('Metrics request: ' + format, *args)
+
+
+def write(path: str) -> None:
+    """
+    Write the metrics to a file, replacing it atomically
+    """
+    if _REGISTRY is None:
+        return
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        file.write(_REGISTRY.render())
+    os.replace(tmp_path, path)
+
+
+def _write_periodically(path: str, interval: float, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            write(path)
+        except OSError as error:
+            logger.warning('Could not write the metrics to %s: %s', path, error)
+
+
+def init(config: dict) -> None:
+    """
+    Enable the metrics and start their exporters if the config asks for it
+    :param config: config to use
+    :return: None
+    """
+    global _REGISTRY, _SERVER, _WRITER_STOP, _FILE
+    cleanup()
+    conf = config.get('metrics', {})
+    if not conf.get('enabled', False):
+        return
+
+    _REGISTRY = Registry()
+    if 'listen_port' in conf:
+        _SERVER = HTTPServer((conf.get('listen_address', '127.0.0.1'), conf['listen_port']),
+                             _Handler)
+        threading.Thread(target=_SERVER.serve_forever, name='metrics', daemon=True).start()
+        logger.info('Serving metrics on http://%s:%s/metrics', *_SERVER.server_address)
+    if conf.get('file'):
+        _FILE = conf['file']
+        _WRITER_STOP = threading.Event()
+        threading.Thread(target=_write_periodically, name='metrics-writer', daemon=True,
+                         args=(conf['file'], conf.get('write_interval', 60), _WRITER_STOP)
+                         ).start()
+        logger.info('Writing metrics to %s', conf['file'])
+
+
+def cleanup() -> None:
+    """
+    Stop the exporters and disable the metrics
+    :return: None
+    """
+    global _REGISTRY, _SERVER, _WRITER_STOP, _FILE
+    if _SERVER is not None:
+        _SERVER.shutdown()
+        _SERVER.server_close()
+        _SERVER = None
+    if _WRITER_STOP is not None:
+        _WRITER_STOP.set()
+        _WRITER_STOP = None
+    if _FILE is not None:
+        # Keep the metrics of the last iterations
+        write(_FILE)
+        _FILE = None
+    _REGISTRY = None
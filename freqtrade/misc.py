@@ -15,6 +15,28 @@ from pandas import DataFrame
 logger = logging.getLogger(__name__)
 
 
+def aggregate_ohlcv(columns: Dict[str, np.ndarray], keys: np.ndarray,
+                    volume: np.ufunc = np.maximum) -> Dict[str, np.ndarray]:
+    """
+    Aggregate consecutive OHLCV rows sharing the same key into one candle:
+    first open, highest high, lowest low, last close
+    :param columns: dict column name -> array, sorted by key
+    :param keys: sorted key of every row, e.g. the date
+    :param volume: ufunc reducing the volumes of a group
+    :return: dict column name -> array, with the key as date
+    """
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+    return {
+        'date': keys[starts],
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends],
+        'volume': volume.reduceat(columns['volume'], starts),
+    }
+
+
 def shorten_date(_date: str) -> str:
     """
     Trim the date so it fits on small screens
@@ -4,56 +4,127 @@ import gzip
 import json
 import logging
 import os
-from typing import Optional, List, Dict, Tuple, Any
+from typing import Optional, List, Dict, Tuple, Any, Union, Callable
 import arrow
+import numpy as np
 
 from freqtrade import misc, constants
 from freqtrade.exchange import get_ticker_history
 from freqtrade.arguments import TimeRange
+from freqtrade.optimize import datastore, resample
 
 logger = logging.getLogger(__name__)
 
 
-def trim_tickerlist(tickerlist: List[Dict], timerange: TimeRange) -> List[Dict]:
-    if not tickerlist:
-        return tickerlist
+def _bisect_tickerlist(tickerlist: List, date_ms: float, side: str = 'left') -> int:
+    """
+    Binary search over the (sorted) timestamps of a ticker list, same contract as
+    numpy.searchsorted() on the date column
+    """
+    low, high = 0, len(tickerlist)
+    while low < high:
+        middle = (low + high) // 2
+        if tickerlist[middle][0] < date_ms or (side == 'right' and
+                                               tickerlist[middle][0] == date_ms):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _searchsorted_dates(dates: np.ndarray, date_ms: float, side: str = 'left') -> int:
+    """
+    numpy.searchsorted() over a date column, with the side of _bisect_tickerlist()
+    """
+    return int(np.searchsorted(dates, date_ms, side='right' if side == 'right' else 'left'))
 
+
+def timerange_to_indices(length: int, timerange: TimeRange,
+                         searchsorted: Callable[[float, str], int]) -> Tuple[int, int]:
+    """
+    Resolve a timerange to a [start, stop) slice over sorted ticker data
+    :param length: number of ticks available
+    :param timerange: timerange to apply
+    :param searchsorted: returns the insertion index of a ms timestamp, given a side
+    :return: tuple (start_index, stop_index)
+    """
     start_index = 0
-    stop_index = len(tickerlist)
+    stop_index = length
 
     if timerange.starttype == 'line':
         stop_index = timerange.startts
     if timerange.starttype == 'index':
         start_index = timerange.startts
     elif timerange.starttype == 'date':
-        while (start_index < len(tickerlist) and
-               tickerlist[start_index][0] < timerange.startts * 1000):
-            start_index += 1
+        start_index = searchsorted(timerange.startts * 1000, 'left')
 
     if timerange.stoptype == 'line':
-        start_index = len(tickerlist) + timerange.stopts
+        start_index = length + timerange.stopts
     if timerange.stoptype == 'index':
         stop_index = timerange.stopts
     elif timerange.stoptype == 'date':
-        while (stop_index > 0 and
-               tickerlist[stop_index-1][0] > timerange.stopts * 1000):
-            stop_index -= 1
+        stop_index = searchsorted(timerange.stopts * 1000, 'right')
 
     if start_index > stop_index:
         raise ValueError(f'The timerange [{timerange.startts},{timerange.stopts}] is incorrect')
 
+    return start_index, stop_index
+
+
+def trim_tickerlist(tickerlist: List[Dict], timerange: TimeRange) -> List[Dict]:
+    if not tickerlist:
+        return tickerlist
+
+    start_index, stop_index = timerange_to_indices(
+        len(tickerlist), timerange,
+        lambda date_ms, side: _bisect_tickerlist(tickerlist, date_ms, side)
+    )
     return tickerlist[start_index:stop_index]
 
 
+def trim_tickercolumns(columns: Dict[str, np.ndarray],
+                       timerange: TimeRange) -> Dict[str, np.ndarray]:
+    """
+    Columnar counterpart of trim_tickerlist()
+    The returned arrays are views, so memory-mapped columns stay memory-mapped.
+    """
+    dates = columns['date']
+    start_index, stop_index = timerange_to_indices(
+        len(dates), timerange,
+        lambda date_ms, side: _searchsorted_dates(dates, date_ms, side)
+    )
+    return {col: data[start_index:stop_index] for col, data in columns.items()}
+
+
 def load_tickerdata_file(
         datadir: str, pair: str,
         ticker_interval: str,
-        timerange: Optional[TimeRange] = None) -> Optional[List[Dict]]:
+        timerange: Optional[TimeRange] = None) -> Optional[Union[List[List],
+                                                                 Dict[str, np.ndarray]]]:
     """
     Load a pair from file,
+    A columnar store (see freqtrade.optimize.datastore) is preferred over json files,
+    in which case a dict of memory-mapped column arrays is returned instead of a list.
     :return dict OR empty if unsuccesful
     """
     path = make_testdata_path(datadir)
+
+    store = datastore.store_path(path, pair, ticker_interval)
+    # Only the memory-mapped date column is touched to resolve the timerange,
+    # so that just the requested window of every other column is read
+    dates = datastore.load_store(store, columns=['date'])
+    if dates is not None:
+        logger.debug('Loading ticker data from columnar store %s', store)
+        start_index, stop_index = 0, None
+        if timerange:
+            date_column = dates['date']
+            start_index, stop_index = timerange_to_indices(
+                len(date_column), timerange,
+                lambda date_ms, side: _searchsorted_dates(date_column, date_ms, side)
+            )
+        columns = datastore.load_store(store, start=start_index, stop=stop_index)
+        return columns if columns is not None and len(columns['date']) else None
+
     pair_file_string = pair.replace('/', '_')
     file = os.path.join(path, '{pair}-{ticker_interval}.json'.format(
         pair=pair_file_string,
@@ -72,21 +143,92 @@ def load_tickerdata_file(
         with open(file) as tickerdata:
             pairdata = json.load(tickerdata)
     else:
-        return None
+        columns = load_resampled_data(path, pair, ticker_interval)
+        if columns is None:
+            return None
+        if timerange:
+            columns = trim_tickercolumns(columns, timerange)
+        return columns if len(columns['date']) else None
 
     if timerange:
         pairdata = trim_tickerlist(pairdata, timerange)
     return pairdata
 
 
+def _stored_data_file(path: str, pair: str, ticker_interval: str) -> Optional[str]:
+    """
+    Return the file holding the ticker data of a pair, if any
+    """
+    store = datastore.store_path(path, pair, ticker_interval)
+    if datastore.store_exists(store):
+        return os.path.join(store, datastore.META_FILE)
+    file = os.path.join(path, '{pair}-{ticker_interval}.json'.format(
+        pair=pair.replace('/', '_'),
+        ticker_interval=ticker_interval,
+    ))
+    for filename in [file + '.gz', file]:
+        if os.path.isfile(filename):
+            return filename
+    return None
+
+
+def data_source(path: str, pair: str, ticker_interval: str) -> Optional[Dict[str, Any]]:
+    """
+    Describe the file the ticker data of a pair is loaded from, or derived from
+    when no data is stored for ticker_interval (see load_resampled_data())
+    :return: dict with the interval, file, mtime and size of the source, None if there is none
+    """
+    for interval in [ticker_interval] + resample.source_intervals(ticker_interval):
+        source_file = _stored_data_file(path, pair, interval)
+        if source_file:
+            stat = os.stat(source_file)
+            return {
+                'interval': interval,
+                'file': os.path.relpath(source_file, path),
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+            }
+    return None
+
+
+def load_resampled_data(path: str, pair: str,
+                        ticker_interval: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Build the ticker data of a pair from the finest stored interval
+    ticker_interval can be derived from. The result is cached in a columnar store,
+    which is rebuilt when the source data changes.
+    :return: dict column name -> array, or None if no source data exists
+    """
+    source = data_source(path, pair, ticker_interval)
+    if source is None or source['interval'] == ticker_interval:
+        return None
+    source_interval = source['interval']
+
+    derived = datastore.derived_store_path(path, pair, ticker_interval)
+    if datastore.store_exists(derived) and datastore.read_meta(derived).get('source') == source:
+        logger.debug('Loading %s ticker data of %s from %s', ticker_interval, pair, derived)
+        return datastore.load_store(derived)
+
+    logger.info('Building %s ticker data of pair %s from %s ticker data ...',
+                ticker_interval, pair, source_interval)
+    pairdata = load_tickerdata_file(path, pair, source_interval)
+    if not pairdata:
+        return None
+    if not isinstance(pairdata, dict):
+        pairdata = datastore.tickerlist_to_columns(pairdata)
+    datastore.write_store(derived, resample.resample_columns(pairdata, ticker_interval),
+                          extra_meta={'source': source})
+    return datastore.load_store(derived)
+
+
 def load_data(datadir: str,
               ticker_interval: str,
               pairs: List[str],
               refresh_pairs: Optional[bool] = False,
-              timerange: TimeRange = TimeRange(None, None, 0, 0)) -> Dict[str, List]:
+              timerange: TimeRange = TimeRange(None, None, 0, 0)) -> Dict[str, Any]:
     """
     Loads ticker history data for the given parameters
-    :return: dict
+    :return: dict pair -> ticker list or dict of column arrays
     """
     result = {}
 
@@ -121,8 +263,18 @@ def make_testdata_path(datadir: str) -> str:
 
 def download_pairs(datadir, pairs: List[str],
                    ticker_interval: str,
-                   timerange: TimeRange = TimeRange(None, None, 0, 0)) -> bool:
-    """For each pairs passed in parameters, download the ticker intervals"""
+                   timerange: TimeRange = TimeRange(None, None, 0, 0),
+                   concurrency: int = 1) -> bool:
+    """
+    For each pairs passed in parameters, download the ticker intervals
+    :param concurrency: number of requests in flight, > 1 downloads the pairs concurrently
+    """
+    if concurrency > 1:
+        from freqtrade.optimize.downloader import ConcurrentDownloader
+        results = ConcurrentDownloader(datadir, max_in_flight=concurrency).download(
+            pairs, [ticker_interval], timerange=timerange)
+        return all(result.error is None for result in results)
+
     for pair in pairs:
         try:
             download_backtesting_testdata(datadir,
@@ -139,15 +291,10 @@ def download_pairs(datadir, pairs: List[str],
     return True
 
 
-def load_cached_data_for_updating(filename: str,
-                                  tick_interval: str,
-                                  timerange: Optional[TimeRange]) -> Tuple[
-                                                                                  List[Any],
-                                                                                  Optional[int]]:
+def _timerange_since_ms(tick_interval: str, timerange: Optional[TimeRange]) -> Optional[int]:
     """
-    Load cached data and choose what part of the data should be updated
+    Return the time (ms) from which the user wants data, None if not set
     """
-
     since_ms = None
 
     # user sets timerange, so find the start time
@@ -157,6 +304,41 @@ def load_cached_data_for_updating(filename: str,
         elif timerange.stoptype == 'line':
             num_minutes = timerange.stopts * constants.TICKER_INTERVAL_MINUTES[tick_interval]
             since_ms = arrow.utcnow().shift(minutes=num_minutes).timestamp * 1000
+    return since_ms
+
+
+def load_cached_store_for_updating(store: str,
+                                   tick_interval: str,
+                                   timerange: Optional[TimeRange]) -> Tuple[bool, Optional[int]]:
+    """
+    Choose what part of a columnar store should be updated.
+    Unlike json files, the store is not loaded: only its memory-mapped date column is read.
+    :return: (append, since_ms), append is False when the store has to be rewritten
+    """
+    since_ms = _timerange_since_ms(tick_interval, timerange)
+
+    dates = datastore.load_store(store, columns=['date'])
+    if dates is None or not len(dates['date']):
+        return False, since_ms
+    if since_ms and since_ms < dates['date'][0]:
+        # the data is requested for earlier period than the cache has
+        # so fully redownload all the data
+        return False, since_ms
+    # download again from the last candle, because we are not sure if it is correct:
+    # it could be fetched when the candle was incompleted
+    return True, int(dates['date'][-1])
+
+
+def load_cached_data_for_updating(filename: str,
+                                  tick_interval: str,
+                                  timerange: Optional[TimeRange]) -> Tuple[
+                                                                                  List[Any],
+                                                                                  Optional[int]]:
+    """
+    Load cached data and choose what part of the data should be updated
+    """
+
+    since_ms = _timerange_since_ms(tick_interval, timerange)
 
     # read the cached file
     if os.path.isfile(filename):
@@ -191,7 +373,8 @@ def download_backtesting_testdata(datadir: str,
     Download the latest ticker intervals from the exchange for the pairs passed in parameters
     The data is downloaded starting from the last correct ticker interval data that
     esists in a cache. If timerange starts earlier than the data in the cache,
-    the full data will be redownloaded
+    the full data will be redownloaded.
+    Pairs stored as a columnar store are updated by appending the new candles only.
 
     Based on @Rybolov work: https://github.com/rybolov/freqtrade-data
     :param pairs: list of pairs to download
@@ -211,6 +394,18 @@ def download_backtesting_testdata(datadir: str,
         tick_interval
     )
 
+    store = datastore.store_path(path, pair, tick_interval)
+    if datastore.store_exists(store):
+        append, since_ms = load_cached_store_for_updating(store, tick_interval, timerange)
+        new_data = get_ticker_history(pair=pair, tick_interval=tick_interval, since_ms=since_ms)
+        columns = datastore.tickerlist_to_columns(new_data)
+        if append:
+            # Only the new candles are written
+            datastore.append_store(store, columns)
+        else:
+            datastore.write_store(store, columns)
+        return
+
     data, since_ms = load_cached_data_for_updating(filename, tick_interval, timerange)
 
     logger.debug("Current Start: %s", misc.format_ms_time(data[1][0]) if data else 'None')
@@ -7,16 +7,20 @@ import logging
 import operator
 from argparse import Namespace
 from datetime import datetime
-from typing import Dict, Tuple, Any, List, Optional, NamedTuple
+from typing import Dict, Tuple, Any, Iterable, Iterator, List, Optional, NamedTuple
 
 import arrow
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
 from tabulate import tabulate
 
 import freqtrade.optimize as optimize
 from freqtrade import exchange
+from freqtrade.optimize import compact, dataframe_cache, parallel
+from freqtrade.optimize.dataframe_cache import DataFrameCache
 from freqtrade.analyze import Analyze
-from freqtrade.arguments import Arguments
+from freqtrade.arguments import Arguments, TimeRange
 from freqtrade.configuration import Configuration
 from freqtrade.misc import file_dump_json
 from freqtrade.persistence import Trade
@@ -195,6 +199,7 @@ class Backtesting(object):
             processed: a processed dictionary with format {pair, data}
             max_open_trades: maximum number of concurrent trades (default: 0, disabled)
             realistic: do we try to simulate realistic trades? (default: True)
+            trade_count_lock: open trades per date, shared between calls (optional)
         :return: DataFrame
         """
         headers = ['date', 'buy', 'open', 'close', 'sell']
@@ -202,9 +207,14 @@ class Backtesting(object):
         max_open_trades = args.get('max_open_trades', 0)
         realistic = args.get('realistic', False)
         trades = []
-        trade_count_lock: Dict = {}
+        trade_count_lock: Dict = args.get('trade_count_lock', {})
+        low_memory = self.config.get('low_memory', False)
         for pair, pair_data in processed.items():
-            pair_data['buy'], pair_data['sell'] = 0, 0  # cleanup from previous run
+            if low_memory:
+                pair_data['buy'] = np.zeros(len(pair_data), dtype=np.int8)
+                pair_data['sell'] = np.zeros(len(pair_data), dtype=np.int8)
+            else:
+                pair_data['buy'], pair_data['sell'] = 0, 0  # cleanup from previous run
 
             ticker_data = self.populate_sell_trend(
                 self.populate_buy_trend(pair_data))[headers].copy()
@@ -247,47 +257,136 @@ class Backtesting(object):
 
         return DataFrame.from_records(trades, columns=BacktestResult._fields)
 
+    def _load_preprocessed(self, pairs: List[str], timerange: TimeRange,
+                           cache: Optional[DataFrameCache]) -> Dict[str, DataFrame]:
+        """
+        Load the local data of the given pairs and populate their indicators
+        :return: dict pair -> DataFrame, for the pairs having data
+        """
+        low_memory = self.config.get('low_memory', False)
+        if self.config.get('preprocess_workers', 1) > 1 or cache:
+            return parallel.load_and_preprocess(
+                self.analyze,
+                self.config['datadir'],
+                pairs=pairs,
+                ticker_interval=self.ticker_interval,
+                refresh_pairs=self.config.get('refresh_pairs', False),
+                timerange=timerange,
+                workers=self.config.get('preprocess_workers', 1),
+                cache=cache,
+                low_memory=low_memory
+            )
+
+        data = optimize.load_data(
+            self.config['datadir'],
+            pairs=pairs,
+            ticker_interval=self.ticker_interval,
+            refresh_pairs=self.config.get('refresh_pairs', False),
+            timerange=timerange
+        )
+        if low_memory:
+            return compact.tickerdata_to_compact_dataframe(self.tickerdata_to_dataframe, data)
+        return self.tickerdata_to_dataframe(data)
+
+    def _iter_preprocessed(self, pairs: List[str],
+                           timerange: TimeRange) -> Iterator[Dict[str, DataFrame]]:
+        """
+        Load and preprocess the pairs a batch of 'stream_pairs' pairs at a time
+        """
+        batch_size = self.config['stream_pairs']
+        cache = dataframe_cache.from_config(self.config)
+        for index in range(0, len(pairs), batch_size):
+            preprocessed = self._load_preprocessed(pairs[index:index + batch_size],
+                                                   timerange, cache)
+            if preprocessed:
+                yield preprocessed
+            # Don't hold this batch while loading the next one
+            del preprocessed
+
+    def backtest_stream(self, batches: Iterable[Dict[str, DataFrame]],
+                        args: Dict) -> Tuple[DataFrame, List[str],
+                                             Optional[Tuple[arrow.Arrow, arrow.Arrow]]]:
+        """
+        Backtest the batches of preprocessed pairs one after the other, only the
+        trades of a batch are kept once it has been tested.
+        Trades are the same as backtesting all pairs at once: pairs are tested in
+        the same order and the max_open_trades locks are shared between batches.
+        :param batches: iterable of processed dictionaries with format {pair, data}
+        :param args: see backtest(), without 'processed'
+        :return: tuple containing the trades, the pairs tested and their timeframe
+        """
+        results = []
+        pairs: List[str] = []
+        timeframe = None
+        args = dict(args, trade_count_lock={})
+        for processed in batches:
+            min_date, max_date = self.get_timeframe(processed)
+            if timeframe:
+                min_date, max_date = min(min_date, timeframe[0]), max(max_date, timeframe[1])
+            timeframe = (min_date, max_date)
+            pairs.extend(processed.keys())
+            results.append(self.backtest(dict(args, processed=processed)))
+            # Release the frames of this batch before loading the next one
+            del processed
+
+        if not results:
+            return DataFrame.from_records([], columns=BacktestResult._fields), pairs, None
+        return pd.concat(results, ignore_index=True), pairs, timeframe
+
     def start(self):
         """
         Run a backtesting end-to-end
         :return: None
         """
-        data = {}
+        data: Dict[str, Any] = {}
+        preprocessed = None
         pairs = self.config['exchange']['pair_whitelist']
         logger.info('Using stake_currency: %s ...', self.config['stake_currency'])
         logger.info('Using stake_amount: %s ...', self.config['stake_amount'])
 
+        # Ignore max_open_trades in backtesting, except realistic flag was passed
+        if self.config.get('realistic_simulation', False):
+            max_open_trades = self.config['max_open_trades']
+        else:
+            logger.info('Ignoring max_open_trades (realistic_simulation not set) ...')
+            max_open_trades = 0
+        backtest_args = {
+            'stake_amount': self.config.get('stake_amount'),
+            'max_open_trades': max_open_trades,
+            'realistic': self.config.get('realistic_simulation', False),
+        }
+
         if self.config.get('live'):
             logger.info('Downloading data for all pairs in whitelist ...')
             for pair in pairs:
                 data[pair] = exchange.get_ticker_history(pair, self.ticker_interval)
+            preprocessed = self.tickerdata_to_dataframe(data)
         else:
             logger.info('Using local backtesting data (using whitelist in given config) ...')
 
             timerange = Arguments.parse_timerange(None if self.config.get(
                 'timerange') is None else str(self.config.get('timerange')))
-            data = optimize.load_data(
-                self.config['datadir'],
-                pairs=pairs,
-                ticker_interval=self.ticker_interval,
-                refresh_pairs=self.config.get('refresh_pairs', False),
-                timerange=timerange
-            )
+            if self.config.get('stream_pairs'):
+                logger.info('Backtesting %d pairs at a time ...', self.config['stream_pairs'])
+                results, data, timeframe = self.backtest_stream(
+                    self._iter_preprocessed(pairs, timerange), backtest_args)
+            else:
+                cache = dataframe_cache.from_config(self.config)
+                preprocessed = self._load_preprocessed(pairs, timerange, cache)
+                # Reporting only needs the pairs which have data
+                data = preprocessed
 
         if not data:
             logger.critical("No data found. Terminating.")
             return
-        # Ignore max_open_trades in backtesting, except realistic flag was passed
-        if self.config.get('realistic_simulation', False):
-            max_open_trades = self.config['max_open_trades']
-        else:
-            logger.info('Ignoring max_open_trades (realistic_simulation not set) ...')
-            max_open_trades = 0
 
-        preprocessed = self.tickerdata_to_dataframe(data)
+        if preprocessed is not None:
+            timeframe = self.get_timeframe(preprocessed)
+            # Execute backtest
+            results = self.backtest(dict(backtest_args, processed=preprocessed))
 
         # Print timeframe
-        min_date, max_date = self.get_timeframe(preprocessed)
+        min_date, max_date = timeframe
         logger.info(
             'Measuring data from %s up to %s (%s days)..',
             min_date.isoformat(),
@@ -295,16 +394,6 @@ class Backtesting(object):
             (max_date - min_date).days
         )
 
-        # Execute backtest and print results
-        results = self.backtest(
-            {
-                'stake_amount': self.config.get('stake_amount'),
-                'processed': preprocessed,
-                'max_open_trades': max_open_trades,
-                'realistic': self.config.get('realistic_simulation', False),
-            }
-        )
-
         if self.config.get('export', False):
             self._store_backtest_result(self.config.get('exportfilename'), results)
 
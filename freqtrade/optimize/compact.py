@@ -0,0 +1,105 @@
+"""
+Low-memory mode of the preprocessed backtesting data.
+
+Indicators are computed in float64 as usual, the columns are downcast
+afterwards: prices, volumes and float indicators to float32, integer
+indicators to the smallest integer type holding their values and the buy /
+sell signals to int8. This roughly halves the memory kept by backtesting and
+hyperopt for the whole run.
+
+float32 keeps 24 bits of mantissa, every value is stored with a relative error
+of at most FLOAT32_RTOL. The profit ratio of each trade computed from the
+compacted data stays within PROFIT_ATOL (0.0001%) of the float64 run, as long
+as the same trades are taken: a signal comparing two indicators which differ
+by less than FLOAT32_RTOL may flip, so the trades can differ slightly on large
+data sets.
+"""
+import logging
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_COLUMNS = ['buy', 'sell']
+FLOAT32_RTOL = float(np.finfo(np.float32).eps) / 2
+PROFIT_ATOL = 1e-6
+
+
+def frame_size(frame: DataFrame) -> int:
+    """
+    Return the memory used by a frame, in bytes
+    """
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def compact_frame(frame: DataFrame) -> int:
+    """
+    Downcast the columns of a preprocessed frame, in place
+    :param frame: DataFrame as returned by Analyze.tickerdata_to_dataframe()
+    :return: number of bytes saved
+    """
+    before = frame_size(frame)
+    for col in frame.columns:
+        series = frame[col]
+        if col in SIGNAL_COLUMNS and pd.api.types.is_numeric_dtype(series) \
+                and not series.isnull().any():
+            frame[col] = series.astype(np.int8)
+        elif pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_float_dtype(series):
+            frame[col] = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series):
+            frame[col] = pd.to_numeric(series, downcast='integer')
+    return before - frame_size(frame)
+
+
+def compact_pair(pair: str, frame: DataFrame) -> int:
+    """
+    Downcast the frame of one pair and report the memory saved
+    :return: size of the frame before, in bytes
+    """
+    before = frame_size(frame)
+    saved = compact_frame(frame)
+    logger.info('Low memory mode: %s uses %.1f MB instead of %.1f MB',
+                pair, (before - saved) / 2 ** 20, before / 2 ** 20)
+    return before
+
+
+def _report_total(frames: Dict[str, DataFrame], before: int) -> None:
+    after = sum(frame_size(frame) for frame in frames.values())
+    logger.info('Low memory mode saved %.1f MB of %.1f MB (%.0f%%) for %d pairs',
+                (before - after) / 2 ** 20, before / 2 ** 20,
+                100.0 * (before - after) / max(before, 1), len(frames))
+
+
+def compact_frames(frames: Dict[str, DataFrame]) -> Dict[str, DataFrame]:
+    """
+    Downcast all frames in place and report the memory saved per pair
+    :param frames: dict pair -> preprocessed DataFrame
+    :return: frames
+    """
+    before = sum(compact_pair(pair, frame) for pair, frame in frames.items())
+    _report_total(frames, before)
+    return frames
+
+
+def tickerdata_to_compact_dataframe(
+        tickerdata_to_dataframe: Callable[[Dict], Dict[str, DataFrame]],
+        data: Dict[str, Union[List, Dict]]) -> Dict[str, DataFrame]:
+    """
+    Preprocess the pairs one by one and downcast each of them right away,
+    so only one pair is held in float64 at a time
+    :param tickerdata_to_dataframe: see Analyze.tickerdata_to_dataframe()
+    :param data: dict pair -> ticker data
+    :return: dict pair -> compacted DataFrame
+    """
+    frames: Dict[str, DataFrame] = {}
+    before = 0
+    for pair in data:
+        frames.update(tickerdata_to_dataframe({pair: data[pair]}))
+        before += compact_pair(pair, frames[pair])
+    _report_total(frames, before)
+    return frames
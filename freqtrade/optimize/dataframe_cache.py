@@ -0,0 +1,278 @@
+"""
+Persistent cache of parsed, indicator-populated backtesting DataFrames.
+
+Each entry holds the output of Analyze.tickerdata_to_dataframe() for one pair,
+dumped as one .npy file per column. Nothing is pickled: dates are stored as
+int64 epoch values and strings as unicode arrays, and frames holding other
+objects are not cached. Entries are keyed by the data file the pair
+is loaded from (path, mtime and size), the timerange, the ticker interval and the
+source files of the strategy, so editing any of them misses the cache.
+The cache is bounded in size, least recently used entries are evicted first.
+"""
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqtrade import __version__, optimize
+from freqtrade.analyze import Analyze
+from freqtrade.arguments import TimeRange
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('user_data', 'cache', 'dataframes')
+DEFAULT_MAX_SIZE_MB = 1024
+LAYOUT_FILE = 'layout.json'
+LAYOUT_VERSION = 2
+
+# (column name, file name, pandas dtype to restore, None for plain numpy columns)
+ColumnLayout = List[Tuple[str, str, Optional[str]]]
+
+
+def _column_values(series: pd.Series, allow_pickle: bool) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Convert a column to an array np.save() writes without pickling:
+    dates become int64 epoch values in ns and strings fixed-width unicode
+    :return: array, and the dtype to restore
+    """
+    inferred = pd.api.types.infer_dtype(series, skipna=False)
+    if series.dtype == object and inferred in ('datetime', 'datetime64'):
+        series = pd.to_datetime(series, utc=True)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        naive = series.dt.tz_convert(None) if getattr(series.dtype, 'tz', None) else series
+        return naive.values.astype('datetime64[ns]').view(np.int64), str(series.dtype)
+    if pd.api.types.is_string_dtype(series) and inferred == 'string':
+        return np.asarray(series, dtype=str), str(series.dtype)
+    values = np.asarray(series)
+    if values.dtype == object and not allow_pickle:
+        raise ValueError(f'Column {series.name} holds {inferred} objects')
+    return values, None
+
+
+def _restore_column(values: np.ndarray, dtype: Optional[str]) -> Any:
+    """
+    Reverse _column_values()
+    """
+    if dtype is None:
+        return values
+    if values.dtype.kind == 'U':
+        return pd.Series(values.astype(object)).astype(dtype)
+    series = pd.Series(values.view('datetime64[ns]'))
+    timezone = getattr(pd.api.types.pandas_dtype(dtype), 'tz', None)
+    if timezone is not None:
+        series = series.dt.tz_localize('UTC').dt.tz_convert(timezone)
+    return series.astype(dtype)
+
+
+def dump_frame(frame: DataFrame, path: str, allow_pickle: bool = False) -> ColumnLayout:
+    """
+    Dump every column of the frame as a .npy file into path
+    :param allow_pickle: pickle the object columns which are neither dates nor strings,
+                         instead of raising a ValueError
+    :return: list of (column name, file name, dtype) to rebuild the frame
+    """
+    os.makedirs(path)
+    layout = []
+    for idx, col in enumerate(frame.columns):
+        values, dtype = _column_values(frame[col], allow_pickle)
+        filename = os.path.join(path, f'{idx}.npy')
+        np.save(filename, values, allow_pickle=allow_pickle)
+        layout.append((col, filename, dtype))
+    return layout
+
+
+def load_frame(layout: ColumnLayout, allow_pickle: bool = False) -> DataFrame:
+    """
+    Rebuild a frame dumped by dump_frame()
+    :param allow_pickle: load pickled columns, only for files this process trusts
+    """
+    columns = {col: _restore_column(np.load(filename, allow_pickle=allow_pickle), dtype)
+               for col, filename, dtype in layout}
+    return DataFrame(columns, columns=[col for col, _, _ in layout])
+
+
+def _source_hash(analyze: Analyze) -> Optional[str]:
+    """
+    Hash the source files of the code computing the indicators: the strategy
+    classes and populate_indicators, which hyperopt replaces.
+    Strategies are not always importable modules, so the files are found
+    through the code objects of their functions.
+    """
+    functions = [analyze.populate_indicators]
+    for klass in type(analyze.strategy).__mro__:
+        functions.extend(attr for attr in vars(klass).values() if inspect.isfunction(attr))
+    filenames = sorted(set(getattr(function, '__func__', function).__code__.co_filename
+                           for function in functions))
+    digest = hashlib.sha1()
+    populate_indicators = getattr(analyze.populate_indicators, '__func__',
+                                  analyze.populate_indicators)
+    digest.update(populate_indicators.__qualname__.encode('utf-8'))
+    for filename in filenames:
+        try:
+            with open(filename, 'rb') as file:
+                digest.update(file.read())
+        except OSError:
+            return None
+    return digest.hexdigest()
+
+
+class DataFrameCache(object):
+    """
+    Size-bounded LRU cache of preprocessed DataFrames on disk
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_size_mb: float = DEFAULT_MAX_SIZE_MB) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, analyze: Analyze, datadir: str, pair: str, ticker_interval: str,
+            timerange: Optional[TimeRange], low_memory: bool = False) -> Optional[str]:
+        """
+        Compute the cache key of a pair
+        :param low_memory: the frame is downcast, see freqtrade.optimize.compact
+        :return: key, or None if the pair can't be cached
+        """
+        source = optimize.data_source(optimize.make_testdata_path(datadir),
+                                      pair, ticker_interval)
+        strategy = _source_hash(analyze)
+        if source is None or strategy is None:
+            return None
+        description = {
+            'version': __version__,
+            'layout': LAYOUT_VERSION,
+            'pair': pair,
+            'ticker_interval': ticker_interval,
+            'timerange': list(timerange) if timerange else None,
+            'source': source,
+            'strategy': strategy,
+            'low_memory': low_memory,
+        }
+        return hashlib.sha1(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[DataFrame]:
+        """
+        Return the cached frame, or None on a miss
+        """
+        entry = os.path.join(self.cache_dir, key) if key else None
+        if not entry or not os.path.isfile(os.path.join(entry, LAYOUT_FILE)):
+            self.misses += 1
+            return None
+        with open(os.path.join(entry, LAYOUT_FILE)) as file:
+            layout = [(col, os.path.join(entry, filename), dtype)
+                      for col, filename, dtype in json.load(file)]
+        try:
+            frame = load_frame(layout)
+        except ValueError as error:
+            # e.g. a pickled column, which is never loaded from the cache
+            logger.warning('Ignoring the cached dataframe %s: %s', entry, error)
+            self.misses += 1
+            return None
+        # Mark the entry as recently used
+        os.utime(entry)
+        self.hits += 1
+        return frame
+
+    def put(self, key: Optional[str], frame: DataFrame) -> None:
+        """
+        Store a frame, evicting the least recently used entries above the size limit
+        """
+        if not key:
+            return
+        entry = os.path.join(self.cache_dir, key)
+        tmp_entry = entry + '.tmp'
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        try:
+            layout = dump_frame(frame, tmp_entry)
+        except ValueError as error:
+            logger.warning('Not caching the dataframe: %s', error)
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+        with open(os.path.join(tmp_entry, LAYOUT_FILE), 'w') as file:
+            json.dump([(col, os.path.basename(filename), dtype)
+                       for col, filename, dtype in layout], file)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        self._evict(keep=entry)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """
+        Return (last use, size, path) of every entry
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp') or not os.path.isdir(entry):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, filename))
+                       for filename in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, entry))
+        return entries
+
+    def _evict(self, keep: str) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            if entry == keep:
+                continue
+            logger.debug('Evicting %s from the dataframe cache', entry)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove all cached frames
+        """
+        logger.info('Clearing the dataframe cache in %s', self.cache_dir)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def size(self) -> int:
+        """
+        Return the size of the cache in bytes
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        return sum(size for _, size, _ in self._entries())
+
+
+def from_config(config: Dict) -> Optional[DataFrameCache]:
+    """
+    Return the dataframe cache enabled in the configuration, if any.
+    Clears the cache when asked to.
+    """
+    cache = DataFrameCache(config.get('dataframe_cache_dir', DEFAULT_CACHE_DIR),
+                           config.get('dataframe_cache_size', DEFAULT_MAX_SIZE_MB))
+    if config.get('clear_dataframe_cache'):
+        cache.clear()
+    return cache if config.get('dataframe_cache') else None
+
+
+def get_cached(cache: DataFrameCache, analyze: Analyze, datadir: str, pairs: List[str],
+               ticker_interval: str, timerange: Optional[TimeRange],
+               low_memory: bool = False) -> Tuple[Dict[str, DataFrame], Dict[str, str]]:
+    """
+    Look up the frames of all pairs
+    :return: (dict pair -> cached frame, dict pair -> key of the missed pairs)
+    """
+    found = {}
+    missed = {}
+    for pair in pairs:
+        key = cache.key(analyze, datadir, pair, ticker_interval, timerange, low_memory)
+        frame = cache.get(key)
+        if frame is not None:
+            found[pair] = frame
+        elif key:
+            missed[pair] = key
+    logger.info('Loaded %d of %d pairs from the dataframe cache', len(found), len(pairs))
+    return found, missed
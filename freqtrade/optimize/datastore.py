@@ -0,0 +1,306 @@
+"""
+Columnar on-disk storage for OHLCV ticker data.
+
+A store is a directory named ``{pair}-{ticker_interval}.ohlcv`` holding one raw,
+fixed-dtype binary file per column (``date.bin``, ``open.bin``, ...) and a small
+``meta.json`` describing the layout. Columns are memory-mapped on load, so no
+per-row Python objects are created, and a row range can be loaded on its own
+since every row sits at a fixed offset in each column file.
+
+Updates are append-only: new candles go to a new segment (``date.1.bin``, ...)
+and the candles they supersede (usually the last, possibly incomplete candle)
+are dropped by shrinking the row count of the previous segment in ``meta.json``,
+or by dropping whole segments when the new candles reach back further.
+Existing column files are never rewritten, and replacing ``meta.json`` commits
+an update atomically. Once there are too many segments, the store is compacted
+back into a single one.
+"""
+import json
+import logging
+import os
+import shutil
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+# Compact a store once an update leaves it with more segments than this
+MAX_SEGMENTS = 16
+STORE_SUFFIX = '.ohlcv'
+# Stores computed from the data of another interval, see freqtrade.optimize.resample
+DERIVED_SUFFIX = '.derived' + STORE_SUFFIX
+META_FILE = 'meta.json'
+
+OHLCV_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+OHLCV_DTYPES = {
+    'date': '<i8',
+    'open': '<f8',
+    'high': '<f8',
+    'low': '<f8',
+    'close': '<f8',
+    'volume': '<f8',
+}
+
+
+def store_path(datadir: str, pair: str, ticker_interval: str) -> str:
+    """
+    Return the path of the columnar store for the given pair and interval
+    """
+    pair_file_string = pair.replace('/', '_')
+    return os.path.join(datadir, f'{pair_file_string}-{ticker_interval}{STORE_SUFFIX}')
+
+
+def derived_store_path(datadir: str, pair: str, ticker_interval: str) -> str:
+    """
+    Return the path of the store caching the candles derived from another interval
+    """
+    pair_file_string = pair.replace('/', '_')
+    return os.path.join(datadir, f'{pair_file_string}-{ticker_interval}{DERIVED_SUFFIX}')
+
+
+def store_exists(path: str) -> bool:
+    """
+    Check if a columnar store exists at the given path
+    """
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def read_meta(path: str) -> Dict:
+    """
+    Read the metadata of a columnar store
+    """
+    with open(os.path.join(path, META_FILE)) as file:
+        return json.load(file)
+
+
+def write_meta(path: str, meta: Dict) -> None:
+    """
+    Atomically replace the metadata of a columnar store.
+    The segment list in the metadata is what readers trust, so updating it is the
+    commit point of every write.
+    """
+    tmp_file = os.path.join(path, META_FILE + '.tmp')
+    with open(tmp_file, 'w') as file:
+        json.dump(meta, file)
+    os.replace(tmp_file, os.path.join(path, META_FILE))
+
+
+def _column_file(path: str, column: str, segment: int = 0) -> str:
+    if segment:
+        return os.path.join(path, f'{column}.{segment}.bin')
+    return os.path.join(path, f'{column}.bin')
+
+
+def _segments(meta: Dict) -> List[List[int]]:
+    """
+    Return the [segment id, rows] list of a store, version 1 stores have a single segment
+    """
+    return meta.get('segments', [[0, meta['rows']]])
+
+
+def _read_column(path: str, column: str, dtype: np.dtype, segment: int,
+                 start: int, stop: int, mmap: bool) -> np.ndarray:
+    """
+    Read the rows [start, stop) of one column segment
+    """
+    if mmap:
+        return np.memmap(_column_file(path, column, segment), dtype=dtype, mode='r',
+                         offset=start * dtype.itemsize, shape=(stop - start,))
+    with open(_column_file(path, column, segment), 'rb') as file:
+        file.seek(start * dtype.itemsize)
+        return np.fromfile(file, dtype=dtype, count=stop - start)
+
+
+def _check_columns(columns: Dict[str, np.ndarray]) -> int:
+    rows = len(columns['date'])
+    if any(len(columns[col]) != rows for col in OHLCV_COLUMNS):
+        raise ValueError('All OHLCV columns must have the same length')
+    return rows
+
+
+def tickerlist_to_columns(tickerlist: List[List]) -> Dict[str, np.ndarray]:
+    """
+    Convert a ccxt-style ticker list into a dict of column arrays
+    :param tickerlist: list of [date, open, high, low, close, volume]
+    :return: dict column name -> numpy array
+    """
+    if not tickerlist:
+        return {col: np.empty(0, dtype=OHLCV_DTYPES[col]) for col in OHLCV_COLUMNS}
+    # millisecond timestamps are well below 2**53, so they survive float64 exactly
+    matrix = np.asarray(tickerlist, dtype=np.float64)
+    return {col: matrix[:, idx].astype(OHLCV_DTYPES[col])
+            for idx, col in enumerate(OHLCV_COLUMNS)}
+
+
+def columns_to_tickerlist(columns: Dict[str, np.ndarray]) -> List[List]:
+    """
+    Convert a dict of column arrays back into a ccxt-style ticker list
+    """
+    by_column = [columns[col].tolist() for col in OHLCV_COLUMNS]
+    return [list(row) for row in zip(*by_column)]
+
+
+def write_store(path: str, columns: Dict[str, np.ndarray],
+                extra_meta: Optional[Dict] = None) -> None:
+    """
+    Write (or fully replace) a columnar store
+    :param path: store directory, see store_path()
+    :param columns: dict column name -> array, all of the same length
+    :param extra_meta: additional entries to keep in the metadata
+    :return: None
+    """
+    rows = _check_columns(columns)
+
+    tmp_path = path + '.tmp'
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    for col in OHLCV_COLUMNS:
+        np.ascontiguousarray(columns[col], dtype=OHLCV_DTYPES[col]).tofile(
+            _column_file(tmp_path, col))
+    meta = dict(extra_meta or {})
+    meta.update({
+        'version': STORE_VERSION,
+        'rows': rows,
+        'columns': OHLCV_DTYPES,
+        'segments': [[0, rows]],
+    })
+    write_meta(tmp_path, meta)
+
+    # Swap the new store in place of the old one
+    old_path = path + '.old'
+    if os.path.isdir(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if os.path.isdir(old_path):
+        shutil.rmtree(old_path)
+
+
+def append_store(path: str, columns: Dict[str, np.ndarray],
+                 max_segments: int = MAX_SEGMENTS) -> None:
+    """
+    Append candles to a columnar store, creating it if needed.
+    Stored candles from the first new candle on are replaced by the new ones.
+    Only the new candles are written: the segments they supersede are
+    truncated or dropped, never rewritten.
+    :param path: store directory, see store_path()
+    :param columns: dict column name -> array, sorted by date
+    :param max_segments: compact the store once it has more segments than this
+    :return: None
+    """
+    rows = _check_columns(columns)
+    if not store_exists(path):
+        write_store(path, columns)
+        return
+    if rows == 0:
+        return
+
+    meta = read_meta(path)
+    if meta.get('version') not in SUPPORTED_VERSIONS:
+        raise ValueError(f'Unsupported store version {meta.get("version")} in {path}')
+    segments = _segments(meta)
+    segment = max(seg for seg, _ in segments) + 1
+
+    # Drop the stored candles superseded by the new ones, usually just the last
+    # one as it could have been incomplete. Segments entirely superseded are
+    # dropped, the one holding the first new candle is truncated.
+    kept = list(segments)
+    dropped: List[int] = []
+    while kept:
+        seg, seg_rows = kept[-1]
+        keep = 0
+        if seg_rows:
+            dates = _read_column(path, 'date', np.dtype(meta['columns']['date']), seg,
+                                 0, seg_rows, mmap=True)
+            keep = int(np.searchsorted(dates, columns['date'][0], side='left'))
+        if keep:
+            kept[-1] = [seg, keep]
+            break
+        dropped.append(kept.pop()[0])
+    if not kept:
+        write_store(path, columns)
+        return
+
+    for col in OHLCV_COLUMNS:
+        np.ascontiguousarray(columns[col], dtype=meta['columns'][col]).tofile(
+            _column_file(path, col, segment))
+    segments = kept + [[segment, rows]]
+    meta.update({
+        'version': STORE_VERSION,
+        'rows': sum(seg_rows for _, seg_rows in segments),
+        'segments': segments,
+    })
+    write_meta(path, meta)
+    # Only once the new metadata is committed
+    for seg in dropped:
+        for col in OHLCV_COLUMNS:
+            with suppress(FileNotFoundError):
+                os.remove(_column_file(path, col, seg))
+
+    if len(segments) > max_segments:
+        compact_store(path)
+
+
+def compact_store(path: str) -> bool:
+    """
+    Merge all segments of a columnar store into a single one
+    :return: True if the store was compacted
+    """
+    if not store_exists(path) or len(_segments(read_meta(path))) <= 1:
+        return False
+    columns = load_store(path, mmap=False)
+    if columns is None:
+        return False
+    logger.debug('Compacting columnar store %s', path)
+    write_store(path, columns)
+    return True
+
+
+def load_store(path: str, mmap: bool = True, columns: Optional[List[str]] = None,
+               start: int = 0, stop: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load a columnar store, or only a row range of it.
+    Ranges spanning several segments are copied into memory,
+    compact the store to get them memory-mapped.
+    :param path: store directory, see store_path()
+    :param mmap: memory-map the columns (read-only) instead of reading them into memory
+    :param columns: columns to load (default: all OHLCV columns)
+    :param start: first row to load, python slice semantics
+    :param stop: row to stop before, python slice semantics
+    :return: dict column name -> array, or None if no store exists
+    """
+    if not store_exists(path):
+        return None
+
+    meta = read_meta(path)
+    if meta.get('version') not in SUPPORTED_VERSIONS:
+        logger.warning('Unsupported store version %s in %s', meta.get('version'), path)
+        return None
+
+    start, stop, _ = slice(start, stop).indices(meta['rows'])
+    # Split the requested rows over the segments
+    pieces = []
+    offset = 0
+    for segment, seg_rows in _segments(meta):
+        seg_start, seg_stop = max(start - offset, 0), min(stop - offset, seg_rows)
+        if seg_start < seg_stop:
+            pieces.append((segment, seg_start, seg_stop))
+        offset += seg_rows
+
+    result = {}
+    for col in columns or OHLCV_COLUMNS:
+        dtype = np.dtype(meta['columns'][col])
+        arrays = [_read_column(path, col, dtype, segment, seg_start, seg_stop, mmap)
+                  for segment, seg_start, seg_stop in pieces]
+        if not arrays:
+            result[col] = np.empty(0, dtype=dtype)
+        elif len(arrays) == 1:
+            result[col] = arrays[0]
+        else:
+            result[col] = np.concatenate(arrays)
+    return result
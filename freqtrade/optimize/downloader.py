@@ -0,0 +1,200 @@
+"""
+Concurrent, rate-limit aware download of historical candles.
+
+Every (pair, ticker interval) couple is a job. Jobs run in a thread pool, so
+several requests can be in flight at once, while a shared rate limiter keeps
+the start of two requests at least the exchange rate limit apart.
+Each job resumes from the data already cached on disk and stores whatever it
+downloaded, even when it fails, so an interrupted download can simply be restarted.
+Columnar stores are updated by appending the new candles only.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import ccxt
+
+from freqtrade import (DependencyException, OperationalException, TemporaryError,
+                       exchange, misc, optimize)
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize import datastore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class RateLimiter(object):
+    """
+    Thread-safe limiter spacing out the start of requests
+    """
+
+    def __init__(self, min_interval: float) -> None:
+        """
+        :param min_interval: minimum delay in seconds between two requests
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """
+        Block until a request may be started
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class DownloadResult(NamedTuple):
+    """
+    NamedTuple describing the outcome of one download job
+    """
+    pair: str
+    tick_interval: str
+    requests: int
+    candles: int
+    error: Optional[str] = None
+
+
+class ConcurrentDownloader(object):
+    """
+    Downloads the candles of many pairs and ticker intervals concurrently
+
+    downloader = ConcurrentDownloader(datadir, max_in_flight=8)
+    results = downloader.download(pairs, ['1m', '5m'])
+    """
+
+    def __init__(self, datadir: str,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 requests_per_second: Optional[float] = None,
+                 columnar: bool = False) -> None:
+        """
+        :param datadir: directory where the data is cached
+        :param max_in_flight: maximum number of concurrent requests
+        :param requests_per_second: request budget, defaults to the ccxt rate limit
+        :param columnar: cache new pairs as columnar stores instead of json files,
+            existing columnar stores are always used
+        """
+        self.datadir = datadir
+        self.columnar = columnar
+        self.max_in_flight = max(max_in_flight, 1)
+        if requests_per_second:
+            min_interval = 1 / requests_per_second
+        else:
+            min_interval = (getattr(exchange._API, 'rateLimit', 0) or 0) / 1000
+        self.limiter = RateLimiter(min_interval)
+
+        self._lock = threading.Lock()
+        self._start = 0.0
+        self._jobs_total = 0
+        self._jobs_done = 0
+        self._requests = 0
+        self._candles = 0
+
+    def download(self, pairs: List[str], tick_intervals: List[str],
+                 timerange: Optional[TimeRange] = None) -> List[DownloadResult]:
+        """
+        Download (or update) the cached data of all pairs for all ticker intervals
+        :return: one DownloadResult per job, in pairs / tick_intervals order
+        """
+        jobs = [(pair, tick_interval) for pair in pairs for tick_interval in tick_intervals]
+        self._start = time.monotonic()
+        self._jobs_total = len(jobs)
+        self._jobs_done = self._requests = self._candles = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            futures = [executor.submit(self._download_job, pair, tick_interval, timerange)
+                       for pair, tick_interval in jobs]
+            results = [future.result() for future in futures]
+
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        logger.info('Downloaded %d candles in %d requests for %d jobs in %.1fs '
+                    '(%.2f requests/s, %.0f candles/s)',
+                    self._candles, self._requests, len(jobs), elapsed,
+                    self._requests / elapsed, self._candles / elapsed)
+        return results
+
+    def _download_job(self, pair: str, tick_interval: str,
+                      timerange: Optional[TimeRange]) -> DownloadResult:
+        path = optimize.make_testdata_path(self.datadir)
+        filepair = pair.replace('/', '_')
+        filename = os.path.join(path, f'{filepair}-{tick_interval}.json')
+        store = datastore.store_path(path, pair, tick_interval)
+        columnar = self.columnar or datastore.store_exists(store)
+        if columnar:
+            append, since_ms = optimize.load_cached_store_for_updating(store, tick_interval,
+                                                                       timerange)
+            data: List[List] = []
+        else:
+            data, since_ms = optimize.load_cached_data_for_updating(filename, tick_interval,
+                                                                    timerange)
+        cached = len(data)
+        till_ms = exchange.get_history_till_ms(tick_interval)
+
+        requests = 0
+        error = None
+        try:
+            while not since_ms or since_ms < till_ms:
+                self.limiter.acquire()
+                data_part = exchange.get_ticker_history_page(pair, tick_interval,
+                                                             since_ms=since_ms)
+                requests += 1
+                self._add_stats(requests=1, candles=len(data_part))
+                if not data_part:
+                    break
+                data.extend(data_part)
+                since_ms = data[-1][0] + 1
+        except (ccxt.BaseError, DependencyException, OperationalException, TemporaryError) as e:
+            error = f'{e.__class__.__name__}: {e}'
+            logger.warning('Failed to download the pair: "%s", Interval: %s. %s',
+                           pair, tick_interval, error)
+        finally:
+            # Store partial data too, the next run resumes from it
+            if columnar:
+                if append:
+                    datastore.append_store(store, datastore.tickerlist_to_columns(data))
+                elif data or not datastore.store_exists(store):
+                    datastore.write_store(store, datastore.tickerlist_to_columns(data))
+            elif len(data) > cached or not os.path.isfile(filename):
+                misc.file_dump_json(filename, data)
+
+        self._report(pair, tick_interval, len(data) - cached, requests)
+        return DownloadResult(pair=pair, tick_interval=tick_interval, requests=requests,
+                              candles=len(data) - cached, error=error)
+
+    def _add_stats(self, requests: int = 0, candles: int = 0) -> None:
+        with self._lock:
+            self._requests += requests
+            self._candles += candles
+
+    def _report(self, pair: str, tick_interval: str, candles: int, requests: int) -> None:
+        with self._lock:
+            self._jobs_done += 1
+            elapsed = max(time.monotonic() - self._start, 1e-9)
+            logger.info('[%d/%d] %s %s: %d new candles in %d requests '
+                        '(overall %.2f requests/s, %.0f candles/s)',
+                        self._jobs_done, self._jobs_total, pair, tick_interval,
+                        candles, requests, self._requests / elapsed, self._candles / elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the progress and throughput of the current (or last) download
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self._start, 1e-9) if self._start else 0.0
+            return {
+                'jobs_total': self._jobs_total,
+                'jobs_done': self._jobs_done,
+                'requests': self._requests,
+                'candles': self._candles,
+                'elapsed': elapsed,
+                'requests_per_second': self._requests / elapsed if elapsed else 0.0,
+                'candles_per_second': self._candles / elapsed if elapsed else 0.0,
+            }
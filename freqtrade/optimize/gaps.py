@@ -0,0 +1,162 @@
+"""
+Gap detection and backfill for cached ticker data.
+
+Holes in a downloaded history (exchange outage, interrupted download) are found
+with a single vectorized pass over the date column, and only the missing
+windows are downloaded again instead of the whole history.
+"""
+import logging
+import os
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from freqtrade import exchange, misc, optimize
+from freqtrade.optimize import datastore
+from freqtrade.optimize.downloader import RateLimiter
+from freqtrade.optimize.resample import interval_ms
+
+logger = logging.getLogger(__name__)
+
+
+class Gap(NamedTuple):
+    """
+    NamedTuple describing a hole in the cached data, both bounds included
+    """
+    first_ms: int
+    last_ms: int
+    candles: int
+
+
+def find_gaps(dates: np.ndarray, tick_interval: str,
+              since_ms: Optional[int] = None) -> List[Gap]:
+    """
+    Find the missing candles in a sorted date column
+    :param dates: candle open times in ms
+    :param tick_interval: ticker interval of the data
+    :param since_ms: also report the candles missing between since_ms and the first candle
+    :return: list of Gap, oldest first
+    """
+    step = interval_ms(tick_interval)
+    dates = np.asarray(dates, dtype=np.int64)
+    gaps = []
+    if since_ms is not None and len(dates) and since_ms + step <= dates[0]:
+        # Align on the candles of the data
+        first_ms = int(dates[0] - (dates[0] - since_ms) // step * step)
+        gaps.append(Gap(first_ms, int(dates[0] - step), int((dates[0] - first_ms) // step)))
+
+    holes = np.flatnonzero(np.diff(dates) > step)
+    missing = (dates[holes + 1] - dates[holes]) // step - 1
+    gaps.extend(Gap(int(dates[idx] + step), int(dates[idx + 1] - step), int(count))
+                for idx, count in zip(holes, missing) if count > 0)
+    return gaps
+
+
+def format_gaps(gaps: List[Gap]) -> str:
+    """
+    Return a human readable report of the given gaps
+    """
+    return ', '.join(f'{misc.format_ms_time(gap.first_ms)} - {misc.format_ms_time(gap.last_ms)} '
+                     f'({gap.candles} candles)' for gap in gaps)
+
+
+def fetch_window(pair: str, tick_interval: str, first_ms: int, last_ms: int,
+                 limiter: Optional[RateLimiter] = None) -> Tuple[List[List], int]:
+    """
+    Download the candles between first_ms and last_ms (both included)
+    :return: (candles, number of requests)
+    """
+    data: List[List] = []
+    since_ms = first_ms
+    requests = 0
+    while since_ms <= last_ms:
+        if limiter:
+            limiter.acquire()
+        data_part = exchange.get_ticker_history_page(pair, tick_interval, since_ms=since_ms)
+        requests += 1
+        if not data_part:
+            break
+        data.extend(candle for candle in data_part if first_ms <= candle[0] <= last_ms)
+        since_ms = data_part[-1][0] + 1
+    return data, requests
+
+
+def _merge(data: List[List], new_data: List[List]) -> List[List]:
+    """
+    Merge two candle lists into one sorted list, the new candles winning on duplicates
+    """
+    merged = dict((candle[0], candle) for candle in data)
+    merged.update((candle[0], candle) for candle in new_data)
+    return [merged[date] for date in sorted(merged)]
+
+
+def backfill_gaps(datadir: str, pair: str, tick_interval: str,
+                  since_ms: Optional[int] = None,
+                  limiter: Optional[RateLimiter] = None,
+                  dry_run: bool = False) -> List[Gap]:
+    """
+    Find the gaps in the cached data of a pair and download only the missing windows.
+    Works on columnar stores as well as json files. Intervals derived from a finer
+    one (see optimize.load_resampled_data()) are skipped: their source is backfilled
+    instead, and they are derived again from it.
+    :param since_ms: also backfill the candles missing between since_ms and the cached data
+    :param dry_run: only report the gaps
+    :return: the gaps found
+    """
+    path = optimize.make_testdata_path(datadir)
+    store = datastore.store_path(path, pair, tick_interval)
+    filepair = pair.replace('/', '_')
+    filename = os.path.join(path, f'{filepair}-{tick_interval}.json')
+    is_zip = not os.path.isfile(filename) and os.path.isfile(filename + '.gz')
+
+    source = optimize.data_source(path, pair, tick_interval)
+    if source is not None and source['interval'] != tick_interval:
+        logger.warning('No data stored for pair: "%s", Interval: %s, it is derived from '
+                       'Interval: %s, backfill that one instead',
+                       pair, tick_interval, source['interval'])
+        return []
+    pairdata = optimize.load_tickerdata_file(datadir, pair, tick_interval)
+    if not pairdata:
+        logger.warning('No data for pair: "%s", Interval: %s, nothing to backfill',
+                       pair, tick_interval)
+        return []
+    if isinstance(pairdata, dict):
+        dates = pairdata['date']
+    else:
+        dates = np.fromiter((candle[0] for candle in pairdata), dtype=np.int64,
+                            count=len(pairdata))
+
+    gaps = find_gaps(dates, tick_interval, since_ms=since_ms)
+    if not gaps:
+        logger.info('No gaps in pair: "%s", Interval: %s', pair, tick_interval)
+        return gaps
+    logger.info('Found %d gaps (%d candles) in pair: "%s", Interval: %s: %s',
+                len(gaps), sum(gap.candles for gap in gaps), pair, tick_interval,
+                format_gaps(gaps))
+    if dry_run:
+        return gaps
+
+    new_data: List[List] = []
+    requests = 0
+    for gap in gaps:
+        window, window_requests = fetch_window(pair, tick_interval,
+                                               gap.first_ms, gap.last_ms, limiter=limiter)
+        new_data.extend(window)
+        requests += window_requests
+    logger.info('Backfilled %d of %d missing candles in %d requests for pair: "%s", '
+                'Interval: %s', len(new_data), sum(gap.candles for gap in gaps), requests,
+                pair, tick_interval)
+    if not new_data:
+        return gaps
+
+    # Candles are inserted in the middle of the history, so the cache is rewritten
+    if isinstance(pairdata, dict):
+        new_columns = datastore.tickerlist_to_columns(new_data)
+        columns = {col: np.concatenate([new_columns[col], pairdata[col]])
+                   for col in datastore.OHLCV_COLUMNS}
+        # np.unique() keeps the first occurrence of a date, so new candles win
+        _, index = np.unique(columns['date'], return_index=True)
+        datastore.write_store(store, {col: columns[col][index] for col in columns})
+    else:
+        misc.file_dump_json(filename, _merge(pairdata, new_data), is_zip=is_zip)
+    return gaps
@@ -24,7 +24,7 @@ from pandas import DataFrame
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from freqtrade.arguments import Arguments
 from freqtrade.configuration import Configuration
-from freqtrade.optimize import load_data
+from freqtrade.optimize import compact, dataframe_cache, load_data, parallel
 from freqtrade.optimize.backtesting import Backtesting
 
 logger = logging.getLogger(__name__)
@@ -493,16 +493,32 @@ class Hyperopt(Backtesting):
     def start(self) -> None:
         timerange = Arguments.parse_timerange(None if self.config.get(
             'timerange') is None else str(self.config.get('timerange')))
-        data = load_data(
-            datadir=str(self.config.get('datadir')),
-            pairs=self.config['exchange']['pair_whitelist'],
-            ticker_interval=self.ticker_interval,
-            timerange=timerange
-        )
-
         if self.has_space('buy'):
             self.analyze.populate_indicators = Hyperopt.populate_indicators  # type: ignore
-        self.processed = self.tickerdata_to_dataframe(data)
+        cache = dataframe_cache.from_config(self.config)
+        if self.config.get('preprocess_workers', 1) > 1 or cache:
+            self.processed = parallel.load_and_preprocess(
+                self.analyze,
+                str(self.config.get('datadir')),
+                pairs=self.config['exchange']['pair_whitelist'],
+                ticker_interval=self.ticker_interval,
+                timerange=timerange,
+                workers=self.config.get('preprocess_workers', 1),
+                cache=cache,
+                low_memory=self.config.get('low_memory', False)
+            )
+        else:
+            data = load_data(
+                datadir=str(self.config.get('datadir')),
+                pairs=self.config['exchange']['pair_whitelist'],
+                ticker_interval=self.ticker_interval,
+                timerange=timerange
+            )
+            if self.config.get('low_memory', False):
+                self.processed = compact.tickerdata_to_compact_dataframe(
+                    self.tickerdata_to_dataframe, data)
+            else:
+                self.processed = self.tickerdata_to_dataframe(data)
 
         logger.info('Preparing Trials..')
         signal.signal(signal.SIGINT, self.signal_handler)
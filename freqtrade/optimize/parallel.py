@@ -0,0 +1,140 @@
+"""
+Parallel loading and preprocessing of backtesting data.
+
+Every pair is loaded, parsed and populated with indicators in a worker process.
+Workers don't send their DataFrames back through the result pipe: they dump each
+column as a raw .npy file into a scratch directory (in shared memory when
+available) and only return the column layout, which the parent reads back.
+Pairs found in the dataframe cache (see freqtrade.optimize.dataframe_cache)
+are not preprocessed at all. In low-memory mode, each pair is downcast as soon
+as its indicators are populated (see freqtrade.optimize.compact), so only the
+pairs being preprocessed are held in float64.
+"""
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from pandas import DataFrame
+
+from freqtrade import optimize
+from freqtrade.optimize import compact
+from freqtrade.analyze import Analyze
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize.dataframe_cache import (ColumnLayout, DataFrameCache, dump_frame,
+                                                get_cached, load_frame)
+
+logger = logging.getLogger(__name__)
+
+# State inherited by the forked workers, see load_and_preprocess()
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _preprocess_pair(task: Tuple[int, str]) -> Tuple[str, Optional[ColumnLayout]]:
+    """
+    Worker: load, parse and populate indicators for one pair
+    """
+    index, pair = task
+    state = _WORKER_STATE
+    pairdata = optimize.load_tickerdata_file(state['datadir'], pair,
+                                             state['ticker_interval'],
+                                             timerange=state['timerange'])
+    if not pairdata:
+        return pair, None
+    frame = state['analyze'].tickerdata_to_dataframe({pair: pairdata})[pair]
+    if state['low_memory']:
+        compact.compact_pair(pair, frame)
+    # The scratch directory only holds the files of our own workers
+    return pair, dump_frame(frame, os.path.join(state['scratch'], str(index)), allow_pickle=True)
+
+
+def load_and_preprocess(analyze: Analyze,
+                        datadir: str,
+                        pairs: List[str],
+                        ticker_interval: str,
+                        refresh_pairs: Optional[bool] = False,
+                        timerange: TimeRange = TimeRange(None, None, 0, 0),
+                        workers: int = 1,
+                        cache: Optional[DataFrameCache] = None,
+                        low_memory: bool = False) -> Dict[str, DataFrame]:
+    """
+    Load ticker data and turn it into indicator-populated DataFrames,
+    using `workers` processes. Returns the same as
+    analyze.tickerdata_to_dataframe(optimize.load_data(...)).
+    :param cache: reuse the frames stored in this cache, and store the computed ones
+    :param low_memory: downcast each frame as soon as it is preprocessed
+    :return: dict pair -> DataFrame, in whitelist order
+    """
+    if refresh_pairs:
+        logger.info('Download data for all pairs and store them in %s', datadir)
+        optimize.download_pairs(datadir, pairs, ticker_interval, timerange=timerange)
+
+    if cache is None:
+        return _preprocess(analyze, datadir, pairs, ticker_interval, timerange, workers,
+                           low_memory)
+
+    cached, keys = get_cached(cache, analyze, datadir, pairs, ticker_interval, timerange,
+                              low_memory)
+    computed = _preprocess(analyze, datadir, [pair for pair in pairs if pair not in cached],
+                           ticker_interval, timerange, workers, low_memory)
+    for pair, frame in computed.items():
+        if pair in keys:
+            cache.put(keys[pair], frame)
+    cached.update(computed)
+    return {pair: cached[pair] for pair in pairs if pair in cached}
+
+
+def _preprocess(analyze: Analyze,
+                datadir: str,
+                pairs: List[str],
+                ticker_interval: str,
+                timerange: TimeRange,
+                workers: int,
+                low_memory: bool) -> Dict[str, DataFrame]:
+    """
+    Load and preprocess the given pairs, see load_and_preprocess()
+    """
+    if not pairs:
+        return {}
+    if workers <= 1 or len(pairs) <= 1 or \
+            'fork' not in multiprocessing.get_all_start_methods():
+        data = optimize.load_data(datadir, pairs=pairs, ticker_interval=ticker_interval,
+                                  timerange=timerange)
+        if low_memory:
+            return compact.tickerdata_to_compact_dataframe(analyze.tickerdata_to_dataframe, data)
+        return analyze.tickerdata_to_dataframe(data)
+
+    workers = min(workers, len(pairs))
+    logger.info('Preprocessing %d pairs using %d processes ...', len(pairs), workers)
+
+    scratch = tempfile.mkdtemp(prefix='freqtrade-',
+                               dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+    # Workers are forked, so the (possibly monkeypatched) analyze object and
+    # the strategy it holds don't need to be picklable
+    _WORKER_STATE.update({
+        'analyze': analyze,
+        'datadir': datadir,
+        'ticker_interval': ticker_interval,
+        'timerange': timerange,
+        'scratch': scratch,
+        'low_memory': low_memory,
+    })
+    result = {}
+    try:
+        with multiprocessing.get_context('fork').Pool(processes=workers) as pool:
+            for pair, layout in pool.imap(_preprocess_pair, enumerate(pairs)):
+                if layout is None:
+                    logger.warning(
+                        'No data for pair: "%s", Interval: %s. '
+                        'Use --refresh-pairs-cached to download the data',
+                        pair,
+                        ticker_interval
+                    )
+                    continue
+                result[pair] = load_frame(layout, allow_pickle=True)
+    finally:
+        _WORKER_STATE.clear()
+        shutil.rmtree(scratch, ignore_errors=True)
+    return result
@@ -0,0 +1,75 @@
+"""
+Derive higher ticker intervals from the candles of a finer one.
+
+Candles are aggregated with numpy reductions over the buckets of the target
+interval: first open, highest high, lowest low, last close and summed volume.
+Duplicated candles of the source are merged first, the same way
+Analyze.parse_ticker_dataframe() does it.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from freqtrade import constants, misc
+from freqtrade.optimize import datastore
+
+# Weekly candles start on monday, the epoch was a thursday
+_BUCKET_OFFSET_MS = {
+    '1w': 4 * 24 * 60 * 60 * 1000,
+}
+
+
+def interval_ms(tick_interval: str) -> int:
+    """
+    Return the length of one candle in ms
+    """
+    return constants.TICKER_INTERVAL_MINUTES[tick_interval] * 60 * 1000
+
+
+def source_intervals(tick_interval: str) -> List[str]:
+    """
+    Return the intervals the given interval can be derived from, finest first
+    """
+    minutes = constants.TICKER_INTERVAL_MINUTES.get(tick_interval)
+    if not minutes:
+        return []
+    return sorted((interval for interval, source_minutes
+                   in constants.TICKER_INTERVAL_MINUTES.items()
+                   if source_minutes < minutes and minutes % source_minutes == 0),
+                  key=lambda interval: constants.TICKER_INTERVAL_MINUTES[interval])
+
+
+def resample_columns(columns: Dict[str, np.ndarray],
+                     tick_interval: str) -> Dict[str, np.ndarray]:
+    """
+    Build the candles of tick_interval from finer candles
+    :param columns: dict column name -> array, see datastore.tickerlist_to_columns()
+    :param tick_interval: ticker interval to build
+    :return: dict column name -> array, the last candle may be incomplete. The first
+             candle is dropped when the source starts partway through it.
+    """
+    if not len(columns['date']):
+        return {col: np.asarray(columns[col])[:0] for col in datastore.OHLCV_COLUMNS}
+
+    dates = np.asarray(columns['date'], dtype=np.int64)
+    if np.any(np.diff(dates) < 0):
+        order = np.argsort(dates, kind='mergesort')
+        columns = {col: np.asarray(columns[col])[order] for col in datastore.OHLCV_COLUMNS}
+        dates = dates[order]
+    else:
+        columns = {col: np.asarray(columns[col]) for col in datastore.OHLCV_COLUMNS}
+
+    # Merge duplicated candles, volume is the max as in parse_ticker_dataframe()
+    columns = misc.aggregate_ohlcv(columns, dates, np.maximum)
+
+    step = interval_ms(tick_interval)
+    offset = _BUCKET_OFFSET_MS.get(tick_interval, 0)
+    buckets = (columns['date'] - offset) // step * step + offset
+    if buckets[0] != columns['date'][0]:
+        # Its open and volume would miss the candles before the source
+        keep = buckets != buckets[0]
+        columns = {col: columns[col][keep] for col in columns}
+        buckets = buckets[keep]
+        if not len(buckets):
+            return columns
+    return misc.aggregate_ohlcv(columns, buckets, np.add)
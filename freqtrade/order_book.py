@@ -0,0 +1,168 @@
+"""
+Order book backed by numpy arrays.
+
+The levels of each side are kept best price first along with their cumulative
+volume and cost, so that the queries of the buy and sell logic are a lookup or
+a binary search instead of building DataFrames.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BUY = 'buy'
+SELL = 'sell'
+
+
+class _Side(object):
+    """
+    Levels of one side of the book, best price first
+    """
+
+    def __init__(self, levels: List[List[float]]) -> None:
+        # Some exchanges add the number of orders after the price and amount
+        array = np.asarray(levels, dtype=np.float64).reshape(len(levels), -1) \
+            if len(levels) else np.empty((0, 2))
+        self.prices = array[:, 0]
+        self.sizes = array[:, 1]
+        self.cum_sizes = np.cumsum(self.sizes)
+        self.cum_costs = np.cumsum(self.prices * self.sizes)
+
+    @property
+    def volume(self) -> float:
+        return float(self.cum_sizes[-1]) if len(self.cum_sizes) else 0.0
+
+    def volume_to(self, levels: int) -> float:
+        """
+        Volume of the levels up to the given number of levels (excluded)
+        """
+        return float(self.cum_sizes[levels - 1]) if levels > 0 else 0.0
+
+    def level_of_volume(self, amount: float) -> int:
+        """
+        Index of the level at which the cumulative volume reaches amount,
+        len(self.prices) if the side does not hold that much
+        """
+        return int(np.searchsorted(self.cum_sizes, amount, side='left'))
+
+
+class OrderBook(object):
+    """
+    Bids and asks of a pair, see exchange.get_order_book()
+    """
+
+    def __init__(self, bids: List[List[float]], asks: List[List[float]]) -> None:
+        """
+        :param bids: [price, amount] levels, highest price first
+        :param asks: [price, amount] levels, lowest price first
+        """
+        self._bids = _Side(bids)
+        self._asks = _Side(asks)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'OrderBook':
+        """
+        Create an order book from the dict returned by exchange.get_order_book()
+        """
+        return cls(data['bids'], data['asks'])
+
+    @property
+    def bid_prices(self) -> np.ndarray:
+        return self._bids.prices
+
+    @property
+    def ask_prices(self) -> np.ndarray:
+        return self._asks.prices
+
+    @property
+    def bid_volume(self) -> float:
+        return self._bids.volume
+
+    @property
+    def ask_volume(self) -> float:
+        return self._asks.volume
+
+    def bid(self, level: int = 1) -> float:
+        """
+        Price of a bid level, 1 being the highest bid
+        """
+        return float(self._bids.prices[level - 1])
+
+    def ask(self, level: int = 1) -> float:
+        """
+        Price of an ask level, 1 being the lowest ask
+        """
+        return float(self._asks.prices[level - 1])
+
+    @property
+    def mid_price(self) -> float:
+        return (self.bid() + self.ask()) / 2
+
+    def depth(self, percent: float) -> Tuple[float, float]:
+        """
+        Volume of the bids and of the asks within percent of the mid price
+        :param percent: distance from the mid price, 0.01 for 1%
+        :return: (bid volume, ask volume)
+        """
+        mid = self.mid_price
+        # Bids are sorted decreasingly, the prices are negated for searchsorted
+        bid_levels = int(np.searchsorted(-self._bids.prices, -mid * (1 - percent), side='right'))
+        ask_levels = int(np.searchsorted(self._asks.prices, mid * (1 + percent), side='right'))
+        return self._bids.volume_to(bid_levels), self._asks.volume_to(ask_levels)
+
+    def bids_asks_ratio(self, percent: Optional[float] = None) -> float:
+        """
+        Volume of the bids divided by the volume of the asks, of the whole book
+        or within percent of the mid price
+        """
+        bids, asks = self.depth(percent) if percent is not None \
+            else (self.bid_volume, self.ask_volume)
+        return bids / asks if asks else float('inf')
+
+    def imbalance(self, percent: Optional[float] = None) -> float:
+        """
+        (bids - asks) / (bids + asks), from -1 when there are only asks to 1
+        when there are only bids, of the whole book or within percent of the mid price
+        """
+        bids, asks = self.depth(percent) if percent is not None \
+            else (self.bid_volume, self.ask_volume)
+        total = bids + asks
+        return (bids - asks) / total if total else 0.0
+
+    def _side(self, side: str) -> _Side:
+        """
+        Levels filling an order: a buy takes the asks, a sell takes the bids
+        """
+        if side == BUY:
+            return self._asks
+        if side == SELL:
+            return self._bids
+        raise ValueError(f'Unknown order side {side}')
+
+    def price_at_volume(self, side: str, amount: float) -> Optional[float]:
+        """
+        Price of the last level needed to fill amount units
+        :param side: BUY or SELL
+        :return: price or None if the book does not hold amount units
+        """
+        levels = self._side(side)
+        index = levels.level_of_volume(amount)
+        if index >= len(levels.prices):
+            return None
+        return float(levels.prices[index])
+
+    def vwap(self, side: str, amount: float) -> Optional[float]:
+        """
+        Average price of an order of amount units filled by the book
+        :param side: BUY or SELL
+        :return: price or None if the book does not hold amount units
+        """
+        if amount <= 0:
+            return None
+        levels = self._side(side)
+        index = levels.level_of_volume(amount)
+        if index >= len(levels.prices):
+            return None
+        cost = levels.cum_costs[index - 1] if index else 0.0
+        filled = levels.cum_sizes[index - 1] if index else 0.0
+        cost += (amount - filled) * levels.prices[index]
+        return float(cost / amount)
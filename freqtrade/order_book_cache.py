@@ -0,0 +1,92 @@
+"""
+Short lived cache of the order books requested by the live trading loop.
+
+The target bid, the sell rate and the depth of market check each look at the
+order book of a pair, with a different number of levels. A snapshot is kept
+for ttl seconds and serves every request for as many levels or fewer; a
+request for more levels fetches a deeper snapshot, rounded up to the next
+DEPTHS step so that the following requests are served from it too.
+"""
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from freqtrade import exchange
+
+logger = logging.getLogger(__name__)
+
+# Depths fetched, as accepted by most exchanges
+DEPTHS = [5, 10, 20, 50, 100, 500, 1000]
+
+
+class OrderBookCache(object):
+    """
+    Latest order book snapshot of each pair
+    """
+
+    def __init__(self, ttl: float, min_depth: int = DEPTHS[0],
+                 fetch: Optional[Callable[[str, int], Dict]] = None) -> None:
+        """
+        :param ttl: seconds during which a snapshot is used
+        :param min_depth: minimum number of levels fetched
+        :param fetch: function requesting an order book, exchange.get_order_book by default
+        """
+        self.ttl = ttl
+        self.min_depth = min_depth
+        self._fetch = fetch
+        self.hits = 0
+        self.misses = 0
+        # pair -> (monotonic time of the request, depth requested, order book)
+        self._books: Dict[str, Tuple[float, int, Dict]] = {}
+
+    def get(self, pair: str, limit: int = 100) -> Dict:
+        """
+        Return the order book of a pair with at most limit levels per side
+        :param pair: pair in format ANT/BTC
+        :param limit: number of levels needed
+        :return: order book, see exchange.get_order_book()
+        """
+        now = time.monotonic()
+        cached = self._books.get(pair)
+        if cached is not None and now - cached[0] < self.ttl and self._covers(cached, limit):
+            self.hits += 1
+            logger.debug('Using the order book of %s fetched %.1fs ago (hits=%d, misses=%d)',
+                         pair, now - cached[0], self.hits, self.misses)
+            return self._truncate(cached[2], limit)
+
+        self.misses += 1
+        depth = self._depth(limit)
+        book = (self._fetch or exchange.get_order_book)(pair, depth)
+        self._books[pair] = (now, depth, book)
+        return self._truncate(book, limit)
+
+    def _depth(self, limit: int) -> int:
+        """
+        Number of levels to fetch for a request of limit levels
+        """
+        limit = max(limit, self.min_depth)
+        return next((depth for depth in DEPTHS if depth >= limit), limit)
+
+    @staticmethod
+    def _covers(cached: Tuple[float, int, Dict], limit: int) -> bool:
+        """
+        True if the snapshot has the levels requested, or every level of the book
+        """
+        _, depth, book = cached
+        if depth >= limit:
+            return True
+        # Fewer levels than requested were returned: the book is complete
+        return len(book['bids']) < depth and len(book['asks']) < depth
+
+    @staticmethod
+    def _truncate(book: Dict, limit: int) -> Dict:
+        return dict(book, bids=book['bids'][:limit], asks=book['asks'][:limit])
+
+    def clear(self, pair: Optional[str] = None) -> None:
+        """
+        Drop the order book of a pair, or of all pairs
+        """
+        if pair is None:
+            self._books.clear()
+        else:
+            self._books.pop(pair, None)
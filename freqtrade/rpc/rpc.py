@@ -73,7 +73,7 @@ class RPC(object):
                 if trade.open_order_id:
                     order = exchange.get_order(trade.open_order_id, trade.pair)
                 # calculate profit and send message to user
-                current_rate = exchange.get_ticker(trade.pair, False)['bid']
+                current_rate = self._freqtrade.market_data.get_ticker(trade.pair, False)['bid']
                 current_profit = trade.calc_profit_percent(current_rate)
                 fmt_close_profit = '{:.2f}%'.format(
                     round(trade.close_profit * 100, 2)
@@ -118,7 +118,7 @@ class RPC(object):
             trades_list = []
             for trade in trades:
                 # calculate profit and send message to user
-                current_rate = exchange.get_ticker(trade.pair, False)['bid']
+                current_rate = self._freqtrade.market_data.get_ticker(trade.pair, False)['bid']
                 trades_list.append([
                     trade.id,
                     trade.pair,
@@ -204,7 +204,7 @@ class RPC(object):
                 profit_closed_percent.append(profit_percent)
             else:
                 # Get current rate
-                current_rate = exchange.get_ticker(trade.pair, False)['bid']
+                current_rate = self._freqtrade.market_data.get_ticker(trade.pair, False)['bid']
                 profit_percent = trade.calc_profit_percent(rate=current_rate)
 
             profit_all_coin.append(
@@ -269,9 +269,9 @@ class RPC(object):
                 rate = 1.0
             else:
                 if coin == 'USDT':
-                    rate = 1.0 / exchange.get_ticker('BTC/USDT', False)['bid']
+                    rate = 1.0 / self._freqtrade.market_data.get_ticker('BTC/USDT', False)['bid']
                 else:
-                    rate = exchange.get_ticker(coin + '/BTC', False)['bid']
+                    rate = self._freqtrade.market_data.get_ticker(coin + '/BTC', False)['bid']
             est_btc: float = rate * balance['total']
             total = total + est_btc
             output.append(
@@ -341,7 +341,7 @@ class RPC(object):
                     return
 
             # Get current rate and execute sell
-            current_rate = exchange.get_ticker(trade.pair, False)['bid']
+            current_rate = self._freqtrade.market_data.get_ticker(trade.pair, False)['bid']
             self._freqtrade.execute_sell(trade, current_rate)
         # ---- EOF def _exec_forcesell ----
 
@@ -2,8 +2,10 @@
 This module contains class to manage RPC communications (Telegram, Slack, ...)
 """
 import logging
-from typing import List
+from concurrent.futures import Executor
+from typing import List, Optional
 
+from freqtrade import metrics
 from freqtrade.rpc.rpc import RPC
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,8 @@ class RPCManager(object):
     def __init__(self, freqtrade) -> None:
         """ Initializes all enabled rpc modules """
         self.registered_modules: List[RPC] = []
+        # Messages are sent from this executor when set, instead of waiting for them
+        self.executor: Optional[Executor] = None
 
         # Enable telegram
         if freqtrade.config['telegram'].get('enabled', False):
@@ -39,6 +43,16 @@ class RPCManager(object):
         :return: None
         """
         logger.info('Sending rpc message: %s', msg)
-        for mod in self.registered_modules:
-            logger.debug('Forwarding message to rpc.%s', mod.name)
-            mod.send_msg(msg)
+        if self.executor:
+            self.executor.submit(self._send_msg, msg)
+        else:
+            self._send_msg(msg)
+
+    def _send_msg(self, msg: str) -> None:
+        """
+        Forward the message to the registered rpc modules
+        """
+        with metrics.phase('rpc'):
+            for mod in self.registered_modules:
+                logger.debug('Forwarding message to rpc.%s', mod.name)
+                mod.send_msg(msg)
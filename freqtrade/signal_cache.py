@@ -0,0 +1,55 @@
+"""
+Cache of the buy and sell signals computed by the live trading loop.
+
+A signal only changes when a new candle is available: it is kept along with
+the date of the candle it was computed on, and computed again once a newer
+candle is expected.
+"""
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SignalCache(object):
+    """
+    Latest signal of each pair and ticker interval
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._signals: Dict[Tuple[str, str], Tuple[int, Tuple[bool, bool]]] = {}
+
+    def get(self, pair: str, tick_interval: str, candle_ms: int) -> Optional[Tuple[bool, bool]]:
+        """
+        Return the signal of a pair if it was computed on the given candle or a newer one
+        :param pair: pair in format ANT/BTC
+        :param tick_interval: ticker interval
+        :param candle_ms: date of the latest candle available, in ms
+        :return: (Buy, Sell) or None if the signal has to be computed
+        """
+        cached = self._signals.get((pair, tick_interval))
+        if cached is not None and cached[0] >= candle_ms:
+            self.hits += 1
+            logger.debug('Using the signal of %s computed on %s (hits=%d, misses=%d)',
+                         pair, cached[0], self.hits, self.misses)
+            return cached[1]
+        self.misses += 1
+        return None
+
+    def set(self, pair: str, tick_interval: str, candle_ms: int,
+            signal: Tuple[bool, bool]) -> None:
+        """
+        Store the signal computed on a candle
+        :param candle_ms: date of the latest analyzed candle, in ms
+        """
+        self._signals[(pair, tick_interval)] = (candle_ms, signal)
+
+    def clear(self, pair: Optional[str] = None) -> None:
+        """
+        Drop the signals of a pair, or of all pairs
+        """
+        for key in list(self._signals):
+            if pair is None or key[0] == pair:
+                del self._signals[key]
@@ -28,6 +28,13 @@ class IStrategy(ABC):
     # associated ticker interval
     ticker_interval: str
 
+    # number of candles the indicators need to be valid on the latest candle,
+    # the signals are only computed over that many candles when set
+    startup_candle_count: int = 0
+
+    # the indicators of new candles can be computed by update_indicators()
+    incremental_indicators: bool = False
+
     def populate_indicators(self, dataframe: DataFrame) -> DataFrame:
         """
         Populate indicators that will be used in the Buy and Sell strategy
@@ -69,6 +76,20 @@ class IStrategy(ABC):
         """
         return self.populate_indicators(dataframe)
 
+    def update_indicators(self, dataframe: DataFrame, start: int, pair: str) -> DataFrame:
+        """
+        Populate the indicators of the candles from start onwards, the ones before
+        have already been populated by a previous call or by populate_indicators().
+        Only used when incremental_indicators is set. By default all the indicators
+        are populated again over the given candles, override it to only compute the new ones.
+        :param dataframe: DataFrame, the indicator columns are NaN from start onwards
+        :param start: index of the first candle to populate
+        :param pair: The currently traded pair
+        :return: a Dataframe with all mandatory indicators for the strategies
+        """
+        ohlcv = dataframe[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
+        return self.advise_indicators(ohlcv, pair)
+
     def advise_buy(self, dataframe: DataFrame, pair: str) -> DataFrame:
         """
         Based on TA indicators, populates the buy signal for the given dataframe
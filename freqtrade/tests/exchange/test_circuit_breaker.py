@@ -0,0 +1,201 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from freqtrade import DependencyException, TemporaryError, metrics
+from freqtrade import exchange
+from freqtrade.exchange.circuit_breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker,
+                                                CircuitOpenError, backoff_delay)
+from freqtrade.tests.conftest import get_patched_freqtradebot
+
+
+class Clock(object):
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def breakers(mocker):
+    """
+    Circuit breakers enabled, with a clock moved by the test
+    """
+    clock = Clock()
+    mocker.patch('freqtrade.exchange._BREAKER_CONF',
+                 {'failure_threshold': 2, 'reset_timeout': 60, 'clock': clock})
+    mocker.patch.dict('freqtrade.exchange._BREAKERS', clear=True)
+    mocker.patch('freqtrade.exchange._BREAKER_LISTENERS', [])
+    mocker.patch('freqtrade.exchange.time.sleep')
+    return clock
+
+
+def test_backoff_delay(mocker) -> None:
+    assert backoff_delay(3, base=0) == 0
+    mocker.patch('freqtrade.exchange.circuit_breaker.random.uniform',
+                 side_effect=lambda low, high: high)
+    assert [backoff_delay(attempt, base=1, cap=5) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_circuit_breaker() -> None:
+    clock = Clock()
+    listener = MagicMock()
+    breaker = CircuitBreaker('get_ticker', failure_threshold=2, reset_timeout=60,
+                             clock=clock, listeners=[listener])
+    assert breaker.before_call() is False
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == CLOSED
+    breaker.failure()
+    assert breaker.state == OPEN
+    listener.assert_called_once_with('get_ticker', CLOSED, OPEN)
+
+    clock.now = 59
+    with pytest.raises(CircuitOpenError, match=r'get_ticker open for 1 seconds'):
+        breaker.before_call()
+    # a single trial call once the timeout elapsed
+    clock.now = 60
+    assert breaker.before_call() is True
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError, match=r'trial call running'):
+        breaker.before_call()
+    breaker.failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 120
+    assert breaker.before_call() is True
+    breaker.success()
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is False
+    assert [call[0][2] for call in listener.call_args_list] == \
+        [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+
+
+def test_circuit_breaker_metrics() -> None:
+    metrics.init({'metrics': {'enabled': True}})
+    try:
+        breaker = CircuitBreaker('get_order', failure_threshold=1)
+        breaker.failure()
+        registry = metrics.registry()
+        assert registry.gauge('freqtrade_exchange_breaker_state', endpoint='get_order') == 2
+        assert registry.counter('freqtrade_exchange_breaker_transitions_total',
+                                endpoint='get_order', state=OPEN) == 1
+    finally:
+        metrics.cleanup()
+
+
+def test_retrier_backoff(mocker) -> None:
+    mocker.patch.dict('freqtrade.exchange._BACKOFF', {'base': 1, 'max': 3})
+    mocker.patch('freqtrade.exchange.circuit_breaker.random.uniform',
+                 side_effect=lambda low, high: high)
+    sleep = mocker.patch('freqtrade.exchange.time.sleep')
+    api = MagicMock(side_effect=TemporaryError('Timeout'), __name__='get_balance')
+
+    with pytest.raises(TemporaryError):
+        exchange.retrier(api)()
+    assert api.call_count == exchange.API_RETRY_COUNT + 1
+    assert [call[0][0] for call in sleep.call_args_list] == [1, 2, 3, 3]
+
+    # no delay by default
+    mocker.patch.dict('freqtrade.exchange._BACKOFF', {'base': 0})
+    sleep.reset_mock()
+    with pytest.raises(TemporaryError):
+        exchange.retrier(api)()
+    assert sleep.call_count == 0
+
+
+def test_retrier_circuit_breaker(breakers) -> None:
+    api = MagicMock(side_effect=TemporaryError('Timeout'), __name__='get_ticker')
+    get_ticker = exchange.retrier(api)
+    for _ in range(2):
+        with pytest.raises(TemporaryError):
+            get_ticker('ETH/BTC')
+    assert api.call_count == 2 * (exchange.API_RETRY_COUNT + 1)
+
+    # open: the calls fail right away, the other endpoints are still called
+    with pytest.raises(CircuitOpenError):
+        get_ticker('ETH/BTC')
+    assert api.call_count == 2 * (exchange.API_RETRY_COUNT + 1)
+    get_order = exchange.retrier(MagicMock(return_value={}, __name__='get_order'))
+    assert get_order('123', 'ETH/BTC') == {}
+
+    # the trial call is not retried
+    breakers.now = 60
+    api.reset_mock()
+    with pytest.raises(TemporaryError):
+        get_ticker('ETH/BTC')
+    assert api.call_count == 1
+    assert exchange.get_breaker('get_ticker').state == OPEN
+
+    breakers.now = 120
+    api.side_effect = None
+    api.return_value = {'bid': 1}
+    assert get_ticker('ETH/BTC') == {'bid': 1}
+    assert exchange.get_breaker('get_ticker').state == CLOSED
+
+
+def test_retrier_circuit_breaker_answer(breakers) -> None:
+    # the exchange answered, the breaker stays closed
+    api = MagicMock(side_effect=DependencyException('Insufficient funds'), __name__='buy')
+    for _ in range(3):
+        with pytest.raises(DependencyException):
+            exchange.retrier(api)('ETH/BTC', 1, 1)
+    assert exchange.get_breaker('buy').state == CLOSED
+
+
+def test_init_retries(mocker) -> None:
+    mocker.patch.dict('freqtrade.exchange._BACKOFF')
+    mocker.patch('freqtrade.exchange._BREAKER_CONF')
+    exchange.init_retries({'retry_backoff_secs': 0.5, 'circuit_breaker': True,
+                           'circuit_breaker_reset_secs': 10})
+    assert exchange._BACKOFF == {'base': 0.5, 'max': 30}
+    breaker = exchange.get_breaker('get_ticker')
+    assert breaker.reset_timeout == 10
+    assert breaker.failure_threshold == 3
+    assert exchange.get_breaker('get_ticker') is breaker
+
+    exchange.init_retries({})
+    assert exchange._BACKOFF['base'] == 0
+    assert exchange.get_breaker('get_ticker') is None
+
+
+def test_process_circuit_open(default_conf, mocker) -> None:
+    default_conf['max_open_trades'] = 3
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    trade_mock = mocker.patch('freqtrade.freqtradebot.Trade')
+    trade_mock.query.filter.return_value.all.return_value = [
+        MagicMock(pair='ETH/BTC'), MagicMock(pair='LTC/BTC')]
+    mocker.patch.object(freqtrade, '_update_whitelist')
+    sell = mocker.patch.object(freqtrade, 'process_maybe_execute_sell',
+                               side_effect=[CircuitOpenError('open'), True])
+    buy = mocker.patch.object(freqtrade, 'process_maybe_execute_buy', return_value=False)
+    sleep = mocker.patch('freqtrade.freqtradebot.time.sleep')
+
+    freqtrade._process()
+    assert sell.call_count == 2
+    assert buy.call_count == 1
+    assert sleep.call_count == 0
+
+    # a failing whitelist skips the iteration without waiting
+    freqtrade._update_whitelist.side_effect = CircuitOpenError('open')
+    freqtrade._process()
+    assert sell.call_count == 2
+    assert sleep.call_count == 0
+
+
+def test_notify_breaker_change(default_conf, mocker) -> None:
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    freqtrade._notify_breaker_change('get_ticker', CLOSED, OPEN)
+    freqtrade._notify_breaker_change('get_ticker', OPEN, HALF_OPEN)
+    freqtrade._notify_breaker_change('get_ticker', HALF_OPEN, CLOSED)
+    messages = [call[0][0] for call in freqtrade.rpc.send_msg.call_args_list]
+    assert messages == [
+        '*Exchange:* `get_ticker` is failing, circuit breaker opened',
+        '*Exchange:* `get_ticker` answers again, circuit breaker closed',
+    ]
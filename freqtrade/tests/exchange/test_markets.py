@@ -0,0 +1,172 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import json
+import os
+from unittest.mock import MagicMock
+
+import ccxt
+import pytest
+
+from freqtrade import OperationalException, TemporaryError
+from freqtrade import exchange
+from freqtrade.exchange.markets import MarketCache
+
+MARKETS = [
+    {'symbol': 'ETH/BTC', 'base': 'ETH', 'quote': 'BTC', 'active': True},
+    {'symbol': 'LTC/BTC', 'base': 'LTC', 'quote': 'BTC', 'active': True},
+    {'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT', 'active': True},
+    {'symbol': 'XBT.M19', 'active': True},
+]
+
+
+class Clock(object):
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_market_cache_indexes() -> None:
+    fetch = MagicMock(return_value=MARKETS)
+    cache = MarketCache(fetch, ttl=60)
+    assert cache.get('ETH/BTC')['base'] == 'ETH'
+    assert cache.get('XRP/BTC') is None
+    assert [market['symbol'] for market in cache.by_quote('BTC')] == ['ETH/BTC', 'LTC/BTC']
+    assert cache.by_quote('EUR') == []
+    # a market without quote is not indexed by quote
+    assert None not in cache._by_quote
+    assert set(cache.symbols()) == {'ETH/BTC', 'LTC/BTC', 'BTC/USDT', 'XBT.M19'}
+    assert cache.markets() == MARKETS
+    assert fetch.call_count == 1
+
+
+def test_market_cache_refresh() -> None:
+    clock = Clock()
+    fetch = MagicMock(return_value=MARKETS)
+    cache = MarketCache(fetch, ttl=60, clock=clock)
+    cache.markets()
+    clock.now += 59
+    cache.markets()
+    assert fetch.call_count == 1
+
+    # outdated: the cached markets are served while refreshed in the background
+    clock.now += 1
+    fetch.return_value = MARKETS[:1]
+    assert cache.markets() == MARKETS
+    cache.wait(5)
+    assert fetch.call_count == 2
+    assert cache.markets() == MARKETS[:1]
+    assert cache.get('LTC/BTC') is None
+    assert cache.updated == clock.now
+
+    # a failed refresh keeps them
+    clock.now += 60
+    fetch.side_effect = TemporaryError('Timeout')
+    cache.markets()
+    cache.wait(5)
+    assert cache.markets() == MARKETS[:1]
+
+
+def test_market_cache_invalidate() -> None:
+    fetch = MagicMock(return_value=MARKETS)
+    cache = MarketCache(fetch, ttl=3600)
+    cache.invalidate()
+    assert fetch.call_count == 0
+    cache.markets()
+    cache.invalidate()
+    cache.wait(5)
+    assert fetch.call_count == 2
+    assert not cache.expired()
+
+
+def test_market_cache_persistence(tmpdir) -> None:
+    path = os.path.join(str(tmpdir), 'binance', 'markets.json')
+    clock = Clock()
+    cache = MarketCache(MagicMock(return_value=MARKETS), path=path, clock=clock)
+    assert not cache.load()
+    cache.markets()
+    with open(path) as file:
+        assert json.load(file) == {'updated': 1000.0, 'markets': MARKETS}
+
+    # a restart uses them without a request
+    fetch = MagicMock(return_value=MARKETS)
+    cache = MarketCache(fetch, ttl=3600, path=path, clock=clock)
+    assert cache.load()
+    assert cache.get('ETH/BTC') is not None
+    assert fetch.call_count == 0
+    assert cache.updated == 1000.0
+
+    with open(path, 'w') as file:
+        file.write('{')
+    assert not MarketCache(fetch, path=path).load()
+
+
+def test_init_markets(default_conf, mocker, tmpdir) -> None:
+    path = os.path.join(str(tmpdir), 'markets.json')
+    with open(path, 'w') as file:
+        json.dump({'updated': 0, 'markets': MARKETS}, file)
+    api_mock = MagicMock(markets={})
+    api_mock.fetch_markets.return_value = MARKETS
+    mocker.patch('freqtrade.exchange._API', api_mock)
+    mocker.patch('freqtrade.exchange._MARKETS')
+    mocker.patch('freqtrade.exchange._MARKETS_API')
+    mocker.patch.dict('freqtrade.exchange._CONF', default_conf)
+    default_conf['internals'] = {'markets_file': path, 'markets_ttl': 3600}
+
+    exchange.init_markets(default_conf)
+    api_mock.set_markets.assert_called_with(MARKETS)
+    # the saved markets are outdated and refreshed in the background
+    exchange._MARKETS.wait(5)
+    assert api_mock.fetch_markets.call_count == 1
+    assert exchange._MARKETS.ttl == 3600
+
+    exchange.validate_pairs(['ETH/BTC', 'LTC/BTC'])
+    with pytest.raises(OperationalException, match=r'XRP/BTC is not available'):
+        exchange.validate_pairs(['XRP/BTC'])
+    assert exchange.get_markets() == MARKETS
+    assert api_mock.fetch_markets.call_count == 1
+    assert api_mock.load_markets.call_count == 0
+
+    # the cache belongs to the exchange it was created for
+    mocker.patch('freqtrade.exchange._API', MagicMock())
+    assert exchange._market_cache() is None
+
+
+def test_get_markets_by_quote(default_conf, mocker, tmpdir) -> None:
+    api_mock = MagicMock()
+    api_mock.fetch_markets.return_value = MARKETS
+    mocker.patch('freqtrade.exchange._API', api_mock)
+    mocker.patch('freqtrade.exchange._MARKETS')
+    mocker.patch('freqtrade.exchange._MARKETS_API')
+    default_conf['internals'] = {'markets_file': os.path.join(str(tmpdir), 'markets.json')}
+    exchange.init_markets(default_conf)
+
+    assert exchange.get_markets_by_quote('BTC') == MARKETS[:2]
+    assert exchange.get_markets_by_quote('USDT') == MARKETS[2:3]
+    assert exchange.get_markets_by_quote('ETH') == []
+    assert api_mock.fetch_markets.call_count == 1
+
+    # without a cache the markets are filtered
+    mocker.patch('freqtrade.exchange._MARKETS', None)
+    assert exchange.get_markets_by_quote('BTC') == MARKETS[:2]
+    assert api_mock.fetch_markets.call_count == 2
+
+
+def test_unknown_symbol_invalidates_markets(default_conf, mocker, tmpdir) -> None:
+    api_mock = MagicMock()
+    api_mock.fetch_markets.return_value = MARKETS
+    api_mock.fetch_ticker.side_effect = ccxt.ExchangeError('binance does not have market '
+                                                           'symbol XRP/BTC')
+    mocker.patch('freqtrade.exchange._API', api_mock)
+    mocker.patch('freqtrade.exchange._MARKETS')
+    mocker.patch('freqtrade.exchange._MARKETS_API')
+    default_conf['internals'] = {'markets_file': os.path.join(str(tmpdir), 'markets.json')}
+    exchange.init_markets(default_conf)
+    exchange.get_markets()
+    assert api_mock.fetch_markets.call_count == 1
+
+    with pytest.raises(TemporaryError):
+        exchange.get_ticker('XRP/BTC', refresh=True, count=0)
+    exchange._MARKETS.wait(5)
+    assert api_mock.fetch_markets.call_count == 2
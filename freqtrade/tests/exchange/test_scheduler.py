@@ -0,0 +1,144 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from freqtrade import TemporaryError, metrics
+from freqtrade.exchange.scheduler import (FakeClock, RequestScheduler, ScheduledExchange,
+                                          TokenBucket)
+
+
+def test_token_bucket() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=4, clock=clock)
+    assert bucket.wait_time(4) == 0
+    bucket.take(4)
+    assert bucket.wait_time(1) == 0.5
+    clock.advance(1)
+    assert bucket.wait_time(1) == 0
+    assert bucket.wait_time(3) == 0.5
+    # heavier than the bucket: waits for it to be full
+    assert bucket.wait_time(10) == 1
+    clock.advance(10)
+    assert bucket.tokens == 2
+    assert bucket.wait_time(1) == 0
+    assert bucket.tokens == 4
+
+
+def test_scheduler_rate() -> None:
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=1, capacity=2, clock=clock)
+    api = MagicMock(return_value='ok')
+
+    assert scheduler.call('fetch_ticker', api, 'ETH/BTC') == 'ok'
+    scheduler.call('fetch_ticker', api, 'ETH/BTC')
+    assert clock.now == 0
+    # the bucket is empty, the next requests wait for the tokens
+    scheduler.call('fetch_ticker', api, 'ETH/BTC')
+    assert clock.now == 1
+    scheduler.call('fetch_l2_order_book', api, 'ETH/BTC', 100)
+    assert clock.now == 3
+    api.assert_called_with('ETH/BTC', 100)
+    assert api.call_count == 4
+
+
+def test_scheduler_deadline() -> None:
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=0.1, capacity=1, clock=clock)
+    api = MagicMock()
+    scheduler.call('fetch_ohlcv', api)
+
+    # 10 seconds to wait for the token
+    with pytest.raises(TemporaryError, match=r'fetch_ticker could not be sent within 5s'):
+        scheduler.call('fetch_ticker', api, timeout=5)
+    assert clock.now == 0
+    assert scheduler.queue_depth() == {'order': 0, 'ticker': 0, 'history': 0}
+    # orders wait as long as needed
+    scheduler.call('create_limit_sell_order', api)
+    assert clock.now == 10
+
+
+def test_scheduler_priority() -> None:
+    scheduler = RequestScheduler(rate=20, capacity=1)
+    scheduler.bucket.take(1)
+    sent = []
+
+    def request(endpoint):
+        scheduler.call(endpoint, sent.append, endpoint)
+
+    # a history download holds the queue
+    threads = [threading.Thread(target=request, args=('fetch_ohlcv',))]
+    threads[0].start()
+    while scheduler.queue_depth()['history'] == 0:
+        time.sleep(0.001)
+    # the requests queued while waiting are sent by priority
+    with scheduler._condition:
+        for endpoint in ('fetch_ohlcv', 'fetch_ticker', 'create_limit_sell_order'):
+            thread = threading.Thread(target=request, args=(endpoint,))
+            thread.start()
+            threads.append(thread)
+        # let them queue up before the first one gets its token
+        deadline = time.monotonic() + 5
+        while sum(scheduler.queue_depth().values()) < 4 and time.monotonic() < deadline:
+            scheduler._condition.wait(0.001)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert sent == ['create_limit_sell_order', 'fetch_ticker', 'fetch_ohlcv', 'fetch_ohlcv']
+
+
+def test_scheduler_metrics() -> None:
+    metrics.init({'metrics': {'enabled': True}})
+    try:
+        clock = FakeClock()
+        scheduler = RequestScheduler(rate=1, capacity=1, clock=clock)
+        scheduler.call('fetch_ohlcv', MagicMock())
+        scheduler.call('fetch_ohlcv', MagicMock())
+        with pytest.raises(TemporaryError):
+            scheduler.call('fetch_ticker', MagicMock(), timeout=0.5)
+        registry = metrics.registry()
+        assert registry.histogram('freqtrade_exchange_queue_wait_seconds',
+                                  priority='history').sum == 1
+        assert registry.gauge('freqtrade_exchange_queue_depth', priority='history') == 0
+        assert registry.counter('freqtrade_exchange_deadline_missed_total',
+                                endpoint='fetch_ticker') == 1
+    finally:
+        metrics.cleanup()
+
+
+def test_scheduled_exchange() -> None:
+    api = MagicMock(rateLimit=500, markets={'ETH/BTC': {}})
+    api.fetch_ticker.return_value = {'bid': 1}
+    scheduler = MagicMock(bucket=MagicMock(rate=4))
+    scheduler.call.side_effect = lambda endpoint, func, *args, **kwargs: func(*args, **kwargs)
+    proxy = ScheduledExchange(api, scheduler)
+
+    assert proxy.markets == {'ETH/BTC': {}}
+    assert proxy.rateLimit == 250
+    assert proxy.fetch_ticker('ETH/BTC') == {'bid': 1}
+    assert scheduler.call.call_args[0][0] == 'fetch_ticker'
+    proxy.amount_to_lots('ETH/BTC', 1)
+    assert scheduler.call.call_count == 1
+    # loaded markets are not requested again
+    proxy.load_markets()
+    assert scheduler.call.call_count == 1
+    proxy.load_markets(True)
+    assert scheduler.call.call_count == 2
+
+
+def test_init_scheduler(default_conf, mocker) -> None:
+    from freqtrade import exchange
+    api = MagicMock(rateLimit=500, markets={})
+    api.name = 'binance'
+    mocker.patch('freqtrade.exchange.init_ccxt', return_value=api)
+    mocker.patch('freqtrade.exchange.validate_pairs')
+    # restored after the test
+    mocker.patch('freqtrade.exchange._API')
+    default_conf['internals'] = {'request_scheduler': True}
+    exchange.init(default_conf)
+    assert isinstance(exchange._API, ScheduledExchange)
+    assert exchange._API._scheduler.bucket.rate == 2
+    assert api.enableRateLimit is False
+    assert exchange.get_rate_limit() == 0.5
@@ -0,0 +1,179 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from freqtrade import DependencyException
+from freqtrade.marketdata import (CANDLE, TICKER, MarketDataRecorder, MarketEvent,
+                                  PollingMarketData, ReplayMarketData,
+                                  StreamingMarketData, create_market_data)
+from freqtrade.tests.test_freqtradebot import get_patched_freqtradebot
+
+CANDLES = [
+    [1514764800000, 0.05, 0.051, 0.049, 0.0505, 10.0],
+    [1514765100000, 0.0505, 0.052, 0.05, 0.051, 12.0],
+    [1514765400000, 0.051, 0.053, 0.0505, 0.052, 8.0],
+]
+
+
+def candle_message(candle, pair='ETH/BTC'):
+    return {'type': CANDLE, 'pair': pair, 'interval': '5m', 'data': candle}
+
+
+def write_candles(tmpdir, pair='ETH/BTC', candles=CANDLES):
+    filename = os.path.join(str(tmpdir), pair.replace('/', '_') + '-5m.json')
+    with open(filename, 'w') as file:
+        json.dump(candles, file)
+
+
+def test_streaming_candles() -> None:
+    market_data = StreamingMarketData(max_candles=2)
+    events = []
+    market_data.subscribe(events.append)
+
+    market_data.on_message(candle_message(CANDLES[0]))
+    market_data.on_message(candle_message(CANDLES[1][:5] + [1.0]))
+    # the running candle is updated, an outdated one is ignored
+    market_data.on_message(candle_message(CANDLES[1]))
+    market_data.on_message(candle_message(CANDLES[0]))
+    assert market_data.get_ticker_history('ETH/BTC', '5m') == CANDLES[:2]
+
+    market_data.on_message(candle_message(CANDLES[2]))
+    assert market_data.get_ticker_history('ETH/BTC', '5m') == CANDLES[1:]
+    assert market_data.get_ticker_history('LTC/BTC', '5m') == []
+    assert len(events) == 5
+    assert events[-1] == MarketEvent(CANDLE, 'ETH/BTC', '5m', CANDLES[2])
+
+    # a candle without interval is ignored
+    market_data.on_message({'type': CANDLE, 'pair': 'ETH/BTC', 'data': CANDLES[2]})
+    assert len(events) == 5
+
+
+def test_streaming_fallback() -> None:
+    market_data = StreamingMarketData()
+    with pytest.raises(DependencyException, match=r'No ticker received for ETH/BTC'):
+        market_data.get_ticker('ETH/BTC')
+
+    fallback = MagicMock()
+    fallback.get_ticker_history.return_value = CANDLES[:2]
+    fallback.get_ticker.return_value = {'bid': 1.0}
+    market_data = StreamingMarketData(fallback=fallback)
+    market_data.on_message(candle_message(CANDLES[1][:5] + [1.0]))
+    market_data.on_message(candle_message(CANDLES[2]))
+    market_data.on_message({'type': 'order_book', 'pair': 'ETH/BTC',
+                            'data': {'bids': [[1, 2], [0.9, 1]], 'asks': [[1.1, 3]]}})
+
+    # the history is requested once and completed with the streamed candles
+    expected = [CANDLES[0], CANDLES[1][:5] + [1.0], CANDLES[2]]
+    assert market_data.get_ticker_history('ETH/BTC', '5m') == expected
+    assert market_data.get_ticker_history('ETH/BTC', '5m') == expected
+    assert fallback.get_ticker_history.call_count == 1
+
+    assert market_data.get_ticker('ETH/BTC') == {'bid': 1.0}
+    assert market_data.get_order_book('ETH/BTC', 1) == {'bids': [[1, 2]], 'asks': [[1.1, 3]]}
+    assert fallback.get_order_book.call_count == 0
+
+
+def test_streaming_feed() -> None:
+    market_data = StreamingMarketData(feed=iter([candle_message(c) for c in CANDLES]))
+    market_data.start()
+    market_data._thread.join(timeout=5)
+    market_data.stop()
+    assert market_data.get_ticker_history('ETH/BTC', '5m') == CANDLES
+
+
+def test_polling(mocker) -> None:
+    mocker.patch('freqtrade.marketdata.polling.exchange.get_ticker',
+                 return_value={'bid': 1.0, 'ask': 1.1, 'last': 1.0})
+    mocker.patch('freqtrade.marketdata.polling.exchange.get_ticker_history',
+                 return_value=CANDLES)
+    market_data = PollingMarketData()
+    events = []
+    market_data.subscribe(events.append)
+    market_data.poll(['ETH/BTC'], '5m')
+    assert [event.kind for event in events] == [TICKER, CANDLE]
+    assert events[1].data == CANDLES[-1]
+
+
+def test_polling_order_book_cache() -> None:
+    cache = MagicMock()
+    market_data = PollingMarketData(order_book_cache=cache)
+    market_data.get_order_book('ETH/BTC', 20)
+    # the whole book is requested at the deepest level of the cache
+    market_data.get_order_book('ETH/BTC', None)
+    assert [call[0] for call in cache.get.call_args_list] == [('ETH/BTC', 20), ('ETH/BTC', 1000)]
+
+
+def test_replay(tmpdir) -> None:
+    write_candles(tmpdir)
+    write_candles(tmpdir, 'LTC/BTC', CANDLES[1:])
+    with open(os.path.join(str(tmpdir), 'market_events.jsonl'), 'w') as file:
+        file.write(json.dumps({'time': 1514765150000, 'type': 'ticker', 'pair': 'LTC/BTC',
+                               'data': {'bid': 2.0, 'ask': 2.1, 'last': 2.0}}) + '\n')
+
+    market_data = ReplayMarketData(str(tmpdir), ['ETH/BTC', 'LTC/BTC'], '5m',
+                                   speed=0, rebase=False)
+    messages = list(market_data.messages())
+    assert [(m['type'], m['pair']) for m in messages] == [
+        ('candle', 'ETH/BTC'), ('ticker', 'ETH/BTC'),
+        ('ticker', 'LTC/BTC'),
+        ('candle', 'ETH/BTC'), ('ticker', 'ETH/BTC'), ('candle', 'LTC/BTC'),
+        ('candle', 'ETH/BTC'), ('ticker', 'ETH/BTC'), ('candle', 'LTC/BTC'),
+    ]
+
+    market_data.run()
+    assert market_data.finished.is_set()
+    assert market_data.get_ticker_history('ETH/BTC', '5m') == CANDLES
+    assert market_data.get_ticker('ETH/BTC') == {'bid': 0.052, 'ask': 0.052, 'last': 0.052}
+    # the recorded ticker is not replaced by the candles
+    assert market_data.get_ticker('LTC/BTC')['bid'] == 2.0
+
+
+def test_replay_rebase(tmpdir) -> None:
+    write_candles(tmpdir)
+    market_data = ReplayMarketData(str(tmpdir), ['ETH/BTC'], '5m', speed=0)
+    market_data.start()
+    assert market_data.finished.wait(5)
+    market_data.stop()
+    candles = market_data.get_ticker_history('ETH/BTC', '5m')
+    assert candles[0][0] > CANDLES[0][0]
+    assert [c[0] - candles[0][0] for c in candles] == [c[0] - CANDLES[0][0] for c in CANDLES]
+
+
+def test_recorder(tmpdir) -> None:
+    recorder = MarketDataRecorder(str(tmpdir))
+    recorder(MarketEvent(TICKER, 'ETH/BTC', None, {'bid': 1.0}))
+    recorder(MarketEvent(CANDLE, 'ETH/BTC', '5m', CANDLES[0]))
+    recorder.close()
+    write_candles(tmpdir)
+
+    market_data = ReplayMarketData(str(tmpdir), ['ETH/BTC'], '5m', speed=0)
+    messages = list(market_data.messages())
+    assert [m['type'] for m in messages] == ['candle', 'candle', 'candle', 'ticker']
+
+
+def test_create_market_data(default_conf) -> None:
+    assert isinstance(create_market_data(default_conf), PollingMarketData)
+    default_conf['market_data'] = {'source': 'replay', 'replay_dir': 'foo', 'speed': 0}
+    market_data = create_market_data(default_conf)
+    assert isinstance(market_data, ReplayMarketData)
+    assert market_data.datadir == 'foo'
+    assert market_data.pairs == default_conf['exchange']['pair_whitelist']
+
+
+def test_freqtradebot_streaming(mocker, default_conf, tmpdir) -> None:
+    write_candles(tmpdir)
+    default_conf['ticker_interval'] = '5m'
+    default_conf['exchange']['pair_whitelist'] = ['ETH/BTC']
+    default_conf['market_data'] = {'source': 'replay', 'replay_dir': str(tmpdir), 'speed': 0}
+    get_ticker = mocker.patch('freqtrade.exchange.get_ticker')
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    assert freqtrade.analyze.market_data is freqtrade.market_data
+    assert freqtrade.market_data.finished.wait(5)
+
+    assert freqtrade.get_target_bid('ETH/BTC') == 0.052
+    assert get_ticker.call_count == 0
+    freqtrade.market_data.stop()
@@ -690,3 +690,67 @@ def test_backtest_start_live(default_conf, mocker, caplog):
 
     for line in exists:
         assert log_has(line, caplog.record_tuples)
+
+
+def _parse_tickerdata(tickerdata):
+    return {pair: Analyze.parse_ticker_dataframe(pair_data)
+            for pair, pair_data in tickerdata.items()}
+
+
+def test_backtest_stream(default_conf, fee, mocker):
+    mocker.patch('freqtrade.optimize.backtesting.exchange.get_fee', fee)
+    mocker.patch('freqtrade.exchange.validate_pairs', MagicMock(return_value=True))
+    backtesting = Backtesting(default_conf)
+    backtesting.populate_buy_trend = _trend_alternate  # Override
+    backtesting.populate_sell_trend = _trend_alternate  # Override
+    data = trim_dictlist(optimize.load_data(None, ticker_interval='5m',
+                                            pairs=['UNITTEST/BTC', 'ETH/BTC', 'LTC/BTC']), -500)
+    args = {
+        'stake_amount': default_conf['stake_amount'],
+        'max_open_trades': 1,
+        'realistic': True,
+    }
+    expected = backtesting.backtest(dict(args, processed=_parse_tickerdata(data)))
+
+    batches = ({pair: _parse_tickerdata(data)[pair]} for pair in data)
+    results, pairs, timeframe = backtesting.backtest_stream(batches, args)
+
+    assert pairs == list(data.keys())
+    assert timeframe == backtesting.get_timeframe(_parse_tickerdata(data))
+    # max_open_trades is honoured across batches
+    assert results.equals(expected)
+
+    results, pairs, timeframe = backtesting.backtest_stream([], args)
+    assert results.empty
+    assert pairs == []
+    assert timeframe is None
+
+
+def test_backtesting_start_stream(default_conf, fee, mocker, caplog) -> None:
+    mocker.patch('freqtrade.optimize.backtesting.exchange.get_fee', fee)
+    mocker.patch('freqtrade.exchange.validate_pairs', MagicMock(return_value=True))
+    load_data = optimize.load_data
+    load_mock = mocker.patch('freqtrade.optimize.load_data', side_effect=lambda *args, **kwargs:
+                             trim_dictlist(load_data(*args, **kwargs), -300))
+    conf = deepcopy(default_conf)
+    conf['exchange']['pair_whitelist'] = ['UNITTEST/BTC', 'MEME/BTC', 'ETH/BTC']
+    conf.update({'datadir': None, 'export': None, 'ticker_interval': '5m'})
+
+    def run(stream_pairs):
+        conf['stream_pairs'] = stream_pairs
+        backtesting = Backtesting(conf)
+        backtesting.tickerdata_to_dataframe = _parse_tickerdata
+        backtesting.populate_buy_trend = _trend_alternate  # Override
+        backtesting.populate_sell_trend = _trend_alternate  # Override
+        return backtesting.start()
+
+    expected, expected_table = run(0)
+    load_mock.reset_mock()
+    results, table = run(2)
+
+    assert log_has('Backtesting 2 pairs at a time ...', caplog.record_tuples)
+    assert [call[1]['pairs'] for call in load_mock.call_args_list] == \
+        [['UNITTEST/BTC', 'MEME/BTC'], ['ETH/BTC']]
+    assert not expected.empty
+    assert results.equals(expected)
+    assert table == expected_table
@@ -0,0 +1,163 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import os
+import tracemalloc
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+from freqtrade import optimize
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize import compact, dataframe_cache
+from freqtrade.optimize.backtesting import Backtesting
+
+
+def _populate_indicators(dataframe: DataFrame) -> DataFrame:
+    dataframe['sma_fast'] = dataframe['close'].rolling(5).mean()
+    dataframe['sma_slow'] = dataframe['close'].rolling(20).mean()
+    dataframe['green'] = dataframe['close'] > dataframe['open']
+    dataframe['pattern'] = np.where(dataframe['green'], 100, -100)
+    return dataframe
+
+
+def _populate_buy_trend(dataframe: DataFrame) -> DataFrame:
+    dataframe.loc[dataframe['sma_fast'] > dataframe['sma_slow'] * 1.002, 'buy'] = 1
+    return dataframe
+
+
+def _populate_sell_trend(dataframe: DataFrame) -> DataFrame:
+    dataframe.loc[dataframe['sma_fast'] < dataframe['sma_slow'], 'sell'] = 1
+    return dataframe
+
+
+def _get_backtesting(mocker, config) -> Backtesting:
+    mocker.patch('freqtrade.exchange.validate_pairs', MagicMock(return_value=True))
+    backtesting = Backtesting(config)
+    backtesting.analyze.populate_indicators = _populate_indicators  # type: ignore
+    backtesting.populate_buy_trend = _populate_buy_trend  # type: ignore
+    backtesting.populate_sell_trend = _populate_sell_trend  # type: ignore
+    return backtesting
+
+
+def _backtest(backtesting: Backtesting, processed) -> DataFrame:
+    return backtesting.backtest({
+        'stake_amount': 0.1,
+        'processed': processed,
+        'max_open_trades': 1,
+        'realistic': True,
+    })
+
+
+def test_compact_frame() -> None:
+    frame = _populate_indicators(DataFrame({
+        'open': [1.0, 2.0, 3.0],
+        'close': [2.0, 1.0, 4.0],
+        'buy': [0, 1, 0],
+    }))
+    expected = frame.copy()
+
+    assert compact.compact_frame(frame) > 0
+    assert frame['close'].dtype == np.float32
+    assert frame['sma_fast'].dtype == np.float32
+    assert frame['green'].dtype == np.bool_
+    assert frame['pattern'].dtype == np.int8
+    assert frame['buy'].dtype == np.int8
+    assert list(frame.columns) == list(expected.columns)
+    assert np.allclose(frame['close'], expected['close'], rtol=compact.FLOAT32_RTOL, atol=0)
+    assert (frame['pattern'] == expected['pattern']).all()
+
+
+def test_compact_frames(caplog) -> None:
+    frames = {'ETH/BTC': DataFrame({'close': np.arange(1000, dtype=np.float64)})}
+    compact.compact_frames(frames)
+
+    assert frames['ETH/BTC']['close'].dtype == np.float32
+    assert any('Low memory mode: ETH/BTC uses' in message
+               for _, _, message in caplog.record_tuples)
+    assert any('Low memory mode saved' in message and 'for 1 pairs' in message
+               for _, _, message in caplog.record_tuples)
+
+
+def test_backtest_low_memory(mocker, default_conf, fee) -> None:
+    mocker.patch('freqtrade.exchange.get_fee', fee)
+    data = optimize.load_data(None, ticker_interval='5m', pairs=['UNITTEST/BTC', 'ETH/BTC'])
+
+    backtesting = _get_backtesting(mocker, default_conf)
+    expected = _backtest(backtesting, backtesting.tickerdata_to_dataframe(data))
+
+    default_conf['low_memory'] = True
+    backtesting = _get_backtesting(mocker, default_conf)
+    processed = compact.tickerdata_to_compact_dataframe(backtesting.tickerdata_to_dataframe,
+                                                        data)
+    assert processed['ETH/BTC']['close'].dtype == np.float32
+    results = _backtest(backtesting, processed)
+    assert processed['ETH/BTC']['buy'].dtype == np.int8
+
+    assert len(expected) > 0
+    assert list(results.pair) == list(expected.pair)
+    assert list(results.open_time) == list(expected.open_time)
+    assert results.profit_percent.values == pytest.approx(expected.profit_percent.values,
+                                                          abs=compact.PROFIT_ATOL)
+
+
+def test_backtesting_start_low_memory(mocker, default_conf, caplog) -> None:
+    mocker.patch('freqtrade.exchange.validate_pairs', MagicMock(return_value=True))
+    mocker.patch('freqtrade.optimize.backtesting.Backtesting.backtest',
+                 MagicMock(return_value=DataFrame(columns=['pair', 'open_at_end'])))
+    mocker.patch('freqtrade.optimize.backtesting.Backtesting._generate_text_table',
+                 MagicMock(return_value=''))
+    mocker.patch('freqtrade.optimize.backtesting.Backtesting.aggregate',
+                 MagicMock(return_value=''))
+    default_conf['exchange']['pair_whitelist'] = ['UNITTEST/BTC']
+    default_conf.update({'low_memory': True, 'datadir': None, 'ticker_interval': '1m'})
+
+    backtesting = _get_backtesting(mocker, default_conf)
+    backtesting.start()
+
+    processed = backtesting.backtest.call_args[0][0]['processed']
+    assert processed['UNITTEST/BTC']['close'].dtype == np.float32
+    assert any(message.startswith('Low memory mode saved')
+               for _, _, message in caplog.record_tuples)
+
+
+def _populate_many_indicators(dataframe: DataFrame) -> DataFrame:
+    for window in range(2, 42):
+        dataframe[f'sma_{window}'] = dataframe['close'].rolling(window).mean()
+    return dataframe
+
+
+def _load_preprocessed_peak(mocker, config) -> float:
+    """
+    Peak memory allocated while loading and preprocessing the pairs, in bytes
+    """
+    backtesting = _get_backtesting(mocker, config)
+    backtesting.analyze.populate_indicators = _populate_many_indicators  # type: ignore
+    pairs = ['ADA/BTC', 'DASH/BTC', 'ETH/BTC', 'LTC/BTC', 'XLM/BTC']
+    tracemalloc.start()
+    try:
+        processed = backtesting._load_preprocessed(pairs, TimeRange(None, None, 0, 0),
+                                                   dataframe_cache.from_config(config))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert list(processed.keys()) == pairs
+    return peak
+
+
+@pytest.mark.parametrize('cache', [False, True])
+def test_load_preprocessed_low_memory_peak(mocker, default_conf, tmpdir, cache) -> None:
+    default_conf.update({'datadir': None, 'ticker_interval': '5m'})
+    if cache:
+        default_conf.update({'dataframe_cache': True,
+                             'dataframe_cache_dir': os.path.join(str(tmpdir), 'cache')})
+    peak = _load_preprocessed_peak(mocker, default_conf)
+
+    # The pairs are downcast one by one: only one of them is held in float64,
+    # on top of the compacted ones
+    default_conf['low_memory'] = True
+    assert _load_preprocessed_peak(mocker, default_conf) < 0.85 * peak
+    if cache:
+        # and the cached ones are stored downcast
+        assert _load_preprocessed_peak(mocker, default_conf) < 0.85 * peak
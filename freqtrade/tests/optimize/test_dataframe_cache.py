@@ -0,0 +1,172 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from freqtrade.analyze import Analyze
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize import dataframe_cache, parallel
+from freqtrade.optimize.dataframe_cache import DataFrameCache
+
+_TESTDATA = os.path.join(os.path.dirname(__file__), '..', 'testdata')
+
+
+def _populate_indicators(dataframe: DataFrame) -> DataFrame:
+    dataframe['mean'] = (dataframe['high'] + dataframe['low']) / 2
+    dataframe['rising'] = dataframe['close'] > dataframe['open']
+    dataframe['label'] = 'x'
+    return dataframe
+
+
+def _populate_other_indicators(dataframe: DataFrame) -> DataFrame:
+    dataframe['mean'] = (dataframe['open'] + dataframe['close']) / 2
+    return dataframe
+
+
+def _get_analyze(default_conf) -> Analyze:
+    analyze = Analyze(default_conf)
+    analyze.populate_indicators = _populate_indicators  # type: ignore
+    return analyze
+
+
+def _datadir(tmpdir) -> str:
+    datadir = os.path.join(str(tmpdir), 'data')
+    os.makedirs(datadir)
+    for pair in ['UNITTEST_BTC', 'ETH_BTC']:
+        shutil.copy(os.path.join(_TESTDATA, f'{pair}-5m.json'), datadir)
+    return datadir
+
+
+def test_dump_load_frame(default_conf, tmpdir) -> None:
+    analyze = _get_analyze(default_conf)
+    frame = analyze.tickerdata_to_dataframe(
+        {'UNITTEST/BTC': [[1509836520000, 1.0, 2.0, 0.5, 1.5, 10.0],
+                          [1509836580000, 1.5, 2.5, 1.0, 2.0, 20.0]]}
+    )['UNITTEST/BTC']
+
+    layout = dataframe_cache.dump_frame(frame, os.path.join(str(tmpdir), '0'))
+    loaded = dataframe_cache.load_frame(layout)
+
+    assert loaded.equals(frame)
+    assert list(loaded.dtypes) == list(frame.dtypes)
+
+
+def test_dump_load_frame_without_pickle(tmpdir) -> None:
+    dates = [datetime(2017, 11, 4, 23, 2, tzinfo=timezone.utc),
+             datetime(2017, 11, 4, 23, 3, tzinfo=timezone.utc)]
+    frame = DataFrame({'date': pd.Series(dates, dtype=object), 'close': [1.0, 2.0]})
+
+    layout = dataframe_cache.dump_frame(frame, os.path.join(str(tmpdir), '0'))
+    # dates are stored as epoch values
+    assert np.load(layout[0][1]).dtype == np.int64
+    loaded = dataframe_cache.load_frame(layout)
+    assert list(loaded['date']) == dates
+
+    frame['other'] = [1, 'x']
+    with pytest.raises(ValueError, match=r'Column other holds mixed-integer objects'):
+        dataframe_cache.dump_frame(frame, os.path.join(str(tmpdir), '1'))
+
+
+def test_cache_key(default_conf, tmpdir) -> None:
+    analyze = _get_analyze(default_conf)
+    datadir = _datadir(tmpdir)
+    cache = DataFrameCache(os.path.join(str(tmpdir), 'cache'))
+    timerange = TimeRange(None, 'line', 0, -100)
+
+    key = cache.key(analyze, datadir, 'UNITTEST/BTC', '5m', timerange)
+    assert key == cache.key(analyze, datadir, 'UNITTEST/BTC', '5m', timerange)
+    assert key != cache.key(analyze, datadir, 'ETH/BTC', '5m', timerange)
+    assert key != cache.key(analyze, datadir, 'UNITTEST/BTC', '5m', None)
+    # missing data can't be cached
+    assert cache.key(analyze, datadir, 'UNITTEST/BTC', '1m', None) is None
+
+    # the strategy changed
+    analyze.populate_indicators = _populate_other_indicators  # type: ignore
+    assert key != cache.key(analyze, datadir, 'UNITTEST/BTC', '5m', timerange)
+    analyze.populate_indicators = _populate_indicators  # type: ignore
+
+    # the data changed
+    filename = os.path.join(datadir, 'UNITTEST_BTC-5m.json')
+    os.utime(filename, (0, 0))
+    assert key != cache.key(analyze, datadir, 'UNITTEST/BTC', '5m', timerange)
+
+
+def test_cache_get_put(default_conf, tmpdir) -> None:
+    analyze = _get_analyze(default_conf)
+    datadir = _datadir(tmpdir)
+    cache = DataFrameCache(os.path.join(str(tmpdir), 'cache'))
+    frame = parallel.load_and_preprocess(analyze, datadir, ['UNITTEST/BTC'], '5m')['UNITTEST/BTC']
+
+    key = cache.key(analyze, datadir, 'UNITTEST/BTC', '5m', None)
+    assert cache.get(key) is None
+    cache.put(key, frame)
+    assert cache.get(key).equals(frame)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size() > 0
+
+    cache.clear()
+    assert cache.get(key) is None
+    assert cache.size() == 0
+
+
+def test_cache_pickled_entry(tmpdir) -> None:
+    cache = DataFrameCache(os.path.join(str(tmpdir), 'cache'))
+    # frames which can't be stored without pickling are not cached
+    cache.put('key', DataFrame({'a': [1, 'x']}))
+    assert cache.get('key') is None
+
+    cache.put('key', DataFrame({'a': [1.0, 2.0]}))
+    np.save(os.path.join(cache.cache_dir, 'key', '0.npy'), np.array([None, 1]), allow_pickle=True)
+    assert cache.get('key') is None
+    assert cache.misses == 2
+
+
+def test_cache_eviction(default_conf, tmpdir) -> None:
+    frame = DataFrame({'a': range(1000)})
+    cache = DataFrameCache(os.path.join(str(tmpdir), 'cache'), max_size_mb=0.03)
+    for idx, key in enumerate(['first', 'second', 'third']):
+        cache.put(key, frame)
+        os.utime(os.path.join(cache.cache_dir, key), (idx, idx))
+    assert len(os.listdir(cache.cache_dir)) == 3
+    # using an entry makes it the most recently used one
+    cache.get('first')
+    cache.put('fourth', frame)
+
+    assert sorted(os.listdir(cache.cache_dir)) == ['first', 'fourth', 'third']
+
+
+def test_load_and_preprocess_cached(mocker, default_conf, tmpdir) -> None:
+    analyze = _get_analyze(default_conf)
+    datadir = _datadir(tmpdir)
+    cache = DataFrameCache(os.path.join(str(tmpdir), 'cache'))
+    pairs = ['UNITTEST/BTC', 'ETH/BTC', 'MEME/BTC']
+
+    expected = parallel.load_and_preprocess(analyze, datadir, pairs, '5m')
+    assert parallel.load_and_preprocess(analyze, datadir, pairs, '5m', cache=cache).keys() == \
+        expected.keys()
+
+    preprocess = mocker.spy(analyze, 'tickerdata_to_dataframe')
+    result = parallel.load_and_preprocess(analyze, datadir, pairs, '5m', cache=cache)
+    assert list(result.keys()) == ['UNITTEST/BTC', 'ETH/BTC']
+    for pair in result:
+        assert result[pair].equals(expected[pair])
+    # only the pair without data was loaded
+    assert preprocess.call_count == 1
+    assert preprocess.call_args[0][0] == {}
+
+
+def test_from_config(tmpdir) -> None:
+    cache_dir = os.path.join(str(tmpdir), 'cache')
+    config = {'dataframe_cache': True, 'dataframe_cache_dir': cache_dir}
+    cache = dataframe_cache.from_config(config)
+    cache.put('key', DataFrame({'a': [1]}))
+
+    config.update({'dataframe_cache': False, 'clear_dataframe_cache': True})
+    assert dataframe_cache.from_config(config) is None
+    assert not os.path.exists(cache_dir)
@@ -0,0 +1,209 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from freqtrade.optimize import datastore
+
+_TESTDATA = os.path.join(os.path.dirname(__file__), '..', 'testdata')
+
+
+def _load_unittest_1m():
+    with open(os.path.join(_TESTDATA, 'UNITTEST_BTC-1m.json')) as file:
+        return json.load(file)
+
+
+def test_store_path() -> None:
+    path = datastore.store_path('somedir', 'UNITTEST/BTC', '5m')
+    assert path == os.path.join('somedir', 'UNITTEST_BTC-5m.ohlcv')
+
+
+def test_tickerlist_to_columns_roundtrip() -> None:
+    tickerlist = _load_unittest_1m()
+    columns = datastore.tickerlist_to_columns(tickerlist)
+
+    assert list(columns.keys()) == datastore.OHLCV_COLUMNS
+    assert columns['date'].dtype == np.int64
+    assert columns['close'].dtype == np.float64
+    assert len(columns['date']) == len(tickerlist)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist
+
+
+def test_tickerlist_to_columns_empty() -> None:
+    columns = datastore.tickerlist_to_columns([])
+    assert all(len(columns[col]) == 0 for col in datastore.OHLCV_COLUMNS)
+
+
+def test_write_load_store(tmpdir) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+
+    assert datastore.load_store(path) is None
+    datastore.write_store(path, datastore.tickerlist_to_columns(tickerlist))
+    assert datastore.store_exists(path)
+    assert datastore.read_meta(path)['rows'] == len(tickerlist)
+
+    columns = datastore.load_store(path)
+    assert isinstance(columns['close'], np.memmap)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist
+
+    columns = datastore.load_store(path, mmap=False)
+    assert not isinstance(columns['close'], np.memmap)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist
+
+    # Replacing an existing store
+    datastore.write_store(path, datastore.tickerlist_to_columns(tickerlist[:10]))
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist[:10]
+    assert not os.path.exists(path + '.old')
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_write_store_empty(tmpdir) -> None:
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    datastore.write_store(path, datastore.tickerlist_to_columns([]))
+    columns = datastore.load_store(path)
+    assert len(columns['date']) == 0
+
+
+def test_write_store_length_mismatch(tmpdir) -> None:
+    columns = datastore.tickerlist_to_columns(_load_unittest_1m())
+    columns['volume'] = columns['volume'][:-1]
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    with pytest.raises(ValueError, match=r'same length'):
+        datastore.write_store(path, columns)
+    assert not datastore.store_exists(path)
+
+
+def test_load_store_unsupported_version(tmpdir) -> None:
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    datastore.write_store(path, datastore.tickerlist_to_columns(_load_unittest_1m()))
+    meta = datastore.read_meta(path)
+    meta['version'] = 999
+    datastore.write_meta(path, meta)
+    assert datastore.load_store(path) is None
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_load_store_range(tmpdir, mmap) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    datastore.write_store(path, datastore.tickerlist_to_columns(tickerlist))
+
+    columns = datastore.load_store(path, mmap=mmap, start=100, stop=200)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist[100:200]
+
+    columns = datastore.load_store(path, mmap=mmap, start=-5)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist[-5:]
+
+    columns = datastore.load_store(path, mmap=mmap, start=50, stop=50)
+    assert len(columns['close']) == 0
+
+    columns = datastore.load_store(path, mmap=mmap, columns=['date'])
+    assert list(columns.keys()) == ['date']
+    assert columns['date'].tolist() == [tick[0] for tick in tickerlist]
+
+
+def _write_columns(path, tickerlist):
+    datastore.append_store(path, datastore.tickerlist_to_columns(tickerlist))
+
+
+def test_append_store(tmpdir) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+
+    # The last candle was still incomplete when it was downloaded
+    partial = tickerlist[99][:4] + [tickerlist[99][4] * 2, 0.0]
+    _write_columns(path, tickerlist[:99] + [partial])
+    bin_mtime = os.stat(os.path.join(path, 'date.bin')).st_mtime_ns
+    # so it is downloaded again with the next update
+    _write_columns(path, tickerlist[99:150])
+    _write_columns(path, tickerlist[149:300])
+
+    meta = datastore.read_meta(path)
+    assert meta['segments'] == [[0, 99], [1, 50], [2, 151]]
+    assert meta['rows'] == 300
+    # Existing column files are only ever appended to
+    assert os.stat(os.path.join(path, 'date.bin')).st_mtime_ns == bin_mtime
+
+    columns = datastore.load_store(path)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist[:300]
+    # A range across segments
+    columns = datastore.load_store(path, start=90, stop=160)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist[90:160]
+    # A range within one segment stays memory-mapped
+    columns = datastore.load_store(path, start=160, stop=170)
+    assert isinstance(columns['close'], np.memmap)
+
+
+def test_append_store_uncommitted_segment(tmpdir) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    _write_columns(path, tickerlist[:100])
+
+    # Segment files written by an update that never committed its metadata are ignored
+    datastore.tickerlist_to_columns(tickerlist[50:60])['date'].tofile(
+        os.path.join(path, 'date.1.bin'))
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist[:100]
+
+    _write_columns(path, tickerlist[100:120])
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist[:120]
+
+
+def test_append_store_rewrite(tmpdir) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    _write_columns(path, tickerlist[:100])
+    _write_columns(path, tickerlist[100:110])
+
+    bin_mtime = os.stat(os.path.join(path, 'date.bin')).st_mtime_ns
+    # The last segment holds a single candle, downloaded again with the next update
+    _write_columns(path, tickerlist[110:111])
+    _write_columns(path, tickerlist[110:120])
+    assert datastore.read_meta(path)['segments'] == [[0, 100], [1, 10], [3, 10]]
+    assert not os.path.exists(os.path.join(path, 'date.2.bin'))
+
+    # New candles reaching back before the last segments
+    _write_columns(path, tickerlist[50:200])
+    assert datastore.read_meta(path)['segments'] == [[0, 50], [4, 150]]
+    assert not os.path.exists(os.path.join(path, 'date.1.bin'))
+    assert not os.path.exists(os.path.join(path, 'date.3.bin'))
+    # The first segment is truncated, not rewritten
+    assert os.stat(os.path.join(path, 'date.bin')).st_mtime_ns == bin_mtime
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist[:200]
+
+    # and before the whole store
+    _write_columns(path, tickerlist[:20])
+    assert datastore.read_meta(path)['segments'] == [[0, 20]]
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist[:20]
+
+
+def test_compact_store(tmpdir) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    _write_columns(path, tickerlist[:10])
+    for start in range(10, 50, 10):
+        datastore.append_store(path, datastore.tickerlist_to_columns(tickerlist[start:start + 10]),
+                               max_segments=3)
+    # compacted once the 4th segment was added
+    assert datastore.read_meta(path)['segments'] == [[0, 40], [1, 10]]
+
+    assert datastore.compact_store(path)
+    assert not datastore.compact_store(path)
+    assert datastore.read_meta(path)['segments'] == [[0, 50]]
+    assert not os.path.exists(os.path.join(path, 'date.1.bin'))
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist[:50]
+
+
+def test_load_store_version_1(tmpdir) -> None:
+    tickerlist = _load_unittest_1m()
+    path = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    datastore.write_store(path, datastore.tickerlist_to_columns(tickerlist))
+    meta = datastore.read_meta(path)
+    del meta['segments']
+    meta['version'] = 1
+    datastore.write_meta(path, meta)
+
+    assert datastore.columns_to_tickerlist(datastore.load_store(path)) == tickerlist
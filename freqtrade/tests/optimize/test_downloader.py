@@ -0,0 +1,176 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import json
+import os
+import threading
+import time
+
+import ccxt
+import pytest
+
+from freqtrade import optimize
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize import datastore
+from freqtrade.optimize.downloader import ConcurrentDownloader, RateLimiter
+
+# 2018-01-01 00:00:00 UTC
+START_MS = 1514764800000
+MINUTE_MS = 60 * 1000
+
+
+class FakeExchange(object):
+    """
+    Serves 1m candles from START_MS on, `page_size` candles per request
+    """
+    name = 'Fake'
+    rateLimit = 0
+
+    def __init__(self, candles: int, page_size: int = 10, fail_after: int = None) -> None:
+        self.candles = [[START_MS + i * MINUTE_MS, 1.0, 2.0, 0.5, 1.5, 10.0]
+                        for i in range(candles)]
+        self.page_size = page_size
+        self.fail_after = fail_after
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, pair, timeframe=None, since=None, limit=None):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            calls = self.calls
+        try:
+            time.sleep(0.01)
+            if self.fail_after is not None and calls > self.fail_after:
+                raise ccxt.ExchangeNotAvailable('down for maintenance')
+            since = since or START_MS
+            page = [c for c in self.candles if c[0] >= since][:self.page_size]
+            return list(reversed(page))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _patch(mocker, fake: FakeExchange) -> None:
+    mocker.patch('freqtrade.exchange._API', fake)
+    mocker.patch('freqtrade.exchange.get_history_till_ms',
+                 return_value=fake.candles[-1][0] + 1)
+
+
+def _read(datadir, name):
+    with open(os.path.join(str(datadir), name)) as file:
+        return json.load(file)
+
+
+def test_rate_limiter_spacing(mocker) -> None:
+    clock = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    mocker.patch('freqtrade.optimize.downloader.time.monotonic', side_effect=lambda: clock[0])
+    mocker.patch('freqtrade.optimize.downloader.time.sleep', side_effect=sleep)
+
+    limiter = RateLimiter(0.5)
+    starts = []
+    for _ in range(4):
+        limiter.acquire()
+        starts.append(clock[0])
+        clock[0] += 0.1
+    assert starts == pytest.approx([100.0, 100.5, 101.0, 101.5])
+    assert sleeps == pytest.approx([0.4, 0.4, 0.4])
+
+    # no wait once the requests are spaced enough
+    clock[0] += 10
+    limiter.acquire()
+    assert len(sleeps) == 3
+
+
+def test_download_concurrent(mocker, tmpdir, caplog) -> None:
+    fake = FakeExchange(candles=45)
+    _patch(mocker, fake)
+    mocker.patch('freqtrade.exchange.API_RETRY_COUNT', 0)
+
+    pairs = ['ETH/BTC', 'LTC/BTC', 'XRP/BTC']
+    downloader = ConcurrentDownloader(str(tmpdir), max_in_flight=3)
+    results = downloader.download(pairs, ['1m'])
+
+    assert [(r.pair, r.tick_interval) for r in results] == [(p, '1m') for p in pairs]
+    assert all(r.error is None and r.candles == 45 for r in results)
+    assert fake.max_in_flight > 1
+    for pair in pairs:
+        data = _read(tmpdir, f'{pair.replace("/", "_")}-1m.json')
+        assert data == fake.candles
+
+    stats = downloader.stats()
+    assert stats['jobs_done'] == 3
+    assert stats['candles'] == 135
+    assert any(message.startswith('[3/3] ') for _, _, message in caplog.record_tuples)
+    assert any(message.startswith('Downloaded 135 candles in 15 requests for 3 jobs')
+               for _, _, message in caplog.record_tuples)
+
+
+def test_download_resume(mocker, tmpdir) -> None:
+    fake = FakeExchange(candles=40, fail_after=2)
+    _patch(mocker, fake)
+    mocker.patch('freqtrade.exchange.API_RETRY_COUNT', 0)
+
+    downloader = ConcurrentDownloader(str(tmpdir), max_in_flight=1)
+    result, = downloader.download(['ETH/BTC'], ['1m'])
+    assert result.error is not None
+    assert result.candles == 20
+    # partial data is kept
+    assert _read(tmpdir, 'ETH_BTC-1m.json') == fake.candles[:20]
+
+    fake.fail_after = None
+    result, = downloader.download(['ETH/BTC'], ['1m'])
+    assert result.error is None
+    # last cached candle is downloaded again, it could have been incomplete
+    assert result.candles == 21
+    assert _read(tmpdir, 'ETH_BTC-1m.json') == fake.candles
+
+
+def test_download_pairs_concurrency(mocker, tmpdir) -> None:
+    fake = FakeExchange(candles=25)
+    _patch(mocker, fake)
+
+    assert optimize.download_pairs(str(tmpdir), ['ETH/BTC', 'LTC/BTC'], '1m',
+                                   timerange=TimeRange('date', None, START_MS // 1000, 0),
+                                   concurrency=2)
+    assert _read(tmpdir, 'LTC_BTC-1m.json') == fake.candles
+
+
+def test_download_columnar_append(mocker, tmpdir) -> None:
+    fake = FakeExchange(candles=30)
+    _patch(mocker, fake)
+
+    downloader = ConcurrentDownloader(str(tmpdir), max_in_flight=1, columnar=True)
+    downloader.download(['ETH/BTC'], ['1m'])
+    store = datastore.store_path(str(tmpdir), 'ETH/BTC', '1m')
+    assert not os.path.isfile(os.path.join(str(tmpdir), 'ETH_BTC-1m.json'))
+    assert datastore.read_meta(store)['segments'] == [[0, 30]]
+
+    fake.candles.extend([[START_MS + i * MINUTE_MS, 1.0, 2.0, 0.5, 1.5, 10.0]
+                         for i in range(30, 45)])
+    mocker.patch('freqtrade.exchange.get_history_till_ms',
+                 return_value=fake.candles[-1][0] + 1)
+    # existing stores are updated even when not asked for columnar data
+    result, = ConcurrentDownloader(str(tmpdir), max_in_flight=1).download(['ETH/BTC'], ['1m'])
+    assert result.candles == 16
+    # only the new candles and the refreshed last candle were written
+    assert datastore.read_meta(store)['segments'] == [[0, 29], [1, 16]]
+    assert datastore.columns_to_tickerlist(datastore.load_store(store)) == fake.candles
+
+
+def test_download_programming_error(mocker, tmpdir) -> None:
+    fake = FakeExchange(candles=10)
+    _patch(mocker, fake)
+    mocker.patch('freqtrade.exchange.get_ticker_history_page', side_effect=KeyError('since'))
+
+    # only the exchange errors fail a job, the others are bugs and propagate
+    with pytest.raises(KeyError):
+        ConcurrentDownloader(str(tmpdir), max_in_flight=1).download(['ETH/BTC'], ['1m'])
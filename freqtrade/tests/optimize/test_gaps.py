@@ -0,0 +1,109 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import json
+import os
+
+import numpy as np
+
+from freqtrade.optimize import datastore, gaps
+from freqtrade.optimize.gaps import Gap
+from freqtrade.tests.conftest import log_has
+
+# 2018-01-01 00:00:00 UTC
+START_MS = 1514764800000
+MINUTE_MS = 60 * 1000
+
+
+def _candles(indexes):
+    return [[START_MS + i * MINUTE_MS, 1.0, 2.0, 0.5, 1.5, float(i)] for i in indexes]
+
+
+def _history_mock(mocker, candles):
+    def fetch(pair, tick_interval, since_ms=None):
+        return [c for c in candles if c[0] >= since_ms][:5]
+    return mocker.patch('freqtrade.exchange.get_ticker_history_page', side_effect=fetch)
+
+
+def test_find_gaps() -> None:
+    dates = np.array([c[0] for c in _candles([0, 1, 2, 5, 6, 10])])
+    assert gaps.find_gaps(dates, '1m') == [
+        Gap(START_MS + 3 * MINUTE_MS, START_MS + 4 * MINUTE_MS, 2),
+        Gap(START_MS + 7 * MINUTE_MS, START_MS + 9 * MINUTE_MS, 3),
+    ]
+    assert gaps.find_gaps(dates[:3], '1m') == []
+    assert gaps.find_gaps(np.array([], dtype=np.int64), '1m') == []
+
+
+def test_find_gaps_since() -> None:
+    dates = np.array([c[0] for c in _candles([4, 5])])
+    # since_ms is not on a candle boundary
+    assert gaps.find_gaps(dates, '1m', since_ms=START_MS + 30 * 1000) == [
+        Gap(START_MS + MINUTE_MS, START_MS + 3 * MINUTE_MS, 3)
+    ]
+    assert gaps.find_gaps(dates, '1m', since_ms=START_MS + 4 * MINUTE_MS) == []
+
+
+def test_backfill_gaps_json(mocker, tmpdir, caplog) -> None:
+    full = _candles(range(40))
+    filename = os.path.join(str(tmpdir), 'ETH_BTC-1m.json')
+    with open(filename, 'w') as file:
+        json.dump(_candles(list(range(10)) + list(range(25, 40))), file)
+    history_mock = _history_mock(mocker, full)
+
+    found = gaps.backfill_gaps(str(tmpdir), 'ETH/BTC', '1m')
+
+    assert found == [Gap(START_MS + 10 * MINUTE_MS, START_MS + 24 * MINUTE_MS, 15)]
+    # only the missing window was requested
+    assert history_mock.call_count == 3
+    assert history_mock.call_args_list[0][1]['since_ms'] == START_MS + 10 * MINUTE_MS
+    assert log_has('Backfilled 15 of 15 missing candles in 3 requests for pair: "ETH/BTC", '
+                   'Interval: 1m', caplog.record_tuples)
+    with open(filename) as file:
+        assert json.load(file) == full
+
+
+def test_backfill_gaps_columnar(mocker, tmpdir) -> None:
+    full = _candles(range(30))
+    store = datastore.store_path(str(tmpdir), 'ETH/BTC', '1m')
+    datastore.write_store(store, datastore.tickerlist_to_columns(
+        _candles(list(range(5, 12)) + list(range(14, 30)))))
+    _history_mock(mocker, full)
+
+    found = gaps.backfill_gaps(str(tmpdir), 'ETH/BTC', '1m', since_ms=START_MS)
+
+    assert [gap.candles for gap in found] == [5, 2]
+    assert datastore.columns_to_tickerlist(datastore.load_store(store)) == full
+
+
+def test_backfill_gaps_dry_run(mocker, tmpdir) -> None:
+    filename = os.path.join(str(tmpdir), 'ETH_BTC-1m.json')
+    with open(filename, 'w') as file:
+        json.dump(_candles([0, 1, 3]), file)
+    history_mock = _history_mock(mocker, _candles(range(4)))
+    dump_mock = mocker.patch('freqtrade.misc.file_dump_json')
+
+    assert gaps.backfill_gaps(str(tmpdir), 'ETH/BTC', '1m', dry_run=True) == [
+        Gap(START_MS + 2 * MINUTE_MS, START_MS + 2 * MINUTE_MS, 1)
+    ]
+    assert history_mock.call_count == 0
+    assert dump_mock.call_count == 0
+
+
+def test_backfill_gaps_no_data(tmpdir, caplog) -> None:
+    assert gaps.backfill_gaps(str(tmpdir), 'ETH/BTC', '1m') == []
+    assert log_has('No data for pair: "ETH/BTC", Interval: 1m, nothing to backfill',
+                   caplog.record_tuples)
+
+
+def test_backfill_gaps_derived_interval(mocker, tmpdir, caplog) -> None:
+    with open(os.path.join(str(tmpdir), 'ETH_BTC-1m.json'), 'w') as file:
+        json.dump(_candles([0, 1, 2, 3, 4, 5, 6, 12, 13]), file)
+    history_mock = _history_mock(mocker, _candles(range(14)))
+
+    assert gaps.backfill_gaps(str(tmpdir), 'ETH/BTC', '5m') == []
+    assert log_has('No data stored for pair: "ETH/BTC", Interval: 5m, it is derived from '
+                   'Interval: 1m, backfill that one instead', caplog.record_tuples)
+    assert history_mock.call_count == 0
+    # the derived candles are not written as stored 5m data
+    assert not datastore.store_exists(datastore.store_path(str(tmpdir), 'ETH/BTC', '5m'))
+    assert not os.path.isfile(os.path.join(str(tmpdir), 'ETH_BTC-5m.json'))
@@ -10,7 +10,8 @@ from freqtrade import optimize
 from freqtrade.misc import file_dump_json
 from freqtrade.optimize.__init__ import make_testdata_path, download_pairs, \
     download_backtesting_testdata, load_tickerdata_file, trim_tickerlist, \
-    load_cached_data_for_updating
+    load_cached_data_for_updating, trim_tickercolumns, _bisect_tickerlist
+from freqtrade.optimize import datastore
 from freqtrade.arguments import TimeRange
 from freqtrade.tests.conftest import log_has
 
@@ -301,6 +302,27 @@ def test_download_backtesting_testdata(ticker_history, mocker) -> None:
     _clean_test_file(file2)
 
 
+def test_download_backtesting_testdata_columnar(mocker, tmpdir) -> None:
+    tickerlist = [
+        [1509836520000, 0.00162008, 0.00162008, 0.00162008, 0.00162008, 108.14853839],
+        [1509836580000, 0.00161, 0.00161, 0.00161, 0.00161, 82.390199],
+        [1509836640000, 0.00162, 0.00163, 0.00161, 0.00162, 12.0],
+    ]
+    store = datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m')
+    datastore.write_store(store, datastore.tickerlist_to_columns(tickerlist[:2]))
+    json_dump_mock = mocker.patch('freqtrade.misc.file_dump_json', return_value=None)
+    history_mock = mocker.patch('freqtrade.optimize.__init__.get_ticker_history',
+                                return_value=tickerlist[1:])
+
+    download_backtesting_testdata(str(tmpdir), pair='UNITTEST/BTC', tick_interval='1m')
+
+    # the last stored candle is downloaded again
+    assert history_mock.call_args[1]['since_ms'] == 1509836580000
+    assert json_dump_mock.call_count == 0
+    assert datastore.read_meta(store)['segments'] == [[0, 1], [1, 2]]
+    assert datastore.columns_to_tickerlist(datastore.load_store(store)) == tickerlist
+
+
 def test_download_backtesting_testdata2(mocker) -> None:
     tick = [
         [1509836520000, 0.00162008, 0.00162008, 0.00162008, 0.00162008, 108.14853839],
@@ -438,3 +460,47 @@ def test_file_dump_json() -> None:
 
     # Remove the file
     _clean_test_file(file)
+
+
+def test_load_tickerdata_file_columnar(tmpdir) -> None:
+    tickerlist = load_tickerdata_file(None, 'UNITTEST/BTC', '1m')
+    datastore.write_store(datastore.store_path(str(tmpdir), 'UNITTEST/BTC', '1m'),
+                          datastore.tickerlist_to_columns(tickerlist))
+
+    columns = load_tickerdata_file(str(tmpdir), 'UNITTEST/BTC', '1m')
+    assert isinstance(columns, dict)
+    assert len(columns['date']) == _BTC_UNITTEST_LENGTH
+    assert datastore.columns_to_tickerlist(columns) == tickerlist
+
+    timerange = TimeRange('date', 'date', tickerlist[5][0] / 1000, tickerlist[10][0] / 1000 - 1)
+    columns = load_tickerdata_file(str(tmpdir), 'UNITTEST/BTC', '1m', timerange=timerange)
+    assert datastore.columns_to_tickerlist(columns) == tickerlist[5:10]
+
+    data = optimize.load_data(str(tmpdir), ticker_interval='1m', pairs=['UNITTEST/BTC'])
+    assert len(data['UNITTEST/BTC']['close']) == _BTC_UNITTEST_LENGTH
+
+
+def test_trim_tickercolumns() -> None:
+    tickerlist = load_tickerdata_file(None, 'UNITTEST/BTC', '1m')
+    columns = datastore.tickerlist_to_columns(tickerlist)
+
+    for timerange in [TimeRange(None, 'line', 0, -5),
+                      TimeRange('line', None, 5, 0),
+                      TimeRange('index', 'index', 5, 10),
+                      TimeRange('date', 'date', tickerlist[5][0] / 1000,
+                                tickerlist[10][0] / 1000 - 1),
+                      TimeRange(None, 'date', 0, tickerlist[10][0] / 1000 - 1),
+                      TimeRange('date', None, tickerlist[10][0] / 1000 - 1, None),
+                      TimeRange(None, None, None, 5)]:
+        trimmed = trim_tickercolumns(columns, timerange)
+        assert datastore.columns_to_tickerlist(trimmed) == trim_tickerlist(tickerlist, timerange)
+
+
+def test_bisect_tickerlist() -> None:
+    tickerlist = [[1000], [2000], [2000], [3000]]
+    assert _bisect_tickerlist(tickerlist, 500) == 0
+    assert _bisect_tickerlist(tickerlist, 2000, 'left') == 1
+    assert _bisect_tickerlist(tickerlist, 2000, 'right') == 3
+    assert _bisect_tickerlist(tickerlist, 2500, 'left') == 3
+    assert _bisect_tickerlist(tickerlist, 3500, 'right') == 4
+    assert _bisect_tickerlist([], 3500) == 0
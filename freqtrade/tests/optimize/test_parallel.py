@@ -0,0 +1,49 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+from pandas import DataFrame
+
+from freqtrade.analyze import Analyze
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize import parallel
+from freqtrade.tests.conftest import log_has
+
+
+def _populate_indicators(dataframe: DataFrame) -> DataFrame:
+    dataframe['mean'] = (dataframe['high'] + dataframe['low']) / 2
+    dataframe['rising'] = dataframe['close'] > dataframe['open']
+    dataframe['label'] = 'x'
+    return dataframe
+
+
+def _get_analyze(default_conf) -> Analyze:
+    analyze = Analyze(default_conf)
+    analyze.populate_indicators = _populate_indicators  # type: ignore
+    return analyze
+
+
+def test_load_and_preprocess_parallel(default_conf) -> None:
+    analyze = _get_analyze(default_conf)
+    pairs = ['UNITTEST/BTC', 'ETH/BTC', 'LTC/BTC']
+    timerange = TimeRange(None, 'line', 0, -500)
+
+    serial = parallel.load_and_preprocess(analyze, None, pairs=pairs,
+                                          ticker_interval='5m', timerange=timerange)
+    forked = parallel.load_and_preprocess(analyze, None, pairs=pairs,
+                                          ticker_interval='5m', timerange=timerange,
+                                          workers=2)
+
+    assert list(forked.keys()) == pairs
+    for pair in pairs:
+        assert forked[pair].equals(serial[pair])
+    assert parallel._WORKER_STATE == {}
+
+
+def test_load_and_preprocess_missing_pair(default_conf, caplog) -> None:
+    analyze = _get_analyze(default_conf)
+    result = parallel.load_and_preprocess(analyze, None, pairs=['MEME/BTC', 'UNITTEST/BTC'],
+                                          ticker_interval='1m', workers=2)
+
+    assert list(result.keys()) == ['UNITTEST/BTC']
+    assert log_has('No data for pair: "MEME/BTC", Interval: 1m. '
+                   'Use --refresh-pairs-cached to download the data',
+                   caplog.record_tuples)
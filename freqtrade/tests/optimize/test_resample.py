@@ -0,0 +1,129 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from freqtrade import optimize
+from freqtrade.analyze import Analyze
+from freqtrade.optimize import datastore, resample
+
+_TESTDATA = os.path.join(os.path.dirname(__file__), '..', 'testdata')
+
+
+def _load_unittest_1m():
+    with open(os.path.join(_TESTDATA, 'UNITTEST_BTC-1m.json')) as file:
+        return json.load(file)
+
+
+def test_source_intervals() -> None:
+    assert resample.source_intervals('15m') == ['1m', '3m', '5m']
+    assert resample.source_intervals('1m') == []
+    assert resample.source_intervals('7m') == []
+
+
+@pytest.mark.parametrize('tick_interval', ['5m', '15m', '1h', '1d'])
+def test_resample_columns(tick_interval) -> None:
+    tickerlist = _load_unittest_1m()
+    columns = resample.resample_columns(datastore.tickerlist_to_columns(tickerlist),
+                                        tick_interval)
+
+    frame = Analyze.parse_ticker_dataframe(tickerlist)
+    aggregation = {
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum',
+    }
+    rule = f'{resample.interval_ms(tick_interval) // 60000}min'
+    expected = frame.resample(rule, on='date').agg(aggregation).dropna()
+    # the data starts partway through the first candle
+    assert frame['date'].iloc[0] != expected.index[0]
+    expected = expected.iloc[1:]
+
+    resampled = Analyze.parse_ticker_dataframe(columns)
+    assert list(resampled['date']) == list(expected.index)
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        assert np.allclose(resampled[col].values, expected[col].values)
+
+
+def test_resample_columns_duplicates() -> None:
+    # duplicated and unsorted candles are merged the way parse_ticker_dataframe does it
+    tickerlist = [
+        [1514764860000, 2.0, 4.0, 1.0, 3.0, 5.0],
+        [1514764800000, 1.0, 2.0, 0.5, 1.5, 10.0],
+        [1514764800000, 1.1, 2.5, 0.7, 1.6, 12.0],
+    ]
+    columns = resample.resample_columns(datastore.tickerlist_to_columns(tickerlist), '5m')
+    assert datastore.columns_to_tickerlist(columns) == [
+        [1514764800000, 1.0, 4.0, 0.5, 3.0, 17.0]
+    ]
+
+
+def test_resample_columns_weekly() -> None:
+    # 2018-01-01 was a monday
+    monday = 1514764800000
+    day = 24 * 60 * 60 * 1000
+    tickerlist = [[monday + i * day, 1.0, 1.0 + i, 1.0, 1.0, 1.0] for i in range(-1, 8)]
+    columns = resample.resample_columns(datastore.tickerlist_to_columns(tickerlist), '1w')
+    # the week of the sunday started before the data
+    assert list(columns['date']) == [monday, monday + 7 * day]
+    assert list(columns['volume']) == [7.0, 1.0]
+
+
+def test_resample_columns_partial_first_candle() -> None:
+    # 2018-01-01 00:02, the 00:00 candle misses its first two minutes
+    start = 1514764800000
+    minute = 60 * 1000
+    tickerlist = [[start + i * minute, float(i), float(i), float(i), float(i), 1.0]
+                  for i in range(2, 13)]
+    columns = resample.resample_columns(datastore.tickerlist_to_columns(tickerlist), '5m')
+    assert datastore.columns_to_tickerlist(columns) == [
+        [start + 5 * minute, 5.0, 9.0, 5.0, 9.0, 5.0],
+        [start + 10 * minute, 10.0, 12.0, 10.0, 12.0, 3.0],
+    ]
+
+    # only the partial candle
+    columns = resample.resample_columns(
+        datastore.tickerlist_to_columns(tickerlist[:3]), '5m')
+    assert len(columns['date']) == 0
+    assert set(columns) == set(datastore.OHLCV_COLUMNS)
+
+
+def test_load_tickerdata_file_resampled(mocker, tmpdir) -> None:
+    datadir = str(tmpdir)
+    shutil.copy(os.path.join(_TESTDATA, 'UNITTEST_BTC-1m.json'), datadir)
+    expected = resample.resample_columns(
+        datastore.tickerlist_to_columns(_load_unittest_1m()), '15m')
+    resample_mock = mocker.patch('freqtrade.optimize.resample.resample_columns',
+                                 side_effect=resample.resample_columns)
+
+    pairdata = optimize.load_tickerdata_file(datadir, 'UNITTEST/BTC', '15m')
+    assert datastore.columns_to_tickerlist(pairdata) == datastore.columns_to_tickerlist(expected)
+    assert resample_mock.call_count == 1
+
+    derived = datastore.derived_store_path(datadir, 'UNITTEST/BTC', '15m')
+    assert datastore.read_meta(derived)['source']['interval'] == '1m'
+
+    # cached
+    optimize.load_tickerdata_file(datadir, 'UNITTEST/BTC', '15m')
+    assert resample_mock.call_count == 1
+
+    # rebuilt once the source changed
+    tickerlist = _load_unittest_1m()[:-30]
+    with open(os.path.join(datadir, 'UNITTEST_BTC-1m.json'), 'w') as file:
+        json.dump(tickerlist, file)
+    pairdata = optimize.load_tickerdata_file(datadir, 'UNITTEST/BTC', '15m')
+    assert resample_mock.call_count == 2
+    assert pairdata['date'][-1] <= tickerlist[-1][0]
+
+    # the finest stored interval is used
+    datastore.write_store(datastore.store_path(datadir, 'UNITTEST/BTC', '5m'),
+                          resample.resample_columns(
+                              datastore.tickerlist_to_columns(tickerlist), '5m'))
+    optimize.load_tickerdata_file(datadir, 'UNITTEST/BTC', '15m')
+    assert datastore.read_meta(derived)['source']['interval'] == '1m'
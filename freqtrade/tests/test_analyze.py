@@ -6,14 +6,19 @@ Unit test file for analyse.py
 
 import datetime
 import logging
+import os
 from unittest.mock import MagicMock
 
 import arrow
-from pandas import DataFrame
+import numpy as np
+import talib as ta
+from pandas import DataFrame, to_datetime
 
 from freqtrade.analyze import Analyze, SignalType
+from freqtrade.indicator_helpers import ema_update
 from freqtrade.optimize.__init__ import load_tickerdata_file
 from freqtrade.arguments import TimeRange
+from freqtrade.strategy.interface import IStrategy
 from freqtrade.tests.conftest import log_has
 
 # Avoid to reinit the same object again and again
@@ -158,6 +163,82 @@ def test_get_signal_old_dataframe(default_conf, mocker, caplog):
     )
 
 
+def test_get_signals(default_conf, mocker):
+    analyze = Analyze(default_conf)
+    history_mock = mocker.patch('freqtrade.analyze.get_ticker_history',
+                                side_effect=lambda pair, interval: [] if pair == 'NEO/BTC' else [1])
+    now = arrow.utcnow()
+    mocker.patch.object(analyze, 'analyze_ticker', side_effect=lambda ticker, pair: DataFrame([
+        {'buy': int(pair == 'ETH/BTC'), 'sell': int(pair == 'XRP/BTC'), 'date': now},
+        {'buy': int(pair != 'ETH/BTC'), 'sell': int(pair == 'LTC/BTC'), 'date': now},
+    ]) if pair != 'BCC/BTC' else DataFrame())
+    pairs = ['ETH/BTC', 'NEO/BTC', 'LTC/BTC', 'XRP/BTC', 'BCC/BTC', 'ETC/BTC']
+    expected = [(False, False), (False, False), (True, True),
+                (True, False), (False, False), (True, False)]
+
+    assert list(analyze.get_signals(pairs, '5m', workers=3)) == expected
+    assert history_mock.call_count == len(pairs)
+
+    # one by one, only as far as the signals are read
+    signals = analyze.get_signals(pairs, '5m')
+    assert next(signals) == (False, False)
+    assert history_mock.call_count == len(pairs) + 1
+    assert list(signals) == expected[1:]
+
+
+SMA_STRATEGY = """
+from freqtrade.strategy.interface import IStrategy
+
+
+class SmaStrategy(IStrategy):
+    minimal_roi = {"0": 0.04}
+    stoploss = -0.10
+    ticker_interval = "5m"
+
+    def populate_indicators(self, dataframe):
+        dataframe['sma'] = dataframe['close'].rolling(10).mean()
+        return dataframe
+
+    def populate_buy_trend(self, dataframe):
+        dataframe['buy'] = (dataframe['close'] > dataframe['sma']).astype(int)
+        return dataframe
+
+    def populate_sell_trend(self, dataframe):
+        dataframe['sell'] = (dataframe['close'] < dataframe['sma']).astype(int)
+        return dataframe
+"""
+
+
+def test_signal_workers(default_conf, tmpdir):
+    # the workers load the strategy from the configuration
+    with open(os.path.join(str(tmpdir), 'sma_strategy.py'), 'w') as file:
+        file.write(SMA_STRATEGY)
+    default_conf.update({'strategy': 'SmaStrategy', 'strategy_path': str(tmpdir)})
+    analyze = Analyze(default_conf)
+    tickers = [(pair, load_tickerdata_file(None, pair, '5m'))
+               for pair in ['UNITTEST/BTC', 'ETH/BTC']]
+    expected = {pair: analyze.analyze_ticker(ticker, pair).tail(1) for pair, ticker in tickers}
+
+    analyze.start_workers(2)
+    try:
+        pool = analyze._pool
+        assert pool is not None
+        # the same processes analyze the candles at each iteration
+        for _ in range(2):
+            for pair, dataframe in analyze._analyze_tickers(tickers):
+                assert dataframe.reset_index(drop=True).equals(
+                    expected[pair].reset_index(drop=True))
+        assert analyze._pool is pool
+    finally:
+        analyze.stop_workers()
+    assert analyze._pool is None
+
+    # incremental indicators are kept in this process
+    analyze.strategy = IncrementalStrategy()
+    analyze.start_workers(2)
+    assert analyze._pool is None
+
+
 def test_get_signal_handles_exceptions(mocker):
     mocker.patch('freqtrade.analyze.get_ticker_history', return_value=MagicMock())
     mocker.patch.multiple(
@@ -178,6 +259,51 @@ def test_parse_ticker_dataframe(ticker_history):
     assert dataframe.columns.tolist() == columns
 
 
+def legacy_parse_ticker_dataframe(ticker) -> DataFrame:
+    """
+    The groupby based parsing used before, also benchmarked by scripts/benchmark_parse_ticker.py
+    """
+    frame = DataFrame(ticker, columns=['date', 'open', 'high', 'low', 'close', 'volume'])
+    frame['date'] = to_datetime(frame['date'], unit='ms', utc=True)
+    return frame.groupby(by='date', as_index=False, sort=True).agg({
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'max',
+    })
+
+
+def test_parse_ticker_dataframe_clean(mocker) -> None:
+    ticker = load_tickerdata_file(None, 'UNITTEST/BTC', '1m')
+    merge_mock = mocker.spy(Analyze, '_merge_duplicate_ticks')
+
+    dataframe = Analyze.parse_ticker_dataframe(ticker)
+    assert merge_mock.call_count == 0
+    assert dataframe.equals(legacy_parse_ticker_dataframe(ticker))
+    assert list(dataframe.dtypes) == list(legacy_parse_ticker_dataframe(ticker).dtypes)
+
+
+def test_parse_ticker_dataframe_duplicates(mocker) -> None:
+    ticker = [
+        [1511686200000, 8.794e-05, 8.948e-05, 8.794e-05, 8.88e-05, 0.0877869],
+        [1511686500000, 8.88e-05, 8.942e-05, 8.88e-05, 8.893e-05, 0.05874751],
+        [1511686200000, 8.795e-05, 8.95e-05, 8.79e-05, 8.881e-05, 0.0977869],
+        [1511686800000, 8.891e-05, 8.893e-05, 8.875e-05, 8.877e-05, 0.7039405],
+        [1511686500000, 8.87e-05, 8.94e-05, 8.87e-05, 8.894e-05, 0.04874751],
+    ]
+    merge_mock = mocker.spy(Analyze, '_merge_duplicate_ticks')
+
+    dataframe = Analyze.parse_ticker_dataframe(ticker)
+    assert merge_mock.call_count == 1
+    assert len(dataframe) == 3
+    assert dataframe.equals(legacy_parse_ticker_dataframe(ticker))
+
+    # NaN values fall back to pandas
+    ticker[1][2] = float('nan')
+    assert Analyze.parse_ticker_dataframe(ticker).equals(legacy_parse_ticker_dataframe(ticker))
+
+
 def test_tickerdata_to_dataframe(default_conf) -> None:
     """
     Test Analyze.tickerdata_to_dataframe() method
@@ -189,3 +315,93 @@ def test_tickerdata_to_dataframe(default_conf) -> None:
     tickerlist = {'UNITTEST/BTC': tick}
     data = analyze.tickerdata_to_dataframe(tickerlist)
     assert len(data['UNITTEST/BTC']) == 100       # partial candle was NOT removed (only for known exchanges like binance)
+
+
+class IncrementalStrategy(IStrategy):
+    minimal_roi = {0: 0.04}
+    stoploss = -0.10
+    ticker_interval = '1m'
+    startup_candle_count = 50
+    incremental_indicators = True
+
+    def populate_indicators(self, dataframe: DataFrame) -> DataFrame:
+        dataframe['ema'] = ta.EMA(dataframe['close'].values, timeperiod=10)
+        return dataframe
+
+    def update_indicators(self, dataframe: DataFrame, start: int, pair: str) -> DataFrame:
+        ema_update(dataframe, 'close', 'ema', 10, start)
+        return dataframe
+
+    def populate_buy_trend(self, dataframe: DataFrame) -> DataFrame:
+        dataframe['buy'] = (dataframe['close'] > dataframe['ema']).astype(int)
+        return dataframe
+
+    def populate_sell_trend(self, dataframe: DataFrame) -> DataFrame:
+        dataframe['sell'] = 0
+        return dataframe
+
+
+def test_analyze_ticker_startup_candles(default_conf, mocker) -> None:
+    analyze = Analyze(default_conf)
+    analyze.strategy = IncrementalStrategy()
+    analyze.strategy.incremental_indicators = False
+    analyze.strategy.startup_candle_count = 30
+    populate_mock = mocker.spy(analyze.strategy, 'populate_indicators')
+    ticker = load_tickerdata_file(None, 'UNITTEST/BTC', '1m')
+
+    dataframe = analyze.analyze_ticker(ticker, 'UNITTEST/BTC')
+    assert len(populate_mock.call_args[0][0]) == 30
+    assert len(dataframe) == 30
+    assert dataframe['date'].iloc[-1] == to_datetime(ticker[-1][0], unit='ms', utc=True)
+    assert 'buy' in dataframe.columns
+
+
+def test_analyze_ticker_incremental(default_conf, mocker) -> None:
+    analyze = Analyze(default_conf)
+    analyze.strategy = IncrementalStrategy()
+    populate_mock = mocker.spy(analyze.strategy, 'populate_indicators')
+    update_mock = mocker.spy(analyze.strategy, 'update_indicators')
+    ticker = load_tickerdata_file(None, 'UNITTEST/BTC', '1m')
+    expected = ta.EMA(Analyze.parse_ticker_dataframe(ticker)['close'].values, timeperiod=10)
+
+    dataframe = analyze.analyze_ticker(ticker[:200], 'UNITTEST/BTC')
+    assert populate_mock.call_count == 1
+    assert len(dataframe) == 50
+    assert np.allclose(dataframe['ema'], expected[150:200])
+
+    # the last candle changed and two new ones arrived
+    ticker = [list(candle) for candle in ticker]
+    ticker[199][4] *= 1.01
+    expected = ta.EMA(Analyze.parse_ticker_dataframe(ticker)['close'].values, timeperiod=10)
+    dataframe = analyze.analyze_ticker(ticker[:202], 'UNITTEST/BTC')
+    assert populate_mock.call_count == 1
+    assert update_mock.call_count == 1
+    assert update_mock.call_args[1]['start'] == 49
+    assert len(dataframe) == 50
+    assert np.allclose(dataframe['ema'], expected[152:202])
+    assert (dataframe['buy'] == (dataframe['close'] > dataframe['ema'])).all()
+
+    # candles which don't follow the analyzed ones are populated in full
+    analyze.analyze_ticker(ticker[300:400], 'UNITTEST/BTC')
+    assert populate_mock.call_count == 2
+    assert update_mock.call_count == 1
+
+
+def test_analyze_ticker_incremental_default_update(default_conf, mocker) -> None:
+    class DefaultUpdateStrategy(IncrementalStrategy):
+        update_indicators = IStrategy.update_indicators
+
+    analyze = Analyze(default_conf)
+    analyze.strategy = DefaultUpdateStrategy()
+    populate_mock = mocker.spy(analyze.strategy, 'populate_indicators')
+    ticker = load_tickerdata_file(None, 'UNITTEST/BTC', '1m')
+    expected = ta.EMA(Analyze.parse_ticker_dataframe(ticker)['close'].values, timeperiod=10)
+
+    analyze.analyze_ticker(ticker[:200], 'UNITTEST/BTC')
+    dataframe = analyze.analyze_ticker(ticker[:202], 'UNITTEST/BTC')
+    # the indicators are populated again over the analyzed and the new candles
+    assert populate_mock.call_count == 2
+    assert len(populate_mock.call_args[0][0]) == 52
+    assert len(dataframe) == 50
+    assert not dataframe['ema'].iloc[10:].isnull().any()
+    assert np.allclose(dataframe['ema'].iloc[-10:], expected[192:202], rtol=1e-3)
@@ -149,7 +149,12 @@ def test_parse_args_backtesting_custom() -> None:
         'backtesting',
         '--live',
         '--ticker-interval', '1m',
-        '--refresh-pairs-cached']
+        '--refresh-pairs-cached',
+        '--stream-pairs', '10',
+        '--preprocess-workers', '4',
+        '--dataframe-cache',
+        '--clear-dataframe-cache',
+        '--low-memory']
     call_args = Arguments(args, '').get_parsed_arg()
     assert call_args.config == 'test_conf.json'
     assert call_args.live is True
@@ -158,6 +163,11 @@ def test_parse_args_backtesting_custom() -> None:
     assert call_args.func is not None
     assert call_args.ticker_interval == '1m'
     assert call_args.refresh_pairs is True
+    assert call_args.stream_pairs == 10
+    assert call_args.preprocess_workers == 4
+    assert call_args.dataframe_cache is True
+    assert call_args.clear_dataframe_cache is True
+    assert call_args.low_memory is True
 
 
 def test_parse_args_hyperopt_custom() -> None:
@@ -181,7 +191,11 @@ def test_testdata_dl_options() -> None:
         '--pairs-file', 'file_with_pairs',
         '--export', 'export/folder',
         '--days', '30',
-        '--exchange', 'binance'
+        '--exchange', 'binance',
+        '--concurrency', '8',
+        '--requests-per-second', '2.5',
+        '--columnar',
+        '--backfill-gaps'
     ]
     arguments = Arguments(args, '')
     arguments.testdata_dl_options()
@@ -190,3 +204,8 @@ def test_testdata_dl_options() -> None:
     assert args.export == 'export/folder'
     assert args.days == 30
     assert args.exchange == 'binance'
+    assert args.concurrency == 8
+    assert args.requests_per_second == 2.5
+    assert args.columnar
+    assert args.backfill_gaps
+    assert not args.find_gaps
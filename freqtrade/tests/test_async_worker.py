@@ -0,0 +1,127 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from freqtrade import OperationalException, TemporaryError
+from freqtrade.async_worker import AsyncWorker
+from freqtrade.marketdata import MarketEvent, StreamingMarketData
+from freqtrade.rpc.rpc_manager import RPCManager
+from freqtrade.state import State
+from freqtrade.tests.test_freqtradebot import get_patched_freqtradebot
+
+
+def get_worker(mocker, config) -> AsyncWorker:
+    freqtrade = get_patched_freqtradebot(mocker, config)
+    worker = AsyncWorker(freqtrade)
+    worker._loop = asyncio.new_event_loop()
+    mocker.patch.object(freqtrade, '_update_whitelist',
+                        return_value=config['exchange']['pair_whitelist'])
+    return worker
+
+
+def test_process_signals(mocker, default_conf) -> None:
+    worker = get_worker(mocker, default_conf)
+    freqtrade = worker.freqtrade
+    mocker.patch('freqtrade.async_worker.Trade')
+
+    def get_signal(pair, interval):
+        if pair == 'LTC/BTC':
+            raise TemporaryError('Timeout')
+        return pair == 'XRP/BTC', False
+
+    freqtrade.analyze.get_signal = MagicMock(side_effect=get_signal)
+    buy_mock = mocker.patch.object(freqtrade, 'process_maybe_execute_buy', return_value=False)
+
+    worker._loop.run_until_complete(worker._process())
+    assert freqtrade.analyze.get_signal.call_count == 4
+    assert buy_mock.call_args[0][0] == {
+        'ETH/BTC': (False, False),
+        'XRP/BTC': (True, False),
+        'NEO/BTC': (False, False),
+    }
+    assert worker._is_backing_off('LTC/BTC')
+    assert worker._backoff['LTC/BTC'][1] == 5
+
+    # the failing pair is skipped, then tried again with a longer delay
+    worker._loop.run_until_complete(worker._process())
+    assert freqtrade.analyze.get_signal.call_count == 7
+    worker._backoff['LTC/BTC'] = (0.0, 5)
+    worker._loop.run_until_complete(worker._process())
+    assert freqtrade.analyze.get_signal.call_count == 11
+    assert worker._backoff['LTC/BTC'][1] == 10
+
+
+def test_process_operational_exception(mocker, default_conf) -> None:
+    worker = get_worker(mocker, default_conf)
+    freqtrade = worker.freqtrade
+    freqtrade.state = State.RUNNING
+    freqtrade._update_whitelist.side_effect = OperationalException('Oh snap!')
+
+    assert not worker._loop.run_until_complete(worker._process())
+    assert freqtrade.state == State.STOPPED
+
+
+def test_worker_throttle(mocker, default_conf) -> None:
+    default_conf['internals'] = {'process_throttle_secs': 0.1}
+    worker = get_worker(mocker, default_conf)
+    freqtrade = worker.freqtrade
+    freqtrade.state = State.RUNNING
+    notify_mock = mocker.patch.object(freqtrade, '_notify_state_change')
+    process_mock = MagicMock()
+
+    async def process(nb_assets):
+        process_mock(nb_assets)
+        return False
+    mocker.patch.object(worker, '_process', process)
+
+    start = worker._loop.time()
+    assert worker._loop.run_until_complete(worker.worker(None)) == State.RUNNING
+    assert worker._loop.time() - start >= 0.1
+    assert notify_mock.call_count == 1
+    assert process_mock.call_count == 1
+
+
+def test_worker_wakeup(mocker, default_conf) -> None:
+    default_conf['internals'] = {'process_throttle_secs': 60}
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    freqtrade.market_data = StreamingMarketData()
+    worker = AsyncWorker(freqtrade)
+    worker._loop = asyncio.new_event_loop()
+
+    async def sleep():
+        worker._wakeup = asyncio.Event()
+        worker._loop.call_later(0.05, freqtrade.market_data.on_message, {
+            'type': 'candle', 'pair': 'ETH/BTC', 'interval': '5m', 'data': [1, 1, 1, 1, 1, 1]
+        })
+        await worker._sleep(60)
+
+    start = worker._loop.time()
+    worker._loop.run_until_complete(sleep())
+    assert worker._loop.time() - start < 1
+    # the same candle again does not wake the loop up
+    worker._on_market_event(MarketEvent('candle', 'ETH/BTC', '5m', [1, 1, 1, 1, 1, 2]))
+    assert not worker._wakeup.is_set()
+
+
+def test_run(mocker, default_conf) -> None:
+    worker = get_worker(mocker, default_conf)
+    freqtrade = worker.freqtrade
+    freqtrade.state = State.RELOAD_CONF
+    mocker.patch.object(freqtrade, '_notify_state_change')
+
+    assert worker.run() == State.RELOAD_CONF
+    assert freqtrade.rpc.executor is None
+
+
+def test_rpc_executor(default_conf) -> None:
+    default_conf['telegram']['enabled'] = False
+    rpc = RPCManager(MagicMock(config=default_conf))
+    module = MagicMock()
+    rpc.registered_modules.append(module)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        rpc.executor = executor
+        rpc.send_msg('test')
+    module.send_msg.assert_called_once_with('test')
@@ -0,0 +1,113 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+from unittest.mock import MagicMock
+
+import arrow
+
+from freqtrade.analyze import Analyze
+from freqtrade.candle_cache import CandleCache
+
+# 2018-01-01 00:00:00 UTC
+START_MS = 1514764800000
+INTERVAL_MS = 5 * 60 * 1000
+
+
+class FakeExchange(object):
+    """
+    Exchange sending its running candle, like binance, 20 candles per request
+    """
+
+    def __init__(self, mocker) -> None:
+        self.now_ms = START_MS
+        self.history = mocker.patch('freqtrade.exchange.get_ticker_history',
+                                    side_effect=self.get_ticker_history)
+        self.page = mocker.patch('freqtrade.exchange.get_ticker_history_page',
+                                 side_effect=self.get_ticker_history_page)
+        clock = MagicMock()
+        clock.utcnow.side_effect = lambda: arrow.get(self.now_ms / 1000)
+        mocker.patch('freqtrade.candle_cache.arrow', clock)
+
+    def candles(self):
+        # the close of the running candle moves until the candle is complete
+        count = (self.now_ms - START_MS) // INTERVAL_MS + 1
+        progress = (self.now_ms - START_MS) % INTERVAL_MS
+        return [[START_MS + i * INTERVAL_MS, 1.0, 2.0, 0.5,
+                 1.0 + (progress if i == count - 1 else INTERVAL_MS), float(i)]
+                for i in range(count)]
+
+    def get_ticker_history(self, pair, tick_interval, since_ms=None):
+        return self.candles()[-50:]
+
+    def get_ticker_history_page(self, pair, tick_interval, since_ms=None):
+        return [c for c in self.candles() if c[0] >= since_ms][:20]
+
+
+def test_candle_cache(mocker) -> None:
+    fake = FakeExchange(mocker)
+    fake.now_ms = START_MS + 100 * INTERVAL_MS + 1000
+    cache = CandleCache(max_candles=30)
+
+    assert cache.get('ETH/BTC', '5m') == fake.candles()[-30:]
+    assert fake.history.call_count == 1
+
+    # the running candle changed and a new one started
+    fake.now_ms += INTERVAL_MS
+    assert cache.get('ETH/BTC', '5m') == fake.candles()[-30:]
+    assert fake.history.call_count == 1
+    assert fake.page.call_count == 1
+    assert fake.page.call_args[1]['since_ms'] == START_MS + 100 * INTERVAL_MS
+
+    # same candle, still running
+    fake.now_ms += 1000
+    assert cache.get('ETH/BTC', '5m') == fake.candles()[-30:]
+    assert fake.page.call_count == 2
+    assert cache.requests == 3
+
+
+def test_candle_cache_catch_up(mocker) -> None:
+    fake = FakeExchange(mocker)
+    fake.now_ms = START_MS + 100 * INTERVAL_MS
+    cache = CandleCache()
+
+    assert cache.get('ETH/BTC', '5m') == fake.candles()[-50:]
+
+    # more candles are missing than a request returns
+    fake.now_ms += 30 * INTERVAL_MS
+    assert cache.get('ETH/BTC', '5m') == fake.candles()[-50:]
+    assert fake.page.call_count == 2
+    assert fake.history.call_count == 1
+
+    # too old to catch up, everything is downloaded again
+    fake.now_ms += 60 * INTERVAL_MS
+    assert cache.get('ETH/BTC', '5m') == fake.candles()[-50:]
+    assert fake.page.call_count == 2
+    assert fake.history.call_count == 2
+
+
+def test_candle_cache_clear(mocker) -> None:
+    fake = FakeExchange(mocker)
+    fake.history.side_effect = None
+    fake.history.return_value = []
+    cache = CandleCache()
+
+    assert cache.get('ETH/BTC', '5m') == []
+    fake.history.side_effect = fake.get_ticker_history
+    assert cache.get('ETH/BTC', '5m') == fake.candles()
+    cache.get('ETH/BTC', '5m')
+    assert fake.history.call_count == 2
+
+    cache.clear('ETH/BTC')
+    cache.get('ETH/BTC', '5m')
+    assert fake.history.call_count == 3
+
+
+def test_analyze_candle_cache(mocker, default_conf) -> None:
+    assert Analyze(default_conf).candle_cache is None
+
+    default_conf['internals'] = {'candle_cache_size': 500}
+    analyze = Analyze(default_conf)
+    assert analyze.candle_cache.max_candles == 500
+
+    cache_mock = mocker.patch.object(analyze.candle_cache, 'get', return_value=[])
+    assert analyze.get_signal('ETH/BTC', '5m') == (False, False)
+    cache_mock.assert_called_once_with('ETH/BTC', '5m')
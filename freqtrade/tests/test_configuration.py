@@ -27,6 +27,7 @@ def test_configuration_object() -> None:
     assert hasattr(Configuration, '_validate_config')
     assert hasattr(Configuration, '_load_common_config')
     assert hasattr(Configuration, '_load_backtesting_config')
+    assert hasattr(Configuration, '_load_preprocessing_config')
     assert hasattr(Configuration, '_load_hyperopt_config')
     assert hasattr(Configuration, 'get_config')
 
@@ -291,7 +292,10 @@ def test_setup_configuration_with_arguments(mocker, default_conf, caplog) -> Non
         '--realistic-simulation',
         '--refresh-pairs-cached',
         '--timerange', ':100',
-        '--export', '/bar/foo'
+        '--export', '/bar/foo',
+        '--dataframe-cache',
+        '--low-memory',
+        '--stream-pairs', '5'
     ]
 
     args = Arguments(arglist, '').get_parsed_arg()
@@ -336,6 +340,15 @@ def test_setup_configuration_with_arguments(mocker, default_conf, caplog) -> Non
         caplog.record_tuples
     )
 
+    assert config['dataframe_cache'] is True
+    assert log_has('Parameter --dataframe-cache detected ...', caplog.record_tuples)
+
+    assert config['low_memory'] is True
+
+    assert config['stream_pairs'] == 5
+    assert log_has('Parameter --stream-pairs detected: 5 ...', caplog.record_tuples)
+    assert log_has('Parameter --low-memory detected ...', caplog.record_tuples)
+
 
 def test_hyperopt_with_arguments(mocker, default_conf, caplog) -> None:
     """
@@ -252,6 +252,42 @@ def test_create_trade(default_conf, ticker, limit_buy_order, fee, mocker) -> Non
     assert whitelist == default_conf['exchange']['pair_whitelist']
 
 
+def test_create_trade_signal_workers(default_conf, ticker, limit_buy_order, fee, mocker) -> None:
+    """
+    Test create_trade() method with the signals computed in parallel
+    """
+    patch_RPCManager(mocker)
+    patch_coinmarketcap(mocker)
+    mocker.patch.multiple(
+        'freqtrade.freqtradebot.exchange',
+        validate_pairs=MagicMock(),
+        get_ticker=ticker,
+        buy=MagicMock(return_value={'id': limit_buy_order['id']}),
+        get_fee=fee,
+    )
+    signals_mock = mocker.patch(
+        'freqtrade.freqtradebot.Analyze.get_signals',
+        return_value=iter([(False, False), (True, True), (True, False), (True, False)])
+    )
+
+    start_mock = mocker.patch('freqtrade.freqtradebot.Analyze.start_workers')
+    stop_mock = mocker.patch('freqtrade.freqtradebot.Analyze.stop_workers')
+
+    default_conf['internals'] = {'signal_workers': 4}
+    whitelist = deepcopy(default_conf['exchange']['pair_whitelist'])
+    freqtrade = FreqtradeBot(default_conf)
+    # the worker processes are started with the bot
+    start_mock.assert_called_once_with(4)
+    assert freqtrade.create_trade()
+
+    assert signals_mock.call_args[0] == (whitelist, '5m', 4)
+    # the first pair with a buy signal in the whitelist is picked
+    assert Trade.query.first().pair == whitelist[2]
+
+    freqtrade.cleanup()
+    assert stop_mock.call_count == 1
+
+
 def test_create_trade_minimal_amount(default_conf, ticker, limit_buy_order, fee, mocker) -> None:
     """
     Test create_trade() method
@@ -390,7 +426,7 @@ def test_process_trade_creation(default_conf, ticker, limit_buy_order,
         'freqtrade.freqtradebot.exchange',
         validate_pairs=MagicMock(),
         get_ticker=ticker,
-        get_markets=markets,
+        get_markets_by_quote=markets,
         buy=MagicMock(return_value={'id': limit_buy_order['id']}),
         get_order=MagicMock(return_value=limit_buy_order),
         get_fee=fee,
@@ -431,7 +467,7 @@ def test_process_exchange_failures(default_conf, ticker, markets, mocker) -> Non
         'freqtrade.freqtradebot.exchange',
         validate_pairs=MagicMock(),
         get_ticker=ticker,
-        get_markets=markets,
+        get_markets_by_quote=markets,
         buy=MagicMock(side_effect=TemporaryError)
     )
     sleep_mock = mocker.patch('time.sleep', side_effect=lambda _: None)
@@ -453,7 +489,7 @@ def test_process_operational_exception(default_conf, ticker, markets, mocker) ->
         'freqtrade.freqtradebot.exchange',
         validate_pairs=MagicMock(),
         get_ticker=ticker,
-        get_markets=markets,
+        get_markets_by_quote=markets,
         buy=MagicMock(side_effect=OperationalException)
     )
     freqtrade = FreqtradeBot(default_conf)
@@ -477,7 +513,7 @@ def test_process_trade_handling(
         'freqtrade.freqtradebot.exchange',
         validate_pairs=MagicMock(),
         get_ticker=ticker,
-        get_markets=markets,
+        get_markets_by_quote=markets,
         buy=MagicMock(return_value={'id': limit_buy_order['id']}),
         get_order=MagicMock(return_value=limit_buy_order),
         get_fee=fee,
@@ -540,6 +576,22 @@ def test_balance_bigger_last_ask(mocker) -> None:
     assert freqtrade.get_target_bid('ETH/BTC') >= 0.07
 
 
+def test_get_target_bid_order_book(mocker, default_conf) -> None:
+    """
+    Test get_target_bid() method using the order book
+    """
+    default_conf['bid_strategy'].update({'use_book_order': True, 'book_order_top': 2})
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    freqtrade.market_data = MagicMock()
+    freqtrade.market_data.get_ticker.return_value = {'bid': 0.05, 'ask': 0.051, 'last': 0.05}
+    freqtrade.market_data.get_order_book.return_value = {
+        'bids': [[0.0505, 1.0], [0.0504, 2.0]], 'asks': [[0.0506, 1.0]]
+    }
+
+    assert freqtrade.get_target_bid('ETH/BTC') == 0.0504 + 0.00000001
+    freqtrade.market_data.get_order_book.assert_called_once_with('ETH/BTC', 2)
+
+
 def test_process_maybe_execute_buy(mocker, default_conf) -> None:
     """
     Test process_maybe_execute_buy() method
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
+import talib as ta
 
-from freqtrade.indicator_helpers import went_up, went_down
+from freqtrade.indicator_helpers import ema_update, sma_update, went_up, went_down
 
 
 def test_went_up():
@@ -11,3 +13,26 @@ def test_went_up():
 def test_went_down():
     series = pd.Series([1, 2, 3, 1])
     assert went_down(series).equals(pd.Series([False, False, False, True]))
+
+
+def test_ema_update(result):
+    expected = ta.EMA(result['close'].values, timeperiod=10)
+
+    # nothing to continue from, computed in full
+    dataframe = result.head(50).copy()
+    ema_update(dataframe, 'close', 'ema', 10, 0)
+    assert np.allclose(dataframe['ema'], expected[:50], equal_nan=True)
+
+    dataframe = pd.concat([dataframe, result.iloc[50:60]], ignore_index=True, sort=False)
+    ema_update(dataframe, 'close', 'ema', 10, 50)
+    assert np.allclose(dataframe['ema'], expected[:60], equal_nan=True)
+
+
+def test_sma_update(result):
+    expected = ta.SMA(result['close'].values, timeperiod=10)
+
+    dataframe = result.head(50).copy()
+    sma_update(dataframe, 'close', 'sma', 10, 0)
+    dataframe = pd.concat([dataframe, result.iloc[50:51]], ignore_index=True, sort=False)
+    sma_update(dataframe, 'close', 'sma', 10, 50)
+    assert np.allclose(dataframe['sma'], expected[:51], equal_nan=True)
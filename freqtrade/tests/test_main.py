@@ -3,6 +3,8 @@ Unit test file for main.py
 """
 
 import logging
+import subprocess
+import sys
 from copy import deepcopy
 from unittest.mock import MagicMock
 
@@ -210,3 +212,23 @@ def test_reconfigure(mocker, default_conf) -> None:
     # Verify we have a new instance with the new config
     assert freqtrade is not freqtrade2
     assert freqtrade.config['stake_amount'] + 1 == freqtrade2.config['stake_amount']
+
+
+def test_main_lazy_imports() -> None:
+    """
+    Test --help and the backtesting subcommand do not import what only the bot needs
+    """
+    code = '''
+import sys
+from freqtrade.main import main
+try:
+    main(['--help'])
+except SystemExit:
+    pass
+heavy = {'ccxt', 'pandas', 'sqlalchemy', 'telegram', 'talib', 'hyperopt', 'arrow'}
+assert not heavy & set(sys.modules), heavy & set(sys.modules)
+import freqtrade.optimize.backtesting
+assert 'telegram' not in sys.modules
+assert 'hyperopt' not in sys.modules
+'''
+    subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.DEVNULL)
@@ -0,0 +1,112 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+import os
+import urllib.request
+from unittest.mock import MagicMock
+
+import pytest
+
+from freqtrade import TemporaryError, metrics
+from freqtrade.tests.test_freqtradebot import get_patched_freqtradebot
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.init({'metrics': {'enabled': True}})
+    yield metrics.registry()
+    metrics.cleanup()
+
+
+def test_metrics_disabled() -> None:
+    metrics.init({})
+    assert not metrics.enabled()
+    assert metrics.timer(metrics.PHASE, phase='buy') is metrics._NULL_TIMER
+    assert metrics.phase('buy') is metrics._NULL_TIMER
+    with metrics.phase('buy'):
+        pass
+    assert metrics.measured(lambda pair: pair)('ETH/BTC') == 'ETH/BTC'
+
+
+def test_metrics_phase(enabled_metrics, mocker) -> None:
+    mocker.patch('freqtrade.metrics.time.perf_counter', side_effect=[1.0, 1.02, 2.0, 2.5])
+    with metrics.phase('candles', 'ETH/BTC'):
+        pass
+    with metrics.phase('candles', 'ETH/BTC'):
+        pass
+
+    histogram = enabled_metrics.histogram(metrics.PHASE, phase='candles', pair='ETH/BTC')
+    assert histogram.count == 2
+    assert histogram.sum == pytest.approx(0.52)
+    text = enabled_metrics.render()
+    assert '# TYPE freqtrade_loop_phase_seconds histogram' in text
+    assert 'freqtrade_loop_phase_seconds_bucket{pair="ETH/BTC",phase="candles",le="0.025"} 1' \
+        in text
+    assert 'freqtrade_loop_phase_seconds_bucket{pair="ETH/BTC",phase="candles",le="0.5"} 2' \
+        in text
+    assert 'freqtrade_loop_phase_seconds_count{pair="ETH/BTC",phase="candles"} 2' in text
+
+
+def test_metrics_measured(enabled_metrics) -> None:
+    @metrics.measured
+    def get_order(order_id, pair):
+        if order_id == 'fail':
+            raise TemporaryError('Timeout')
+        return order_id
+
+    assert get_order.__name__ == 'get_order'
+    assert get_order('123', 'ETH/BTC') == '123'
+    with pytest.raises(TemporaryError):
+        get_order('fail', pair='LTC/BTC')
+
+    assert enabled_metrics.histogram(metrics.EXCHANGE_CALL, endpoint='get_order',
+                                     pair='ETH/BTC').count == 1
+    assert enabled_metrics.histogram(metrics.EXCHANGE_CALL, endpoint='get_order',
+                                     pair='LTC/BTC').count == 1
+    assert enabled_metrics.counter(metrics.EXCHANGE_ERRORS, endpoint='get_order',
+                                   pair='LTC/BTC', error='TemporaryError') == 1
+    assert 'freqtrade_exchange_errors_total{endpoint="get_order",error="TemporaryError",' \
+        'pair="LTC/BTC"} 1' in enabled_metrics.render()
+
+
+def test_metrics_exchange(enabled_metrics, default_conf, mocker) -> None:
+    api_mock = MagicMock()
+    api_mock.fetch_ticker.return_value = {'bid': 1, 'ask': 2, 'last': 1}
+    mocker.patch('freqtrade.exchange._API', api_mock)
+    from freqtrade import exchange
+    exchange.get_ticker('ETH/BTC')
+    assert enabled_metrics.histogram(metrics.EXCHANGE_CALL, endpoint='get_ticker',
+                                     pair='ETH/BTC').count == 1
+
+
+def test_metrics_exporters(tmpdir) -> None:
+    path = os.path.join(str(tmpdir), 'metrics.prom')
+    metrics.init({'metrics': {'enabled': True, 'listen_port': 0, 'file': path}})
+    try:
+        with metrics.phase('whitelist'):
+            pass
+        host, port = metrics._SERVER.server_address
+        with urllib.request.urlopen(f'http://{host}:{port}/metrics') as response:
+            assert 'freqtrade_loop_phase_seconds_count{phase="whitelist"} 1' in \
+                response.read().decode()
+    finally:
+        metrics.cleanup()
+    # the file is written a last time on cleanup
+    with open(path) as file:
+        assert 'freqtrade_loop_phase_seconds_count{phase="whitelist"} 1' in file.read()
+    assert not metrics.enabled()
+
+
+def test_freqtradebot_metrics(default_conf, mocker) -> None:
+    default_conf['metrics'] = {'enabled': True}
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    mocker.patch('freqtrade.freqtradebot.Trade', MagicMock())
+    mocker.patch.object(freqtrade, '_update_whitelist')
+    mocker.patch.object(freqtrade, 'process_maybe_execute_buy', return_value=False)
+    try:
+        assert metrics.enabled()
+        freqtrade._process()
+        registry = metrics.registry()
+        assert registry.histogram(metrics.PHASE, phase='whitelist').count == 1
+        assert registry.histogram(metrics.PHASE, phase='buy').count == 1
+    finally:
+        metrics.cleanup()
@@ -0,0 +1,56 @@
+# pragma pylint: disable=missing-docstring, C0103
+
+import pytest
+
+from freqtrade.order_book import BUY, SELL, OrderBook
+
+BOOK = {
+    'bids': [[0.099, 1.0], [0.098, 2.0], [0.095, 4.0], [0.09, 8.0]],
+    'asks': [[0.101, 1.5], [0.102, 1.0], [0.104, 3.0], [0.11, 5.0]],
+}
+
+
+def test_order_book_levels() -> None:
+    book = OrderBook.from_dict(BOOK)
+    assert book.bid() == 0.099
+    assert book.bid(3) == 0.095
+    assert book.ask(2) == 0.102
+    assert book.mid_price == pytest.approx(0.1)
+    assert book.bid_volume == 15.0
+    assert book.ask_volume == 10.5
+    assert book.bids_asks_ratio() == pytest.approx(15.0 / 10.5)
+
+
+def test_order_book_depth() -> None:
+    book = OrderBook.from_dict(BOOK)
+    # within 2% of 0.1: bids down to 0.098, asks up to 0.102
+    assert book.depth(0.02) == (3.0, 2.5)
+    assert book.depth(0.5) == (15.0, 10.5)
+    assert book.depth(0.001) == (0.0, 0.0)
+    assert book.imbalance(0.02) == pytest.approx(0.5 / 5.5)
+    assert book.imbalance(0.001) == 0.0
+    assert book.bids_asks_ratio(0.02) == pytest.approx(1.2)
+
+
+def test_order_book_vwap() -> None:
+    book = OrderBook.from_dict(BOOK)
+    assert book.vwap(BUY, 1.0) == pytest.approx(0.101)
+    assert book.vwap(BUY, 2.5) == pytest.approx((1.5 * 0.101 + 1.0 * 0.102) / 2.5)
+    assert book.vwap(SELL, 2.0) == pytest.approx((0.099 + 0.098) / 2)
+    assert book.vwap(SELL, 16.0) is None
+    assert book.vwap(SELL, 0) is None
+
+    assert book.price_at_volume(BUY, 2.5) == 0.102
+    assert book.price_at_volume(BUY, 2.6) == 0.104
+    assert book.price_at_volume(SELL, 15.0) == 0.09
+    assert book.price_at_volume(SELL, 15.1) is None
+    with pytest.raises(ValueError, match=r'Unknown order side'):
+        book.vwap('foo', 1)
+
+
+def test_order_book_empty() -> None:
+    book = OrderBook([], [])
+    assert book.bid_volume == 0.0
+    assert book.bids_asks_ratio() == float('inf')
+    assert book.imbalance() == 0.0
+    assert book.vwap(BUY, 1.0) is None
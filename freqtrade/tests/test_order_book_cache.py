@@ -0,0 +1,83 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+from unittest.mock import MagicMock
+
+from freqtrade.marketdata import PollingMarketData, create_market_data
+from freqtrade.order_book_cache import OrderBookCache
+
+
+def get_book(pair, limit, levels=1000):
+    levels = min(limit, levels)
+    return {
+        'bids': [[1.0 - i * 0.001, 1.0] for i in range(levels)],
+        'asks': [[1.001 + i * 0.001, 1.0] for i in range(levels)],
+    }
+
+
+def test_order_book_cache_depth(mocker) -> None:
+    mocker.patch('freqtrade.order_book_cache.time.monotonic', return_value=100.0)
+    fetch = MagicMock(side_effect=get_book)
+    cache = OrderBookCache(ttl=5, fetch=fetch)
+
+    # the depth fetched is rounded up, fewer levels are served from it
+    assert len(cache.get('ETH/BTC', 1)['bids']) == 1
+    assert fetch.call_args[0] == ('ETH/BTC', 5)
+    assert len(cache.get('ETH/BTC', 5)['asks']) == 5
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # more levels escalate to a deeper snapshot, which serves the smaller requests
+    assert len(cache.get('ETH/BTC', 200)['bids']) == 200
+    assert fetch.call_args[0] == ('ETH/BTC', 500)
+    cache.get('ETH/BTC', 1)
+    cache.get('ETH/BTC', 500)
+    assert fetch.call_count == 2
+    assert (cache.hits, cache.misses) == (3, 2)
+    cache.get('LTC/BTC', 1)
+    assert fetch.call_count == 3
+
+
+def test_order_book_cache_ttl(mocker) -> None:
+    now = mocker.patch('freqtrade.order_book_cache.time.monotonic', return_value=100.0)
+    fetch = MagicMock(side_effect=get_book)
+    cache = OrderBookCache(ttl=5, min_depth=100, fetch=fetch)
+
+    cache.get('ETH/BTC', 1)
+    assert fetch.call_args[0] == ('ETH/BTC', 100)
+    now.return_value = 104.9
+    cache.get('ETH/BTC', 10)
+    assert fetch.call_count == 1
+    now.return_value = 105.0
+    cache.get('ETH/BTC', 10)
+    assert fetch.call_count == 2
+
+    cache.clear('ETH/BTC')
+    cache.get('ETH/BTC', 10)
+    assert fetch.call_count == 3
+
+
+def test_order_book_cache_complete_book(mocker) -> None:
+    mocker.patch('freqtrade.order_book_cache.time.monotonic', return_value=100.0)
+    fetch = MagicMock(side_effect=lambda pair, limit: get_book(pair, limit, levels=30))
+    cache = OrderBookCache(ttl=5, fetch=fetch)
+
+    # the book has fewer levels than requested, a deeper request cannot get more
+    assert len(cache.get('ETH/BTC', 50)['bids']) == 30
+    assert len(cache.get('ETH/BTC', 1000)['bids']) == 30
+    assert fetch.call_count == 1
+
+
+def test_polling_order_book_cache(mocker, default_conf) -> None:
+    get_order_book = mocker.patch('freqtrade.exchange.get_order_book', side_effect=get_book)
+    default_conf['internals'] = {'order_book_ttl': 10}
+    market_data = create_market_data(default_conf)
+    assert isinstance(market_data, PollingMarketData)
+
+    market_data.get_order_book('ETH/BTC', 1000)
+    market_data.get_order_book('ETH/BTC', 1)
+    assert get_order_book.call_count == 1
+
+    market_data = create_market_data({'exchange': {}})
+    assert market_data.order_book_cache is None
+    market_data.get_order_book('ETH/BTC', 1)
+    market_data.get_order_book('ETH/BTC', 1)
+    assert get_order_book.call_count == 3
@@ -0,0 +1,99 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+from unittest.mock import MagicMock
+
+import arrow
+from pandas import DataFrame
+
+from freqtrade.analyze import Analyze
+from freqtrade.signal_cache import SignalCache
+
+# 2018-01-01 00:00:00 UTC
+START_MS = 1514764800000
+INTERVAL_MS = 5 * 60 * 1000
+
+
+def test_signal_cache() -> None:
+    cache = SignalCache()
+    assert cache.get('ETH/BTC', '5m', START_MS) is None
+
+    cache.set('ETH/BTC', '5m', START_MS, (True, False))
+    assert cache.get('ETH/BTC', '5m', START_MS) == (True, False)
+    assert cache.get('ETH/BTC', '1h', START_MS) is None
+    assert cache.get('ETH/BTC', '5m', START_MS + INTERVAL_MS) is None
+    assert cache.hits == 1
+    assert cache.misses == 3
+
+    cache.clear('ETH/BTC')
+    assert cache.get('ETH/BTC', '5m', START_MS) is None
+
+
+def test_analyze_signal_cache(mocker, default_conf) -> None:
+    assert Analyze(default_conf).signal_cache is None
+
+    default_conf['internals'] = {'signal_cache': True}
+    default_conf['exchange']['name'] = 'binance'
+    analyze = Analyze(default_conf)
+    now = {'ms': START_MS + 10 * INTERVAL_MS + 1000}
+    clock = MagicMock()
+    clock.utcnow.side_effect = lambda: arrow.get(now['ms'] / 1000)
+    clock.get.side_effect = arrow.get
+    mocker.patch('freqtrade.analyze.arrow', clock)
+    history_mock = mocker.patch('freqtrade.analyze.get_ticker_history', return_value=[1])
+    # the last closed candle when the running one is dropped
+    last_closed = arrow.get((START_MS + 9 * INTERVAL_MS) / 1000).datetime
+    analyze_mock = mocker.patch.object(analyze, 'analyze_ticker', return_value=DataFrame(
+        [{'buy': 1, 'sell': 0, 'date': last_closed}]))
+
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    now['ms'] += 60 * 1000
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    assert analyze_mock.call_count == 1
+    assert history_mock.call_count == 1
+
+    # a new candle closed but the exchange still sends the previous one
+    now['ms'] = START_MS + 11 * INTERVAL_MS
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    assert analyze_mock.call_count == 3
+
+    analyze_mock.return_value = DataFrame([{'buy': 0, 'sell': 1, 'date': arrow.get(
+        (START_MS + 10 * INTERVAL_MS) / 1000).datetime}])
+    assert analyze.get_signal('ETH/BTC', '5m') == (False, True)
+    assert analyze.get_signal('ETH/BTC', '5m') == (False, True)
+    assert analyze_mock.call_count == 4
+    assert analyze.signal_cache.hits == 2
+    assert analyze.signal_cache.misses == 4
+
+
+def test_analyze_signal_cache_running_candle(mocker, default_conf) -> None:
+    default_conf['internals'] = {'signal_cache': True}
+    default_conf['exchange']['name'] = 'bittrex'
+    analyze = Analyze(default_conf)
+    now = {'ms': START_MS + 10 * INTERVAL_MS + 1000}
+    clock = MagicMock()
+    clock.utcnow.side_effect = lambda: arrow.get(now['ms'] / 1000)
+    clock.get.side_effect = arrow.get
+    mocker.patch('freqtrade.analyze.arrow', clock)
+    # the exchange sends the running candle as the last one
+    candles = [[START_MS + i * INTERVAL_MS, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(11)]
+    history_mock = mocker.patch('freqtrade.analyze.get_ticker_history', return_value=candles)
+    analyze_mock = mocker.patch.object(
+        analyze, 'analyze_ticker', side_effect=lambda ticker_hist, pair: DataFrame(
+            [{'buy': 1, 'sell': 0, 'date': arrow.get(ticker_hist[-1][0] / 1000).datetime}]))
+
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    now['ms'] += 60 * 1000
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    # analyzed once, without the running candle
+    assert analyze_mock.call_count == 1
+    assert analyze_mock.call_args[0][0] == candles[:10]
+    assert history_mock.call_count == 1
+    assert analyze.signal_cache.hits == 1
+
+    # the running candle closed
+    now['ms'] = START_MS + 11 * INTERVAL_MS + 1000
+    candles.append([START_MS + 11 * INTERVAL_MS, 1.0, 1.0, 1.0, 1.0, 1.0])
+    assert analyze.get_signal('ETH/BTC', '5m') == (True, False)
+    assert analyze_mock.call_count == 2
+    assert analyze_mock.call_args[0][0] == candles[:11]
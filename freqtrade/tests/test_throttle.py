@@ -0,0 +1,98 @@
+# pragma pylint: disable=missing-docstring, protected-access, C0103
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from freqtrade import metrics
+from freqtrade.tests.test_freqtradebot import get_patched_freqtradebot
+from freqtrade.throttle import AdaptiveThrottle
+
+# 2018-01-01 00:00:00 UTC
+MIDNIGHT = 1514764800.0
+
+
+def test_next_candle_close() -> None:
+    throttle = AdaptiveThrottle(['5m'], rate_limit=0.5, candle_delay=2)
+    assert throttle.next_candle_close(MIDNIGHT) == MIDNIGHT + 2
+    assert throttle.next_candle_close(MIDNIGHT + 2) == MIDNIGHT + 302
+    assert throttle.next_candle_close(MIDNIGHT + 299) == MIDNIGHT + 302
+
+    throttle = AdaptiveThrottle(['1h', '5m'], rate_limit=0.5, candle_delay=0)
+    assert throttle.next_candle_close(MIDNIGHT + 10) == MIDNIGHT + 300
+
+
+def test_throttle_schedule() -> None:
+    throttle = AdaptiveThrottle(['5m'], rate_limit=0.5, candle_delay=2,
+                                rate_limit_usage=0.5, min_check_secs=1)
+    assert throttle.full_iteration_due(MIDNIGHT + 10)
+    throttle.full_iteration_done(MIDNIGHT + 10)
+    assert not throttle.full_iteration_due(MIDNIGHT + 20)
+
+    # without open trades, sleep until the next candle close
+    assert throttle.delay(MIDNIGHT + 20, checks=False) == 282
+    assert throttle.delay(MIDNIGHT + 20, checks=True) == 1
+
+    # 4 calls at a rate limit of 0.5s, using half of it: a check every 4 seconds
+    throttle.check_done(MIDNIGHT + 21, 0.2, calls=100)
+    assert throttle.check_interval == 1
+    throttle.check_done(MIDNIGHT + 22, 0.2, calls=104)
+    assert throttle.check_interval == 4
+    assert throttle.delay(MIDNIGHT + 22.5, checks=True) == 3.5
+
+    # a slow check is run less often
+    throttle.check_done(MIDNIGHT + 26, 3, calls=105)
+    assert throttle.check_interval == 6
+    assert throttle.delay(MIDNIGHT + 29, checks=True) == 3
+    # the candle close comes first
+    throttle.check_done(MIDNIGHT + 298, 3, calls=106)
+    assert throttle.delay(MIDNIGHT + 299, checks=True) == 3
+    assert throttle.full_iteration_due(MIDNIGHT + 302)
+
+
+def test_throttle_metrics() -> None:
+    metrics.init({'metrics': {'enabled': True}})
+    try:
+        throttle = AdaptiveThrottle(['5m'], rate_limit=0.5)
+        throttle.full_iteration_done(MIDNIGHT + 10)
+        throttle.check_done(MIDNIGHT + 15, 0.1, calls=0)
+        throttle.delay(MIDNIGHT + 15, checks=True)
+        registry = metrics.registry()
+        assert registry.gauge(metrics.THROTTLE_CHECK_INTERVAL) == 1
+        assert registry.histogram(metrics.THROTTLE_SLEEP, next='check').count == 1
+    finally:
+        metrics.cleanup()
+
+
+def test_adaptive_process(mocker, default_conf) -> None:
+    default_conf['internals'] = {'adaptive_throttle': True, 'process_throttle_secs': 1}
+    mocker.patch('freqtrade.freqtradebot.exchange.get_rate_limit', return_value=0.5)
+    throttle_mock = mocker.patch('freqtrade.freqtradebot.AdaptiveThrottle')
+    freqtrade = get_patched_freqtradebot(mocker, default_conf)
+    assert freqtrade.throttle is throttle_mock.return_value
+    assert throttle_mock.call_args[1]['rate_limit'] == 0.5
+    assert throttle_mock.call_args[1]['min_check_secs'] == 1
+    freqtrade.throttle = AdaptiveThrottle(['5m'], rate_limit=0.5, min_check_secs=1)
+
+    trade = MagicMock(pair='ETH/BTC')
+    trade_mock = mocker.patch('freqtrade.freqtradebot.Trade')
+    trade_mock.query.filter.return_value.all.return_value = [trade]
+    trade_mock.query.filter.return_value.count.return_value = 1
+    process = mocker.patch.object(freqtrade, '_process', return_value=False)
+    sell = mocker.patch.object(freqtrade, 'process_maybe_execute_sell', return_value=False)
+    sleep = mocker.patch('freqtrade.freqtradebot.time.sleep')
+    now = mocker.patch('freqtrade.freqtradebot.time.time', return_value=MIDNIGHT + 10)
+
+    freqtrade._adaptive_process()
+    assert process.call_count == 1
+    assert sell.call_count == 0
+    assert sleep.call_args[0][0] == pytest.approx(1)
+
+    now.return_value = MIDNIGHT + 11
+    freqtrade._adaptive_process()
+    assert process.call_count == 1
+    sell.assert_called_once_with(trade, (False, False))
+
+    now.return_value = MIDNIGHT + 302
+    freqtrade._adaptive_process()
+    assert process.call_count == 2
@@ -0,0 +1,106 @@
+"""
+Adaptive throttle of the trading loop.
+
+A signal only changes when a candle closes, so the full iteration (whitelist,
+signals, buys and sells) is run just after the close of the candles of every
+ticker interval in use, delayed by candle_delay seconds to let the exchange
+publish them. In between, only the prices of the open trades are checked for
+ROI and stoploss, as often as the exchange rate limit allows: a check making
+N requests is run every N * rate_limit / rate_limit_usage seconds at most,
+leaving the rest of the rate limit to the full iterations and to RPC, and
+never more often than every check duration / rate_limit_usage seconds.
+"""
+import logging
+import math
+from typing import Iterable
+
+from freqtrade import constants, metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDLE_DELAY = 2.0
+DEFAULT_RATE_LIMIT_USAGE = 0.5
+DEFAULT_MIN_CHECK_SECS = 1.0
+
+
+class AdaptiveThrottle(object):
+    """
+    Decides when to run the next iteration and which kind
+    """
+
+    def __init__(self, intervals: Iterable[str], rate_limit: float,
+                 candle_delay: float = DEFAULT_CANDLE_DELAY,
+                 rate_limit_usage: float = DEFAULT_RATE_LIMIT_USAGE,
+                 min_check_secs: float = DEFAULT_MIN_CHECK_SECS) -> None:
+        """
+        :param intervals: ticker intervals in use
+        :param rate_limit: minimum delay between two exchange requests, in seconds
+        :param candle_delay: seconds waited after a candle close
+        :param rate_limit_usage: share of the rate limit the price checks may use
+        :param min_check_secs: minimum interval between two price checks
+        """
+        self.periods = sorted({constants.TICKER_INTERVAL_MINUTES[interval] * 60
+                               for interval in intervals})
+        self.rate_limit = rate_limit
+        self.candle_delay = candle_delay
+        self.rate_limit_usage = rate_limit_usage
+        self.min_check_secs = min_check_secs
+        self.check_interval = min_check_secs
+        # Time of the next full iteration, 0 to run one right away
+        self.next_full = 0.0
+        self._last_check = 0.0
+        self._last_calls = 0
+
+    def next_candle_close(self, now: float) -> float:
+        """
+        Time just after the next candle close of any of the intervals
+        """
+        return min(math.floor((now - self.candle_delay) / period + 1) * period
+                   for period in self.periods) + self.candle_delay
+
+    def full_iteration_due(self, now: float) -> bool:
+        """
+        True if a candle closed since the last full iteration
+        """
+        return now >= self.next_full
+
+    def full_iteration_done(self, started: float) -> None:
+        """
+        Schedule the next full iteration after the candle close following started
+        """
+        self.next_full = self.next_candle_close(started)
+
+    def check_done(self, started: float, duration: float, calls: int) -> None:
+        """
+        Adapt the interval between two price checks to the last one
+        :param started: time the check started at
+        :param duration: seconds the check took
+        :param calls: exchange calls made since the previous check started,
+                      including the ones of RPC and of the full iterations
+        """
+        interval = max(self.min_check_secs, duration / self.rate_limit_usage)
+        if self._last_check:
+            # Spread the calls made since the previous check over enough time for
+            # them to use only rate_limit_usage of the rate limit
+            interval = max(interval,
+                           (calls - self._last_calls) * self.rate_limit / self.rate_limit_usage)
+        self._last_check = started
+        self._last_calls = calls
+        self.check_interval = interval
+        metrics.gauge(metrics.THROTTLE_CHECK_INTERVAL, interval)
+
+    def delay(self, now: float, checks: bool) -> float:
+        """
+        Seconds to wait before the next iteration
+        :param checks: True if there are open trades to check between the candle closes
+        """
+        until_full = max(self.next_full - now, 0.0)
+        if checks:
+            until_check = max((self._last_check or now) + self.check_interval - now, 0.0)
+            if until_check < until_full:
+                logger.debug('Next price check in %.2f seconds', until_check)
+                metrics.observe(metrics.THROTTLE_SLEEP, until_check, next='check')
+                return until_check
+        logger.debug('Next iteration after the candle close, in %.2f seconds', until_full)
+        metrics.observe(metrics.THROTTLE_SLEEP, until_full, next='candle')
+        return until_full
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Import time of the freqtrade subcommands
+
+Runs a fresh interpreter with -X importtime for each subcommand, parsing its
+arguments and importing the modules it needs, and breaks the import time down
+by top level package. The results can be saved and compared to a previous run
+to track them, and checked against a budget.
+
+Optional Cli parameters
+-n / --repeat: number of runs per subcommand, the fastest one is reported (default: 5)
+-t / --top: number of packages listed per subcommand (default: 8)
+--save: file to save the results to, as json
+--compare: results saved by a previous run to compare with
+--budget: maximum import time of a subcommand in ms, e.g. help=300 (repeatable)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# subcommand -> (arguments, modules imported when it is run)
+SUBCOMMANDS: Dict[str, Tuple[List[str], List[str]]] = {
+    'help': (['--help'], []),
+    'trade': ([], ['freqtrade.configuration', 'freqtrade.freqtradebot']),
+    'backtesting': (['backtesting'], ['freqtrade.optimize.backtesting']),
+    'hyperopt': (['hyperopt'], ['freqtrade.optimize.hyperopt']),
+}
+
+CHILD = '''
+import importlib, sys
+from freqtrade.main import main
+from freqtrade.arguments import Arguments
+try:
+    Arguments({args!r}, '').get_parsed_arg()
+except SystemExit:
+    pass
+for module in {modules!r}:
+    importlib.import_module(module)
+'''
+
+
+def measure(args: List[str], modules: List[str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Import time of a subcommand in a new interpreter
+    :return: total in ms, and ms by top level package
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.format(args=args, modules=modules)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+    return sum(packages.values()), packages
+
+
+def best_of(repeat: int, args: List[str], modules: List[str]) -> Tuple[float, Dict[str, float]]:
+    return min((measure(args, modules) for _ in range(repeat)), key=lambda result: result[0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the import time of the subcommands')
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help='number of runs per subcommand')
+    parser.add_argument('-t', '--top', type=int, default=8,
+                        help='number of packages listed per subcommand')
+    parser.add_argument('--save', help='file to save the results to')
+    parser.add_argument('--compare', help='results of a previous run to compare with')
+    parser.add_argument('--budget', action='append', default=[],
+                        help='maximum import time of a subcommand in ms, e.g. help=300')
+    args = parser.parse_args()
+
+    previous: Dict[str, Dict] = {}
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+    budgets = {name: float(ms) for name, ms in (budget.split('=') for budget in args.budget)}
+
+    results: Dict[str, Dict] = {}
+    over_budget = []
+    for name, (sub_args, modules) in SUBCOMMANDS.items():
+        total, packages = best_of(args.repeat, sub_args, modules)
+        results[name] = {'total': round(total, 1),
+                         'packages': {package: round(ms, 1) for package, ms in packages.items()}}
+        line = f'{name:<12} {total:>8.1f} ms'
+        if name in previous:
+            line += f'  ({total - previous[name]["total"]:+.1f} ms)'
+        if name in budgets and total > budgets[name]:
+            line += f'  over the budget of {budgets[name]:.0f} ms'
+            over_budget.append(name)
+        print(line)
+        for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f'    {package:<20} {ms:>8.1f} ms')
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
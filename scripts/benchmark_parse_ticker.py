@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of Analyze.parse_ticker_dataframe()
+
+Compares the groupby based parsing used before with the current one on the
+backtest data files, once as stored and once with every candle duplicated.
+
+Optional Cli parameters
+-d / --datadir: path to the backtest data files (default: freqtrade/tests/testdata)
+-n / --repeat: number of runs per file, the fastest one is reported (default: 20)
+"""
+import argparse
+import glob
+import json
+import os
+import timeit
+
+from freqtrade.analyze import Analyze
+from freqtrade.tests.test_analyze import legacy_parse_ticker_dataframe
+
+DEFAULT_DATADIR = os.path.join(os.path.dirname(__file__), '..', 'freqtrade', 'tests', 'testdata')
+
+
+def best_time(function, ticker: list, repeat: int) -> float:
+    return min(timeit.repeat(lambda: function(ticker), number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the parsing of ticker data')
+    parser.add_argument('-d', '--datadir', default=DEFAULT_DATADIR,
+                        help='path to the backtest data files')
+    parser.add_argument('-n', '--repeat', type=int, default=20,
+                        help='number of runs per file')
+    args = parser.parse_args()
+
+    print(f'{"file":<28} {"candles":>8} {"groupby ms":>11} {"current ms":>11} {"speed-up":>9}')
+    for filename in sorted(glob.glob(os.path.join(args.datadir, '*.json'))):
+        with open(filename) as file:
+            try:
+                ticker = json.load(file)
+            except ValueError:
+                continue
+        # skip empty files and files in the old bittrex format
+        if not ticker or not isinstance(ticker, list) or not isinstance(ticker[0], list):
+            continue
+        name = os.path.basename(filename)
+        for label, data in [(name, ticker), (name + ' (dups)', ticker + ticker)]:
+            legacy = best_time(legacy_parse_ticker_dataframe, data, args.repeat)
+            current = best_time(Analyze.parse_ticker_dataframe, data, args.repeat)
+            print(f'{label:<28} {len(data):>8} {legacy * 1000:>11.2f} '
+                  f'{current * 1000:>11.2f} {legacy / current:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,13 @@
 #!/usr/bin/env python3
 """
-Script to display when the bot will buy a specific pair
+Script to convert backtest data files
 
-Mandatory Cli parameters:
--p / --pair: pair to examine
+By default, converts data files from the old bittrex format to the ccxt format.
 
 Optional Cli parameters
 -d / --datadir: path to pair backtest data
---timerange: specify what timerange of data to use.
--l / --live: Live, to download the latest ticker for the pair
+-n / --norename: don't rename files from BTC_<PAIR> to <PAIR>_BTC
+--columnar: convert ccxt json files into columnar stores (see freqtrade.optimize.datastore)
 """
 import logging
 import sys
@@ -22,6 +21,7 @@ import gzip
 
 from freqtrade.arguments import Arguments
 from freqtrade import misc, constants
+from freqtrade.optimize import datastore
 from pandas import DataFrame
 
 import dateutil.parser
@@ -161,6 +161,37 @@ def convert_main(args: Namespace) -> None:
         convert_file(filename, filename_new)
 
 
+def convert_to_columnar(filename: str) -> None:
+    """Converts a ccxt format json(.gz) file to a columnar store next to it"""
+    (pairdata, _) = load_old_file(filename)
+    if not pairdata:
+        logger.warning("file %s is empty, skipping", filename)
+        return
+    if type(pairdata[0]) is not list:
+        logger.error("pairdata for %s is not in ccxt format, convert it first", filename)
+        return
+
+    store = re.sub(r'\.json(\.gz)?$', datastore.STORE_SUFFIX, filename)
+    logger.info("Converting %s to columnar store %s", filename, store)
+    datastore.write_store(store, datastore.tickerlist_to_columns(pairdata))
+
+
+def convert_columnar_main(args: Namespace) -> None:
+    """
+    converts all ccxt format files in the folder given in --datadir to columnar stores
+    """
+    workdir = path.join(args.datadir, "")
+    logger.info("Workdir: %s", workdir)
+
+    for filename in glob.glob(workdir + "*.json") + glob.glob(workdir + "*.json.gz"):
+        if not re.search(r'-\d+[mhdw]\.json(\.gz)?$', filename):
+            continue
+        # Prefer the gzipped file like optimize.load_tickerdata_file() does
+        if not filename.endswith('.gz') and path.isfile(filename + '.gz'):
+            continue
+        convert_to_columnar(filename)
+
+
 def convert_parse_args(args: List[str]) -> Namespace:
     """
     Parse args passed to the script
@@ -184,6 +215,14 @@ def convert_parse_args(args: List[str]) -> Namespace:
         default=False,
         action='store_true'
     )
+    arguments.parser.add_argument(
+        '--columnar',
+        help='convert ccxt format json files to columnar stores that backtesting '
+             'can memory-map. The json files are left untouched.',
+        dest='columnar',
+        default=False,
+        action='store_true'
+    )
 
     return arguments.parse_args()
 
@@ -194,7 +233,11 @@ def main(sysargv: List[str]) -> None:
     :return: None
     """
     logger.info('Starting Dataframe conversation')
-    convert_main(convert_parse_args(sysargv))
+    args = convert_parse_args(sysargv)
+    if args.columnar:
+        convert_columnar_main(args)
+    else:
+        convert_main(args)
 
 
 if __name__ == '__main__':
@@ -6,7 +6,10 @@ import sys
 import os
 import arrow
 
-from freqtrade import (exchange, arguments, misc)
+from freqtrade import (exchange, arguments)
+from freqtrade.arguments import TimeRange
+from freqtrade.optimize import gaps
+from freqtrade.optimize.downloader import ConcurrentDownloader, RateLimiter
 
 DEFAULT_DL_PATH = 'user_data/data'
 
@@ -32,9 +35,21 @@ with open(pairs_file) as file:
 
 PAIRS.sort()
 
-since_time = None
+timerange = TimeRange(None, None, 0, 0)
+since_ms = None
 if args.days:
-    since_time = arrow.utcnow().shift(days=-args.days).timestamp * 1000
+    since_ts = arrow.utcnow().shift(days=-args.days).timestamp
+    timerange = TimeRange('date', None, since_ts, 0)
+    since_ms = since_ts * 1000
+
+if args.find_gaps:
+    for pair in PAIRS:
+        for tick_interval in timeframes:
+            found = gaps.backfill_gaps(dl_path, pair, tick_interval,
+                                       since_ms=since_ms, dry_run=True)
+            if found:
+                print(f'{pair} {tick_interval}: {len(found)} gaps, {gaps.format_gaps(found)}')
+    sys.exit(0)
 
 print(f'About to download pairs: {PAIRS} to {dl_path}')
 
@@ -50,24 +65,35 @@ for pair in PAIRS:
     if pair not in exchange._API.markets:
         pairs_not_available.append(pair)
         print(f"skipping pair {pair}")
-        continue
-    for tick_interval in timeframes:
-        print(f'downloading pair {pair}, interval {tick_interval}')
-
-        data = exchange.get_ticker_history(pair, tick_interval, since_ms=since_time)
-        if not data:
-            print('\tNo data was downloaded')
-            break
-
-        print('\tData was downloaded for period %s - %s' % (
-            arrow.get(data[0][0] / 1000).format(),
-            arrow.get(data[-1][0] / 1000).format()))
-
-        # save data
-        pair_print = pair.replace('/', '_')
-        filename = f'{pair_print}-{tick_interval}.json'
-        misc.file_dump_json(os.path.join(dl_path, filename), data)
-
+PAIRS = [pair for pair in PAIRS if pair not in pairs_not_available]
+
+if args.backfill_gaps:
+    if args.requests_per_second:
+        limiter = RateLimiter(1 / args.requests_per_second)
+    else:
+        limiter = RateLimiter(exchange._API.rateLimit / 1000)
+    for pair in PAIRS:
+        for tick_interval in timeframes:
+            found = gaps.backfill_gaps(dl_path, pair, tick_interval,
+                                       since_ms=since_ms, limiter=limiter)
+            print(f'{pair} {tick_interval}: backfilled {len(found)} gaps')
+    sys.exit(0)
+
+downloader = ConcurrentDownloader(dl_path,
+                                  max_in_flight=args.concurrency,
+                                  requests_per_second=args.requests_per_second,
+                                  columnar=args.columnar)
+results = downloader.download(PAIRS, timeframes, timerange=timerange)
+
+for result in results:
+    if result.error:
+        print(f'Download of pair {result.pair}, interval {result.tick_interval} failed: '
+              f'{result.error}. Run the script again to resume it.')
+
+stats = downloader.stats()
+print(f"Downloaded {stats['candles']} candles in {stats['requests']} requests "
+      f"({stats['requests_per_second']:.2f} requests/s, "
+      f"{stats['candles_per_second']:.0f} candles/s)")
 
 if pairs_not_available:
     print(f"Pairs [{','.join(pairs_not_available)}] not availble.")